@@ -1,32 +1,224 @@
-from dotenv import load_dotenv
-from flask import Flask, jsonify, request
+import click
+from functools import partial
+import csv
+import json
+from datetime import date, datetime
+from flask import Flask, Response, g, jsonify, request
 from werkzeug.exceptions import BadRequest, Unauthorized
-import os
 
-from config import ProductionConfig, TestConfig
-from crypto_project.db import db
+from config import ProductionConfig
+from crypto_project.db import create_read_engine, db, ensure_schema, get_read_engine, read_only
 from crypto_project.models.transaction_model import TransactionModel
 from crypto_project.models.user_model import Users
 from crypto_project.models.cryptodata_model import CryptoDataModel
+from crypto_project.models.portfolio_snapshot_model import PortfolioSnapshot
+from crypto_project.models.price_alert_model import PriceAlertIndex
+from crypto_project.models.revoked_token_model import RevokedToken
+from crypto_project.models.trading_rollup_model import TradingRollup
+from crypto_project.models.transaction_archive_model import TransactionArchive
+from crypto_project.utils.compression import Compressor
+from crypto_project.utils.db_profiles import describe_engine, get_profile
+from crypto_project.utils.fanout import fan_out
+from crypto_project.utils.downsample import MODES as DOWNSAMPLE_MODES, ChartCache, downsample_chart
+from crypto_project.utils.group_commit import GroupCommitWriter
+from crypto_project.utils.http_cache import ResponseCache
+from crypto_project.utils.json_provider import json_provider_class
+from crypto_project.utils.lazy_import import lazy_import
+from crypto_project.utils.logger import configure_logger, rate_limit_logger
+from crypto_project.utils.market_stream import MarketStream
+from crypto_project.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry
+from crypto_project.utils.projection import FORMATS as RESPONSE_FORMATS, format_records, parse_fields, project
+from crypto_project.utils.qr_cache import QRCodeCache
+from crypto_project.utils.shared_prices import SharedPriceSnapshot
+from crypto_project.utils.sql_profiler import SQLProfiler, profile_sql
+from crypto_project.utils.user_cache import UserCache
+from crypto_project.utils.session_tokens import SessionTokenManager, get_bearer_token, login_required, owner_required
 import logging
 
-# Load environment variables from .env file
-load_dotenv()
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# Only needed when a shared user cache is configured
+redis = lazy_import("redis")
 
 def create_app(config_class=ProductionConfig):
     app = Flask(__name__)
     app.config.from_object(config_class)
-    # Database Configuration
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')  # Use DATABASE_URL from .env
+    if app.config.get('FAST_JSON', True):
+        # orjson-backed responses when it is installed; output matches the default provider except for NaN
+        app.json = json_provider_class()(app)
+    # Pragmas and pool sizing for the SQLAlchemy engine; explicit engine options win
+    db_profile = get_profile(app.config.get('DB_PROFILE', 'default'))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **db_profile.engine_options(app.config['SQLALCHEMY_DATABASE_URI'],
+                                    pool_size=app.config.get('DB_POOL_SIZE'),
+                                    max_overflow=app.config.get('DB_MAX_OVERFLOW')),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+    }
+    app.extensions['db_profile'] = db_profile
     
 
     
 
+    if app.config.get('LOG_RATE_LIMIT'):
+        # Every upstream price fetch logs; keep a sample of those messages
+        rate_limit_logger(logging.getLogger(CryptoDataModel.__module__),
+                          rate=app.config['LOG_RATE_LIMIT'], burst=app.config.get('LOG_RATE_BURST', 20))
+
     db.init_app(app)  # Initialize db with app
+    if app.config.get('COMPRESSION_ENABLED', True):
+        # Registered first so it runs after every other after_request hook
+        compressor = Compressor(
+            min_size=app.config.get('COMPRESSION_MIN_SIZE', 1024),
+            gzip_level=app.config.get('COMPRESSION_LEVEL', 6),
+            brotli_quality=app.config.get('COMPRESSION_BROTLI_QUALITY', 5),
+            cache_size=app.config.get('COMPRESSION_CACHE_SIZE', 256)
+        )
+        compressor.init_app(app)
+        app.extensions['compressor'] = compressor
+    metrics = None
+    if app.config.get('METRICS_ENABLED', True):
+        # Request, upstream API and SQL timings, served at /api/metrics
+        metrics = MetricsRegistry()
+        metrics.init_app(app)
+        app.extensions['metrics'] = metrics
+    sql_profiler = None
+    if app.config.get('SQL_PROFILING'):
+        # Opt-in: per-request statement log with N+1 and slow query reports
+        sql_profiler = SQLProfiler(
+            slow_ms=app.config.get('SQL_PROFILE_SLOW_MS', 100.0),
+            repeat_threshold=app.config.get('SQL_PROFILE_REPEAT_THRESHOLD', 5),
+            header=app.config.get('SQL_PROFILE_HEADER', True)
+        )
+        sql_profiler.init_app(app)
+        app.extensions['sql_profiler'] = sql_profiler
     with app.app_context():
-        db.create_all()  # Create tables if they don't exist
+        engines = [db.engine]
+        if app.config.get('DB_READ_SPLIT'):
+            # Read-only endpoints query through a separate engine so scans do not hold up writes
+            read_engine = create_read_engine(app.config.get('DB_READ_URL'), **app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+            if read_engine is None:
+                logger.info("Read/write split disabled: in-memory databases cannot be shared between engines")
+            else:
+                app.extensions['read_engine'] = read_engine
+                engines.append(read_engine)
+        for engine in engines:
+            db_profile.install(engine)  # Before the first connection is opened
+            if metrics is not None:
+                metrics.instrument_engine(engine)
+            if sql_profiler is not None:
+                sql_profiler.instrument_engine(engine)
+        if app.config.get('CREATE_DB', True):
+            ensure_schema()  # Create tables if they don't exist
+        # Pending price alerts are evaluated from an in-memory sorted index
+        alert_index = PriceAlertIndex(sync_interval=app.config.get('PRICE_ALERT_SYNC_INTERVAL') or None)
+        alert_index.load()
+    app.extensions['price_alerts'] = alert_index
+
+    if app.config.get('TRANSACTION_GROUP_COMMIT'):
+        # Transaction inserts are committed in groups by a dedicated writer thread
+        app.extensions['group_commit'] = GroupCommitWriter(
+            app,
+            max_batch_rows=app.config.get('GROUP_COMMIT_MAX_ROWS', 100),
+            max_wait_ms=app.config.get('GROUP_COMMIT_MAX_WAIT_MS', 5.0)
+        )
+
+    redis_url = app.config.get('USER_CACHE_REDIS_URL')
+    app.extensions['user_cache'] = UserCache(
+        max_size=app.config.get('USER_CACHE_SIZE', 10000),
+        local_ttl=app.config.get('USER_CACHE_LOCAL_TTL'),
+        redis_client=redis.Redis.from_url(redis_url) if redis_url else None
+    )
+
+    session_tokens = SessionTokenManager(
+        app.config['SECRET_KEY'],
+        max_age=app.config.get('SESSION_TOKEN_MAX_AGE', 3600),
+        cache_size=app.config.get('SESSION_TOKEN_CACHE_SIZE', 10000),
+        revocation_store=RevokedToken,
+        sync_interval=app.config.get('SESSION_REVOCATION_SYNC_INTERVAL', 5.0)
+    )
+    app.extensions['session_tokens'] = session_tokens
+
+    qr_cache = QRCodeCache(
+        max_size=app.config.get('QR_CACHE_SIZE', 1024),
+        workers=app.config.get('QR_RENDER_WORKERS', 2)
+    )
 
     crypto_model = CryptoDataModel()
+    if app.config.get('PRICE_SNAPSHOT_NAME'):
+        # Multi-process serving: read prices published by the ingester process
+        crypto_model.price_snapshot = SharedPriceSnapshot.attach(
+            app.config['PRICE_SNAPSHOT_NAME'],
+            capacity=app.config.get('PRICE_SNAPSHOT_CAPACITY', 256)
+        )
+        crypto_model.snapshot_max_age = app.config.get('PRICE_SNAPSHOT_MAX_AGE', 60.0)
+    app.extensions['crypto_model'] = crypto_model
+    # Downsampled historical charts, keyed by (coin, days, points, mode)
+    chart_cache = ChartCache(
+        max_size=app.config.get('CHART_CACHE_SIZE', 256),
+        ttl=app.config.get('CHART_CACHE_TTL', 60.0)
+    )
+    app.extensions['chart_cache'] = chart_cache
+    market_stream = MarketStream(
+        app, crypto_model, alert_index,
+        poll_interval=app.config.get('STREAM_POLL_INTERVAL', 10.0),
+        heartbeat=app.config.get('STREAM_HEARTBEAT_SECONDS', 15.0),
+        max_queue=app.config.get('STREAM_MAX_QUEUE', 100)
+    )
+    app.extensions['market_stream'] = market_stream
+
+    # ETags derived from each view's data version; 304s skip the view entirely
+    response_cache = ResponseCache(
+        max_entries=app.config.get('HTTP_BODY_CACHE_SIZE', 512),
+        enabled=app.config.get('HTTP_CACHE_ENABLED', True)
+    )
+    app.extensions['response_cache'] = response_cache
+    market_max_age = app.config.get('HTTP_CACHE_MARKET_MAX_AGE', 30)
+    # Per-call limit for concurrent upstream fan-outs (multi-call routes return partial results)
+    crypto_model.timeout = app.config.get('UPSTREAM_TIMEOUT', 10.0)
+    fanout_timeout = app.config.get('UPSTREAM_FANOUT_TIMEOUT', 5.0)
+
+    def _price_version(crypto_id):
+        snapshot = crypto_model.price_snapshot
+        if snapshot is None or snapshot.get(crypto_id, max_age=crypto_model.snapshot_max_age) is None:
+            return None
+        return snapshot.sequence
+
+    def _price_max_age(crypto_id):
+        if crypto_model.price_snapshot is not None:
+            return app.config.get('PRICE_SNAPSHOT_INTERVAL', market_max_age)
+        return market_max_age
+
+    def _chart_key(crypto_id, days):
+        points = request.args.get('points')
+        if points is None or not points.isdigit():
+            return None
+        return (crypto_id, days, int(points), request.args.get('mode', 'lttb'))
+
+    def _chart_version(crypto_id, days):
+        key = _chart_key(crypto_id, days)
+        chart = chart_cache.get(key) if key is not None else None
+        if not chart or not chart.get('prices'):
+            return None
+        return chart['prices'][-1][0]
+
+    def _chart_max_age(crypto_id, days):
+        key = _chart_key(crypto_id, days)
+        remaining = chart_cache.expires_in(key) if key is not None else None
+        return remaining if remaining is not None else market_max_age
+
+    def _portfolio_version(user_id):
+        if request.args.get('valuation', 'false').lower() == 'true':
+            return None  # Valued at live prices
+        return _transactions_version(user_id)
+
+    def _transactions_version(user_id):
+        return TransactionModel.get_version(user_id)
+
+    def _stats_version():
+        # Stats default to the session's user, so the version is per user even when the URL is shared
+        user_id = g.session['user_id']
+        return user_id, _transactions_version(user_id)
 
     ####################################################
     #
@@ -39,6 +231,28 @@ def create_app(config_class=ProductionConfig):
         """Health check route to verify the service is running."""
         return jsonify({'status': 'healthy'}), 200
 
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics_endpoint():
+        """Expose request, upstream API and database metrics in Prometheus text format."""
+        if metrics is None:
+            return jsonify({'error': 'Metrics are disabled'}), 404
+        return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+    @app.route('/api/diagnostics/db', methods=['GET'])
+    def db_diagnostics():
+        """Report the database engine profile, the pragmas in effect and the connection pool state."""
+        try:
+            details = describe_engine(db.engine, db_profile)
+            details['track_modifications'] = bool(app.config.get('SQLALCHEMY_TRACK_MODIFICATIONS'))
+            details['engine_options'] = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+            read_engine = get_read_engine()
+            if read_engine is not None:
+                details['read_engine'] = describe_engine(read_engine, db_profile)
+            return jsonify(details), 200
+        except Exception as e:
+            logger.error("Error describing the database engine: %s", e)
+            return jsonify({'error': str(e)}), 500
+
     ##########################################################
     #
     # User Management
@@ -57,27 +271,90 @@ def create_app(config_class=ProductionConfig):
             if not username or not password:
                 raise BadRequest("'username' and 'password' are required.")
 
-            # Check if username already exists
-            if Users.query.filter_by(username=username).first():
-                raise ValueError(f"User with username '{username}' already exists.")
-
-            # Create new user
+            # Create new user; duplicates are rejected by the unique constraint
             Users.create_user(username, password)
             return jsonify({'status': 'account created', 'username': username}), 201
 
         except ValueError as e:
             # Handle duplicate username error
-            logging.error(f"Error creating user: {str(e)}")
+            logger.error("Error creating user: %s", e)
             return jsonify({'error': str(e)}), 400  # 400 for bad request (duplicate username)
         except BadRequest as e:
             # Handle missing input error
-            logging.error(f"Bad request error: {str(e)}")
+            logger.error("Bad request error: %s", e)
             return jsonify({'error': str(e)}), 400  # 400 for missing input
         except Exception as e:
             # Handle unexpected errors
-            logging.error(f"Unexpected error: {str(e)}")
+            logger.error("Unexpected error: %s", e)
             return jsonify({'error': str(e)}), 500  # 500 for internal server error
 
+    @app.route('/api/bulk-create-accounts', methods=['POST'])
+    def bulk_create_accounts():
+        """Create many user accounts in one request.
+
+        Accepts either a JSON body ``{"users": [{"username": ..., "password": ...}, ...]}``
+        or an ``application/x-ndjson`` stream with one user object per line.
+
+        Rows are committed chunk by chunk while the body is read, so a bad row
+        never fails the request: it is reported in ``conflicts`` (with its
+        1-based ``row`` number when it is not a user object) and every row not
+        listed there was created.
+        """
+        malformed = []
+
+        def parse_ndjson(lines):
+            for row, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield row, json.loads(line)
+                except ValueError:
+                    malformed.append({'row': row, 'username': None, 'reason': "Invalid JSON."})
+
+        def to_credentials(entries):
+            for row, entry in entries:
+                if not isinstance(entry, dict):
+                    malformed.append({'row': row, 'username': None,
+                                      'reason': "Expected an object with 'username' and 'password'."})
+                    continue
+                yield entry.get('username'), entry.get('password')
+
+        try:
+            if request.mimetype == 'application/x-ndjson':
+                credentials = to_credentials(parse_ndjson(request.stream))
+            else:
+                users = (request.json or {}).get('users')
+                if not isinstance(users, list):
+                    raise BadRequest("'users' must be a list of objects with 'username' and 'password'.")
+                credentials = to_credentials(enumerate(users, start=1))
+
+            result = Users.bulk_create_users(
+                credentials,
+                chunk_size=app.config.get('BULK_PROVISION_CHUNK_SIZE', 500),
+                workers=app.config.get('BULK_PROVISION_WORKERS', 4)
+            )
+            result['conflicts'] = malformed + result['conflicts']
+            return jsonify({'status': 'accounts processed', **result}), 200
+        except (BadRequest, ValueError) as e:
+            logger.error("Bad request error: %s", e)
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            logger.error("Unexpected error: %s", e)
+            return jsonify({'error': str(e)}), 500
+
+    @app.cli.command('provision-users')
+    @click.argument('csv_file', type=click.File('r'))
+    @click.option('--chunk-size', default=500, show_default=True, help='Rows per duplicate check and insert.')
+    @click.option('--workers', default=4, show_default=True, help='Password hashing threads.')
+    def provision_users(csv_file, chunk_size, workers):
+        """Bulk-create users from a CSV file of username,password rows."""
+        credentials = ((row[0], row[1] if len(row) > 1 else None) for row in csv.reader(csv_file) if row)
+        with profile_sql('provision-users'):
+            result = Users.bulk_create_users(credentials, chunk_size=chunk_size, workers=workers)
+        print(f"Created {result['created']} users, {len(result['conflicts'])} conflicts.")
+        for conflict in result['conflicts']:
+            print(f"  {conflict['username']}: {conflict['reason']}")
+
     @app.route('/api/delete-user', methods=['DELETE'])
     def delete_user():
         """Delete a user by username."""
@@ -106,17 +383,73 @@ def create_app(config_class=ProductionConfig):
             data = request.json
             username = data.get('username')
             password = data.get('password')
+            totp_token = data.get('totp_token')
 
             # Validate login credentials
             if not Users.check_password(username, password):
                 raise Unauthorized("Invalid username or password.")
 
-            return jsonify({'message': f"User {username} logged in successfully."}), 200
+            # Optionally bind the session to a TOTP check
+            if totp_token:
+                if not Users.verify_totp_token(username, totp_token):
+                    raise Unauthorized("Invalid 2FA token.")
+            elif app.config.get('SESSION_REQUIRE_TOTP'):
+                raise Unauthorized("A 2FA token is required.")
+
+            token = session_tokens.issue(Users.get_id_by_username(username), username,
+                                         totp_verified=bool(totp_token))
+            return jsonify({
+                'message': f"User {username} logged in successfully.",
+                'token': token,
+                'expires_in': session_tokens.max_age
+            }), 200
         except Unauthorized as e:
             return jsonify({'error': str(e)}), 401
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
+    @app.route('/api/logout', methods=['POST'])
+    @login_required
+    def logout():
+        """Revoke the session token used for this request."""
+        session_tokens.revoke(get_bearer_token())
+        return jsonify({'message': f"User {g.session['username']} logged out successfully."}), 200
+
+    @app.route('/api/session', methods=['GET'])
+    @login_required
+    def get_session():
+        """Return the user bound to the presented session token."""
+        return jsonify({
+            'user_id': g.session['user_id'],
+            'username': g.session['username'],
+            'totp_verified': g.session['2fa']
+        }), 200
+
+    @app.route('/api/2fa/qr/<string:username>', methods=['GET'])
+    @login_required
+    def get_2fa_qr_code(username):
+        """Serve the 2FA enrollment QR code of the logged-in user as a PNG."""
+        if g.session['username'] != username:
+            return jsonify({'error': "Cannot fetch another user's 2FA QR code."}), 403
+        try:
+            totp_secret = Users.get_totp_secret(username)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 404
+
+        try:
+            issuer_name = app.config.get('TOTP_ISSUER', 'CryptoApp')
+            etag = QRCodeCache.etag(username, totp_secret, issuer_name)
+            if etag in request.if_none_match:
+                response = app.response_class(status=304)
+            else:
+                png = qr_cache.get_png(username, totp_secret, issuer_name)
+                response = app.response_class(png, mimetype='image/png')
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
     ##########################################################
     #
     # CoinGecko API Interaction
@@ -124,17 +457,24 @@ def create_app(config_class=ProductionConfig):
     ##########################################################
 
     @app.route('/api/crypto-price/<string:crypto_id>', methods=['GET'])
+    @response_cache.cached(version=_price_version, max_age=_price_max_age)
     def get_crypto_price(crypto_id):
         """Fetch the current price of a cryptocurrency."""
         try:
             price = crypto_model.get_crypto_price(crypto_id)
             if price is None:
                 raise ValueError(f"Failed to fetch price for {crypto_id}.")
+            try:
+                market_stream.publish_price(crypto_id, price)
+            except Exception as e:
+                # Alerts stay pending and are evaluated again; the price itself was fetched
+                logger.error("Failed to publish price for %s: %s", crypto_id, e)
             return jsonify({'crypto_id': crypto_id, 'price_usd': price}), 200
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/crypto-trends/<string:crypto_id>', methods=['GET'])
+    @response_cache.cached(max_age=market_max_age)
     def get_crypto_trends(crypto_id):
         """Fetch price trends for a cryptocurrency."""
         try:
@@ -146,34 +486,197 @@ def create_app(config_class=ProductionConfig):
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/top-cryptos', methods=['GET'])
+    @response_cache.cached(max_age=market_max_age)
     def get_top_cryptos():
-        """Fetch top-performing cryptocurrencies."""
+        """
+        Fetch top-performing cryptocurrencies.
+
+        ``fields`` (comma-separated) limits each market object to those fields;
+        ``format=columnar`` returns parallel arrays keyed by field instead of a
+        list of objects.
+        """
         try:
+            fields, fmt = _projection_args()
             top_cryptos = crypto_model.get_top_performing_cryptos()
-            return jsonify({'top_cryptos': top_cryptos}), 200
+            return jsonify({'top_cryptos': format_records(top_cryptos, fields, fmt)}), 200
+        except BadRequest as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/compare-cryptos/<string:crypto_id1>/<string:crypto_id2>', methods=['GET'])
-    def compare_cryptos(crypto_id1, crypto_id2):
-        """Compare two cryptocurrencies."""
+    @response_cache.cached(max_age=market_max_age)
+    async def compare_cryptos(crypto_id1, crypto_id2):
+        """
+        Compare two cryptocurrencies.
+
+        Accepts the same ``fields`` and ``format`` parameters as /api/top-cryptos;
+        columnar values are in the order of the two IDs in the path. With
+        ``trends=<days>``, both coins' price trends are fetched concurrently
+        with the market data; calls that fail or time out are listed in
+        ``errors`` and the rest is still returned.
+        """
         try:
-            comparison = crypto_model.compare_cryptos(crypto_id1, crypto_id2)
-            if not comparison:
+            fields, fmt = _projection_args()
+            trend_days = request.args.get('trends')
+            if trend_days is not None and not trend_days.isdigit():
+                raise BadRequest("'trends' must be a number of days.")
+
+            calls = {'comparison': partial(crypto_model.compare_cryptos, crypto_id1, crypto_id2)}
+            if trend_days:
+                for crypto_id in (crypto_id1, crypto_id2):
+                    calls[crypto_id] = partial(crypto_model.get_price_trends, crypto_id, days=trend_days)
+            results, errors = await fan_out(calls, fanout_timeout)
+            comparison = results.pop('comparison', None)
+            if comparison is None and not results:
                 raise ValueError(f"Failed to compare {crypto_id1} and {crypto_id2}.")
-            return jsonify({'comparison': comparison}), 200
+
+            body = {}
+            if comparison is None:
+                body['comparison'] = None
+            elif fmt == 'columnar':
+                records = [comparison[crypto_id1], comparison[crypto_id2]]
+                body.update(comparison=format_records(records, fields, fmt), order=[crypto_id1, crypto_id2])
+            else:
+                body['comparison'] = {crypto_id: project(record, fields) for crypto_id, record in comparison.items()}
+            if trend_days:
+                body['trends'] = results
+            if errors:
+                body['errors'] = errors
+            return _fan_out_response(body, errors), 200
+        except BadRequest as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    def _fan_out_response(body, errors):
+        response = jsonify(body)
+        if errors:
+            # Partial results must not be reused by shared caches for max-age seconds
+            response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    @app.route('/api/dashboard', methods=['GET'])
+    @response_cache.cached(max_age=market_max_age)
+    async def get_dashboard():
+        """
+        Fetch prices, price trends and the top performers in one request.
+
+        The upstream calls (one batched price lookup, one trend series per
+        coin, one top-performers list) run concurrently, so the route takes
+        as long as the slowest call. Calls that fail or time out are listed
+        in ``errors``; the rest is still returned.
+        """
+        try:
+            crypto_ids = parse_fields(request.args.get('ids'))
+            days = request.args.get('days', '7')
+            limit = request.args.get('limit', '10')
+            if not crypto_ids:
+                raise BadRequest("'ids' is required.")
+            if len(crypto_ids) > app.config.get('DASHBOARD_MAX_IDS', 10):
+                raise BadRequest(f"At most {app.config.get('DASHBOARD_MAX_IDS', 10)} 'ids' are allowed.")
+            if not days.isdigit() or not limit.isdigit():
+                raise BadRequest("'days' and 'limit' must be integers.")
+
+            calls = {'prices': partial(crypto_model.get_crypto_prices, crypto_ids),
+                     'top_cryptos': partial(crypto_model.get_top_performing_cryptos, int(limit))}
+            for crypto_id in crypto_ids:
+                calls[crypto_id] = partial(crypto_model.get_price_trends, crypto_id, days=days)
+            results, errors = await fan_out(calls, fanout_timeout)
+            if not results:
+                raise ValueError("Failed to fetch dashboard data.")
+            return _fan_out_response({
+                'prices': results.get('prices'),
+                'trends': {crypto_id: results[crypto_id] for crypto_id in crypto_ids if crypto_id in results},
+                'top_cryptos': results.get('top_cryptos'),
+                'errors': errors,
+            }, errors), 200
+        except BadRequest as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
+
+    def _projection_args():
+        """Read the ``fields`` and ``format`` query parameters of the market endpoints."""
+        fmt = request.args.get('format', 'records')
+        if fmt not in RESPONSE_FORMATS:
+            raise BadRequest(f"'format' must be one of: {', '.join(RESPONSE_FORMATS)}.")
+        return parse_fields(request.args.get('fields')), fmt
         
         
+    @app.route('/api/stream/prices', methods=['GET'])
+    def stream_prices():
+        """Stream live prices (and the user's fired alerts) as server-sent events.
+
+        Query parameters: ``ids`` is a comma-separated list of coins; ``token``
+        is an optional session token (EventSource cannot send headers) that
+        adds the user's fired price alerts to the stream.
+        """
+        crypto_ids = [crypto_id for crypto_id in request.args.get('ids', '').split(',') if crypto_id]
+        token = request.args.get('token') or get_bearer_token()
+        user_id = None
+        if token:
+            claims = session_tokens.verify(token)
+            if claims is None:
+                return jsonify({'error': "Invalid or expired session token."}), 401
+            user_id = claims['user_id']
+        if not crypto_ids and user_id is None:
+            return jsonify({'error': "'ids' or a session token is required."}), 400
+
+        subscription = market_stream.subscribe(crypto_ids, user_id=user_id)
+        g.stream_subscription = subscription
+        response = Response(
+            market_stream.events(subscription),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        # The generator's own cleanup only runs once iteration starts (not for HEAD or early aborts)
+        response.call_on_close(lambda: market_stream.pubsub.unsubscribe(subscription))
+        return response
+
+    @app.teardown_request
+    def _release_stream_subscription(error):
+        subscription = g.pop('stream_subscription', None)
+        if subscription is not None and error is not None:
+            # The stream response was replaced by an error response, so it is never iterated or closed
+            market_stream.pubsub.unsubscribe(subscription)
+
     @app.route('/api/historical-data/<string:crypto_id>/<int:days>', methods=['GET'])
+    @response_cache.cached(version=_chart_version, max_age=_chart_max_age)
     def get_historical_data(crypto_id, days):
-        """Fetch historical data for a cryptocurrency."""
+        """
+        Fetch historical data for a cryptocurrency.
+
+        With ``points``, each series is downsampled to that many points on the
+        server: Largest-Triangle-Three-Buckets by default, or the per-bucket
+        minimum and maximum with ``mode=minmax``.
+        """
         try:
+            points = request.args.get('points')
+            mode = request.args.get('mode', 'lttb')
+            if points is not None:
+                if not points.isdigit() or int(points) < 3:
+                    raise BadRequest("'points' must be an integer of at least 3.")
+                if mode not in DOWNSAMPLE_MODES:
+                    raise BadRequest(f"'mode' must be one of: {', '.join(DOWNSAMPLE_MODES)}.")
+                points = int(points)
+                key = (crypto_id, days, points, mode)
+                chart = chart_cache.get(key)
+                if chart is not None:
+                    return jsonify({'crypto_id': crypto_id, 'points': points, 'mode': mode,
+                                    'historical_data': chart}), 200
+
             trends = crypto_model.get_price_trends(crypto_id, days=str(days))
             if not trends:
                 raise ValueError(f"Failed to fetch historical data for {crypto_id} over {days} days.")
-            return jsonify({'crypto_id': crypto_id, 'historical_data': trends}), 200
+            if points is None:
+                return jsonify({'crypto_id': crypto_id, 'historical_data': trends}), 200
+            chart = downsample_chart(trends, points, mode)
+            chart_cache.set(key, chart)
+            return jsonify({'crypto_id': crypto_id, 'points': points, 'mode': mode,
+                            'historical_data': chart}), 200
+        except BadRequest as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -209,6 +712,87 @@ def create_app(config_class=ProductionConfig):
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
+    @app.route('/api/portfolio/<int:user_id>', methods=['GET'])
+    @login_required
+    @owner_required
+    @read_only
+    @response_cache.cached(version=_portfolio_version, private=True)
+    async def get_portfolio_state(user_id):
+        """
+        Reconstruct a user's portfolio from snapshots and the transaction log.
+
+        With ``valuation=true`` the holdings are also valued at current
+        prices, fetched concurrently per coin; coins whose price could not be
+        fetched are listed in ``errors`` and left out of the total.
+        """
+        try:
+            as_of = request.args.get('as_of')
+            try:
+                as_of = datetime.fromisoformat(as_of) if as_of else None
+            except ValueError:
+                raise BadRequest("'as_of' must be an ISO 8601 timestamp.")
+
+            state = PortfolioSnapshot.get_state(user_id, as_of=as_of)
+            body = {'portfolio': state.to_dict()}
+            if request.args.get('valuation', 'false').lower() == 'true':
+                holdings = {crypto_id: quantity for crypto_id, quantity in state.holdings.items() if quantity}
+                prices, errors = await fan_out(
+                    {crypto_id: partial(crypto_model.get_crypto_price, crypto_id) for crypto_id in holdings},
+                    fanout_timeout
+                )
+                values = {crypto_id: holdings[crypto_id] * price for crypto_id, price in prices.items()}
+                body['valuation'] = {'prices': prices, 'values': values,
+                                     'total_value': sum(values.values()), 'errors': errors}
+            return jsonify(body), 200
+        except BadRequest as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    ##########################################################
+    #
+    # Trading Statistics
+    #
+    ##########################################################
+
+    @app.route('/api/stats', methods=['GET'])
+    @login_required
+    @owner_required
+    @read_only
+    @response_cache.cached(version=_stats_version, private=True)
+    def get_trading_stats():
+        """Fetch the session user's trading totals from the per user/asset/day rollups."""
+        try:
+            user_id = g.session['user_id']
+            crypto_id = request.args.get('crypto_id')
+            try:
+                start = date.fromisoformat(request.args['start']) if 'start' in request.args else None
+                end = date.fromisoformat(request.args['end']) if 'end' in request.args else None
+            except ValueError:
+                raise BadRequest("'start' and 'end' must be dates in YYYY-MM-DD format.")
+
+            stats = TradingRollup.get_stats(user_id=user_id, crypto_id=crypto_id, start=start, end=end)
+            return jsonify({'user_id': user_id, 'crypto_id': crypto_id, 'stats': stats}), 200
+        except BadRequest as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.cli.command('rebuild-rollups')
+    def rebuild_rollups():
+        """Backfill trading rollups from the transactions table."""
+        with profile_sql('rebuild-rollups'):
+            count = TradingRollup.rebuild()
+        print(f"Rebuilt {count} trading rollup rows.")
+
+    @app.cli.command('archive-transactions')
+    @click.option('--days', default=90, show_default=True, help='Archive inactive transactions older than this many days.')
+    def archive_transactions(days):
+        """Move old inactive transactions into monthly archive tables."""
+        with profile_sql('archive-transactions'):
+            count = TransactionArchive.archive_inactive(older_than_days=days)
+        print(f"Archived {count} transactions.")
+
     ##########################################################
     #
     # Alerts and Monitoring
@@ -222,33 +806,79 @@ def create_app(config_class=ProductionConfig):
             data = request.json
             crypto_id = data.get('crypto_id')
             target_price = data.get('target_price')
+            user_id = data.get('user_id')
+            direction = data.get('direction')
 
             # Validate inputs
             if not crypto_id or target_price is None:
                 raise BadRequest("'crypto_id' and 'target_price' are required.")
+            if direction not in (None, 'above', 'below'):
+                raise BadRequest("'direction' must be 'above' or 'below'.")
 
-            logging.info(f"Setting price alert for {crypto_id} at {target_price}.")
+            logger.info("Setting price alert for %s at %s.", crypto_id, target_price)
 
             # Attempt to set the price alert
-            alert_set = crypto_model.set_price_alert(crypto_id, target_price)
-            if not alert_set:
+            alert = crypto_model.set_price_alert(crypto_id, target_price, user_id=user_id, direction=direction)
+            if not alert:
                 raise ValueError(f"Failed to set price alert for {crypto_id}.")
 
-            return jsonify({'status': 'alert set', 'crypto_id': crypto_id, 'target_price': target_price}), 201
+            return jsonify({
+                'status': 'alert set',
+                'alert_id': alert.id,
+                'crypto_id': crypto_id,
+                'target_price': target_price,
+                'direction': alert.direction
+            }), 201
         except BadRequest as e:
-            logging.error(f"Bad request error: {str(e)}")
+            logger.error("Bad request error: %s", e)
             return jsonify({'error': str(e)}), 400
         except ValueError as e:
-            logging.error(f"Value error: {str(e)}")
+            logger.error("Value error: %s", e)
             return jsonify({'error': str(e)}), 400
         except Exception as e:
-            logging.error(f"Unexpected error: {str(e)}")
+            logger.error("Unexpected error: %s", e)
             return jsonify({'error': str(e)}), 500
 
+    @app.cli.command('check-price-alerts')
+    def check_price_alerts():
+        """Fetch current prices for every coin with pending alerts and fire crossed alerts."""
+        fired = 0
+        prices = crypto_model.get_crypto_prices(alert_index.crypto_ids)
+        with profile_sql('check-price-alerts'):
+            for crypto_id, price in prices.items():
+                fired += len(market_stream.publish_price(crypto_id, price))
+        print(f"Fired {fired} price alerts.")
+
 
     return app
 
 
+def create_schema(config_class=ProductionConfig) -> bool:
+    """
+    Create any missing tables without building the full application.
+
+    serve.py runs this in the parent process before forking, so the workers
+    inherit no background threads, open connections or caches.
+
+    Args:
+        config_class: The configuration whose database and engine profile to use.
+
+    Returns:
+        bool: True if tables were created, False if the schema was already in place.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+    db_profile = get_profile(app.config.get('DB_PROFILE', 'default'))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = db_profile.engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    db.init_app(app)
+    with app.app_context():
+        db_profile.install(db.engine)  # Persistent pragmas such as WAL are set once here
+        try:
+            return ensure_schema()
+        finally:
+            db.engine.dispose()
+
+
 if __name__ == '__main__':
     app = create_app()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,121 @@
+"""
+Compare the SQLAlchemy engine profiles on a transaction-heavy workload.
+
+For each profile, builds the app against a fresh file SQLite database and
+runs a mix of transaction inserts and portfolio and stats reads from
+several client threads. Reports throughput, p50/p95 latency, and the
+number of failed requests (e.g. "database is locked") per profile.
+
+Run from the crypto_project directory:
+
+    python -m benchmarks.bench_db_profiles --requests 2000 --concurrency 8
+    python -m benchmarks.bench_db_profiles --profiles default throughput --write-ratio 1.0
+    python -m benchmarks.bench_db_profiles --profiles throughput --read-split
+"""
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import TestConfig
+from benchmarks.bench_e2e import percentile
+from crypto_project.utils.db_profiles import PROFILES
+
+COINS = ['bitcoin', 'ethereum', 'solana', 'cardano', 'dogecoin']
+
+
+def build_app(profile: str, directory: str, read_split: bool = False):
+    from app import create_app
+
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{directory}/{profile}.db"
+        DB_PROFILE = profile
+        DB_READ_SPLIT = read_split
+        METRICS_ENABLED = False
+        LOG_RATE_LIMIT = 1.0
+        PORTFOLIO_OPENING_CASH = 1e12  # Every benchmark buy is funded
+        LOG_RATE_BURST = 1
+
+    return create_app(BenchConfig)
+
+
+def run_profile(profile: str, args) -> dict:
+    from crypto_project.db import db, get_read_engine
+    from crypto_project.models.user_model import Users
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = build_app(profile, directory, args.read_split)
+        with app.app_context():
+            Users.create_user('bench', 'bench-password')  # User 1; portfolio and stats need its session
+        token = app.test_client().post('/api/login', json={
+            'username': 'bench', 'password': 'bench-password'}).get_json()['token']
+        auth = {'Authorization': f'Bearer {token}'}
+        clients = threading.local()
+        rng = random.Random(args.seed)
+        plan = [rng.random() < args.write_ratio for _ in range(args.requests)]
+        latencies, errors, lock = [], 0, threading.Lock()
+
+        def one(is_write):
+            nonlocal errors
+            client = getattr(clients, 'client', None)
+            if client is None:
+                client = clients.client = app.test_client()
+            started = time.perf_counter()
+            if is_write:
+                response = client.post('/api/create-transaction', json={
+                    'user_id': 1, 'crypto_id': random.choice(COINS), 'transaction_type': 'buy',
+                    'quantity': 0.01, 'price': 100.0})
+            elif random.random() < 0.5:
+                response = client.get('/api/portfolio/1', headers=auth)
+            else:
+                response = client.get('/api/stats?user_id=1', headers=auth)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                errors += response.status_code >= 400
+
+        for is_write in plan[:args.warmup]:
+            one(is_write)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(one, plan))
+        elapsed = time.perf_counter() - started
+        with app.app_context():
+            db.engine.dispose()
+            if get_read_engine() is not None:
+                get_read_engine().dispose()
+
+    return {
+        'throughput_rps': round(len(plan) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1e3, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1e3, 3),
+        'errors': errors,
+    }
+
+
+def run(args) -> int:
+    results = {profile: run_profile(profile, args) for profile in args.profiles}
+    print(f"requests={args.requests} concurrency={args.concurrency} write_ratio={args.write_ratio} "
+          f"read_split={args.read_split}")
+    print(f"{'profile':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for profile, result in results.items():
+        print(f"{profile:<14}{result['throughput_rps']:>10.1f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['errors']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', nargs='*', choices=list(PROFILES), default=list(PROFILES),
+                        help='Profiles to compare (default: all).')
+    parser.add_argument('--requests', type=int, default=1000, help='Measured requests per profile.')
+    parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per profile.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Client threads.')
+    parser.add_argument('--write-ratio', type=float, default=0.8, help='Share of requests that insert a transaction.')
+    parser.add_argument('--read-split', action='store_true',
+                        help='Serve portfolio and stats reads from a separate read engine.')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for the read/write mix.')
+    sys.exit(run(parser.parse_args()))
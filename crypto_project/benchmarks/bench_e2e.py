@@ -0,0 +1,282 @@
+"""
+End-to-end benchmark of the API's hot paths with regression baselines.
+
+Builds the app with create_app against an in-memory (or WAL-mode file)
+SQLite database and a local CoinGecko stand-in, then drives each scenario
+through the Flask test client or, with --socket, over real HTTP against a
+threaded werkzeug server. Reports throughput and p50/p95/p99 latency per
+scenario. --save-baseline writes the results as JSON. --baseline compares
+against a saved run and exits with status 1 when a scenario's p95 latency
+or throughput regresses by more than --threshold.
+
+Run from the crypto_project directory:
+
+    python -m benchmarks.bench_e2e --requests 500 --baseline benchmarks/baselines/e2e.json
+    python -m benchmarks.bench_e2e --requests 500 --save-baseline benchmarks/baselines/e2e.json
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from config import TestConfig
+
+SCENARIOS = ['price', 'trends', 'top-cryptos', 'compare', 'create-transaction', 'login']
+COINS = ['bitcoin', 'ethereum', 'solana', 'cardano', 'dogecoin']
+
+
+class CoinGeckoStandIn(BaseHTTPRequestHandler):
+    """Answers the CoinGecko endpoints the app uses with deterministic payloads."""
+
+    delay = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if self.delay:
+            time.sleep(self.delay)
+        if url.path == '/api/v3/simple/price':
+            ids = query.get('ids', '').split(',')
+            body = {crypto_id: {'usd': 100.0 + index} for index, crypto_id in enumerate(ids) if crypto_id}
+        elif re.fullmatch(r'/api/v3/coins/[^/]+/market_chart', url.path):
+            days = int(query.get('days', '7'))
+            now = int(time.time() * 1000)
+            body = {key: [[now - i * 86_400_000, 100.0 + i] for i in range(days + 1)]
+                    for key in ('prices', 'market_caps', 'total_volumes')}
+        elif url.path == '/api/v3/coins/markets':
+            ids = query['ids'].split(',') if 'ids' in query else COINS[:int(query.get('per_page', 10))]
+            body = [{'id': crypto_id, 'symbol': crypto_id[:3], 'current_price': 100.0 + index,
+                     'market_cap': 1e9, 'price_change_percentage_24h': 1.5} for index, crypto_id in enumerate(ids)]
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve_in_thread(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def build_app(db_mode: str, directory: str, upstream_url: str):
+    """Create the app against the chosen database and point it at the CoinGecko stand-in."""
+    from app import create_app
+    from crypto_project.db import db
+    from sqlalchemy import event
+
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{directory}/bench.db" if db_mode == 'wal' else 'sqlite:///:memory:'
+        LOG_RATE_LIMIT = 1.0
+        LOG_RATE_BURST = 1
+        PORTFOLIO_OPENING_CASH = 1e12  # Every benchmark buy is funded
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        if db_mode == 'wal':
+            @event.listens_for(db.engine, 'connect')
+            def _wal(dbapi_connection, connection_record):
+                dbapi_connection.execute('PRAGMA journal_mode=WAL')
+                dbapi_connection.execute('PRAGMA synchronous=NORMAL')
+            db.engine.dispose()
+    app.extensions['crypto_model'].base_url = upstream_url
+    return app
+
+
+def make_requests(app):
+    """Return {scenario: callable(send) -> status} using a user created for the run."""
+    client = app.test_client()
+    client.post('/api/create-account', json={'username': 'bench', 'password': 'bench-password'})
+    counter = iter(range(10 ** 9))
+
+    def coin():
+        return COINS[next(counter) % len(COINS)]
+
+    return {
+        'price': lambda send: send('GET', f'/api/crypto-price/{coin()}'),
+        'trends': lambda send: send('GET', f'/api/crypto-trends/{coin()}'),
+        'top-cryptos': lambda send: send('GET', '/api/top-cryptos'),
+        'compare': lambda send: send('GET', '/api/compare-cryptos/bitcoin/ethereum'),
+        'create-transaction': lambda send: send('POST', '/api/create-transaction', {
+            'user_id': 1, 'crypto_id': coin(), 'transaction_type': 'buy', 'quantity': 0.01, 'price': 100.0}),
+        'login': lambda send: send('POST', '/api/login', {'username': 'bench', 'password': 'bench-password'}),
+    }
+
+
+def client_sender(app):
+    client = app.test_client()
+
+    def send(method, path, body=None):
+        return client.open(path, method=method, json=body).status_code
+    return send
+
+
+def socket_sender(host, port):
+    local = threading.local()
+
+    def send(method, path, body=None):
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection(host, port, timeout=30)
+        payload = json.dumps(body) if body is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        connection.request(method, path, body=payload, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    return send
+
+
+def run_scenario(request, send, count: int, warmup: int, concurrency: int):
+    for _ in range(warmup):
+        request(send)
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        started = time.perf_counter()
+        status = request(send)
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(count)))
+    else:
+        for i in range(count):
+            one(i)
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': count,
+        'errors': errors,
+        'throughput_rps': round(count / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1e3, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1e3, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1e3, 3),
+    }
+
+
+def compare(results, baseline, threshold: float, min_delta_ms: float):
+    """
+    Return a list of regression messages for scenarios present in both runs.
+
+    A change only counts when it exceeds both the relative threshold and
+    ``min_delta_ms`` per request, so sub-millisecond paths do not flap.
+    """
+    regressions = []
+    for scenario, current in results.items():
+        previous = baseline.get('scenarios', {}).get(scenario)
+        if previous is None:
+            continue
+        if (current['p95_ms'] > previous['p95_ms'] * (1 + threshold)
+                and current['p95_ms'] - previous['p95_ms'] > min_delta_ms):
+            regressions.append(f"{scenario}: p95 {current['p95_ms']:.2f} ms vs baseline {previous['p95_ms']:.2f} ms")
+        slower_ms = 1e3 / current['throughput_rps'] - 1e3 / previous['throughput_rps']
+        if current['throughput_rps'] < previous['throughput_rps'] * (1 - threshold) and slower_ms > min_delta_ms:
+            regressions.append(f"{scenario}: {current['throughput_rps']:.0f} req/s vs baseline "
+                               f"{previous['throughput_rps']:.0f} req/s")
+        if current['errors'] > previous.get('errors', 0):
+            regressions.append(f"{scenario}: {current['errors']} errors vs baseline {previous.get('errors', 0)}")
+    return regressions
+
+
+def run(args) -> int:
+    from werkzeug.serving import make_server
+
+    CoinGeckoStandIn.delay = args.upstream_delay_ms / 1e3
+    upstream = ThreadingHTTPServer(('127.0.0.1', 0), CoinGeckoStandIn)
+    scenarios = args.scenarios or SCENARIOS
+
+    with tempfile.TemporaryDirectory() as directory, serve_in_thread(upstream):
+        app = build_app(args.db, directory, f"http://127.0.0.1:{upstream.server_port}/api/v3")
+        requests_by_scenario = make_requests(app)
+        if args.socket:
+            logging.getLogger('werkzeug').setLevel(logging.WARNING)
+            server = make_server('127.0.0.1', 0, app, threaded=True)
+            context = serve_in_thread(server)
+            send = socket_sender('127.0.0.1', server.server_port)
+        else:
+            context = nullcontext()
+            send = client_sender(app)
+        with context:
+            results = {scenario: run_scenario(requests_by_scenario[scenario], send, args.requests,
+                                              args.warmup, args.concurrency)
+                       for scenario in scenarios}
+
+    mode = 'socket' if args.socket else 'test-client'
+    print(f"mode={mode} db={args.db} requests={args.requests} concurrency={args.concurrency}")
+    print(f"{'scenario':<20}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for scenario, result in results.items():
+        print(f"{scenario:<20}{result['throughput_rps']:>10.1f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>8}")
+
+    document = {'mode': mode, 'db': args.db, 'requests': args.requests,
+                'concurrency': args.concurrency, 'scenarios': results}
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"FAIL: regressions beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"OK: no regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', nargs='*', choices=SCENARIOS, help='Scenarios to run (default: all).')
+    parser.add_argument('--requests', type=int, default=300, help='Measured requests per scenario.')
+    parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per scenario.')
+    parser.add_argument('--concurrency', type=int, default=1, help='Client threads (use with --socket --db wal).')
+    parser.add_argument('--socket', action='store_true', help='Send requests over HTTP to a threaded server.')
+    parser.add_argument('--db', choices=['memory', 'wal'], default='memory', help='In-memory or WAL-mode file SQLite.')
+    parser.add_argument('--upstream-delay-ms', type=float, default=0.0, help='Simulated CoinGecko latency.')
+    parser.add_argument('--baseline', help='Baseline JSON to compare against.')
+    parser.add_argument('--save-baseline', help='Write this run as a baseline JSON.')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative regression.')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='Ignore regressions smaller than this many milliseconds per request.')
+    sys.exit(run(parser.parse_args()))
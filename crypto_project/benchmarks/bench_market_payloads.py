@@ -0,0 +1,96 @@
+"""
+Measure bytes on the wire and serialization time of the market endpoint payloads.
+
+Builds CoinGecko-shaped /coins/markets objects (all of the fields the real
+API returns, including ROI and image URLs) and serializes a top-cryptos
+response in each combination of JSON provider (Flask's default vs orjson),
+field projection (full objects vs --fields) and format (records vs
+columnar). Reports raw and gzip-compressed sizes and the median time to
+build the response body.
+
+Run from the crypto_project directory:
+
+    python -m benchmarks.bench_market_payloads --coins 250
+    python -m benchmarks.bench_market_payloads --fields id,symbol,current_price,price_change_percentage_24h
+"""
+import argparse
+import gzip
+import statistics
+import sys
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from crypto_project.utils.json_provider import FastJSONProvider, orjson
+from crypto_project.utils.projection import format_records, parse_fields
+
+DEFAULT_FIELDS = 'id,symbol,current_price,market_cap,price_change_percentage_24h'
+
+
+def market_object(rank: int) -> dict:
+    """A /coins/markets entry with the same fields and value types as CoinGecko's."""
+    coin = f"coin-{rank}"
+    price = 1000.0 / rank
+    return {
+        'id': coin, 'symbol': coin[:3] + str(rank), 'name': f"Coin {rank}",
+        'image': f"https://coin-images.coingecko.com/coins/images/{rank}/large/{coin}.png?1696501400",
+        'current_price': price, 'market_cap': 1e12 / rank, 'market_cap_rank': rank,
+        'fully_diluted_valuation': 1.2e12 / rank, 'total_volume': 3e10 / rank,
+        'high_24h': price * 1.03, 'low_24h': price * 0.97, 'price_change_24h': price * 0.012,
+        'price_change_percentage_24h': 1.2345, 'market_cap_change_24h': 1e10 / rank,
+        'market_cap_change_percentage_24h': 1.1234, 'circulating_supply': 19e6 * rank,
+        'total_supply': 21e6 * rank, 'max_supply': 21e6 * rank, 'ath': price * 1.5,
+        'ath_change_percentage': -33.3, 'ath_date': '2024-03-14T07:10:36.635Z', 'atl': price / 1000,
+        'atl_change_percentage': 99000.5, 'atl_date': '2013-07-06T00:00:00.000Z',
+        'roi': {'times': 85.12, 'currency': 'btc', 'percentage': 8512.3} if rank % 3 == 0 else None,
+        'last_updated': '2024-11-20T12:00:00.000Z',
+    }
+
+
+def measure(provider, payload, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = provider.response(payload).get_data()
+        timings.append(time.perf_counter() - started)
+    return {
+        'bytes': len(body),
+        'gzip_bytes': len(gzip.compress(body, 6)),
+        'median_us': statistics.median(timings) * 1e6,
+    }
+
+
+def run(args) -> int:
+    app = Flask(__name__)
+    providers = {'default': DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers['orjson'] = FastJSONProvider(app)
+    else:
+        print("orjson is not installed; only the default provider is measured")
+
+    markets = [market_object(rank) for rank in range(1, args.coins + 1)]
+    fields = parse_fields(args.fields)
+    shapes = {
+        'full records': {'top_cryptos': markets},
+        'fields records': {'top_cryptos': format_records(markets, fields, 'records')},
+        'fields columnar': {'top_cryptos': format_records(markets, fields, 'columnar')},
+    }
+
+    print(f"coins={args.coins} fields={','.join(fields)} repeat={args.repeat}")
+    print(f"{'payload':<18}{'provider':<10}{'bytes':>10}{'gzip':>9}{'time us':>11}")
+    with app.app_context():
+        for shape, payload in shapes.items():
+            for name, provider in providers.items():
+                result = measure(provider, payload, args.repeat)
+                print(f"{shape:<18}{name:<10}{result['bytes']:>10}{result['gzip_bytes']:>9}"
+                      f"{result['median_us']:>11.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--coins', type=int, default=100, help='Market objects in the response.')
+    parser.add_argument('--fields', default=DEFAULT_FIELDS, help='Projection to compare against full objects.')
+    parser.add_argument('--repeat', type=int, default=200, help='Serializations per measurement.')
+    sys.exit(run(parser.parse_args()))
@@ -0,0 +1,97 @@
+"""
+Cold-start benchmark: import time of the app module and create_app() boot time.
+
+Each run starts a fresh interpreter with ``python -X importtime`` so nothing
+is shared between runs. It reports the median import and boot times, the
+heaviest imports of app, and exits with status 1 when the median cold
+start (import + boot) exceeds the budget. That makes it usable as a
+container startup check in CI.
+
+Run from the crypto_project directory:
+
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 1500
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+_BOOT_SCRIPT = """
+import time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app(app.ProductionConfig)
+booted = time.perf_counter()
+print(f"{(imported - started) * 1e3:.3f} {(booted - imported) * 1e3:.3f}")
+"""
+
+
+def parse_importtime(stderr: str):
+    """Return {module: cumulative microseconds} for the modules that ``app`` imports directly."""
+    # importtime lists a module's imports before the module itself
+    children = defaultdict(int)
+    for line in stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if not match:
+            continue
+        depth = len(match.group(3))
+        if depth == 1:
+            if match.group(4) == "app":
+                return children
+            children = defaultdict(int)
+        elif depth == 3:
+            children[match.group(4)] += int(match.group(2))
+    return {}
+
+
+def run_once(env):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", _BOOT_SCRIPT],
+                            capture_output=True, text=True, env=env, check=True)
+    import_ms, boot_ms = (float(value) for value in result.stdout.split()[-2:])
+    return import_ms, boot_ms, parse_importtime(result.stderr)
+
+
+def run(runs: int, budget_ms: float, top: int) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{directory}/startup.db")
+        # The first boot creates the schema; later boots only check it
+        _, first_boot_ms, _ = run_once(env)
+        samples = [run_once(env) for _ in range(runs)]
+
+    import_ms = statistics.median(sample[0] for sample in samples)
+    boot_ms = statistics.median(sample[1] for sample in samples)
+    modules = defaultdict(list)
+    for _, _, imports in samples:
+        for name, micros in imports.items():
+            modules[name].append(micros / 1e3)
+
+    print(f"runs={runs}")
+    print(f"import app: median={import_ms:.1f} ms")
+    print(f"create_app: median={boot_ms:.1f} ms (first boot with schema creation: {first_boot_ms:.1f} ms)")
+    print("heaviest imports of app (median cumulative ms):")
+    ranked = sorted(((statistics.median(values), name) for name, values in modules.items()), reverse=True)
+    for millis, name in ranked[:top]:
+        print(f"  {millis:8.1f}  {name}")
+
+    total = import_ms + boot_ms
+    print(f"cold start: {total:.1f} ms (budget {budget_ms:.0f} ms)")
+    if total > budget_ms:
+        print("FAIL: cold start exceeds budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1500.0, help='Maximum median import + boot time.')
+    parser.add_argument('--top', type=int, default=10, help='Number of heaviest imports to list.')
+    args = parser.parse_args()
+    sys.exit(run(args.runs, args.budget_ms, args.top))
@@ -0,0 +1,89 @@
+"""
+Fan-out benchmark for the in-process price pub/sub behind /api/stream/prices.
+
+Starts thousands of subscriber threads (a fraction of them deliberately slow),
+publishes a burst of price updates and reports publish cost, delivery latency
+and how many intermediate updates slow consumers dropped.
+
+Run from the crypto_project directory:
+
+    python -m benchmarks.bench_stream_fanout --subscribers 2000 --updates 200
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from crypto_project.utils.market_stream import PubSub, price_topic
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(subscribers: int, updates: int, slow_fraction: float, slow_delay: float, interval: float) -> None:
+    pubsub = PubSub()
+    topic = price_topic("bitcoin")
+    latencies = []
+    latencies_lock = threading.Lock()
+    received = [0] * subscribers
+    stop = threading.Event()
+
+    def consume(index: int, slow: bool) -> None:
+        subscription = subscription_list[index]
+        local = []
+        while not stop.is_set():
+            for _, data in subscription.get(timeout=0.1):
+                local.append(time.perf_counter() - data['sent'])
+                received[index] += 1
+            if slow:
+                time.sleep(slow_delay)
+        with latencies_lock:
+            latencies.extend(local)
+        pubsub.unsubscribe(subscription)
+
+    subscription_list = [pubsub.subscribe([topic]) for _ in range(subscribers)]
+    slow_count = int(subscribers * slow_fraction)
+    threads = [threading.Thread(target=consume, args=(i, i < slow_count), daemon=True) for i in range(subscribers)]
+    for thread in threads:
+        thread.start()
+
+    publish_times = []
+    for update in range(updates):
+        started = time.perf_counter()
+        pubsub.publish(topic, 'price', {'price_usd': float(update), 'sent': time.perf_counter()})
+        publish_times.append(time.perf_counter() - started)
+        time.sleep(interval)
+
+    time.sleep(max(0.5, slow_delay * 2))
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    dropped = sum(subscription.dropped for subscription in subscription_list)
+    fast_received = received[slow_count:]
+    slow_received = received[:slow_count]
+    print(f"subscribers={subscribers} (slow={slow_count}) updates={updates}")
+    print(f"publish per update: mean={statistics.mean(publish_times) * 1e3:.3f} ms "
+          f"p99={percentile(publish_times, 99) * 1e3:.3f} ms")
+    print(f"delivery latency: p50={percentile(latencies, 50) * 1e3:.2f} ms "
+          f"p95={percentile(latencies, 95) * 1e3:.2f} ms p99={percentile(latencies, 99) * 1e3:.2f} ms")
+    if fast_received:
+        print(f"fast consumers received on average {statistics.mean(fast_received):.1f}/{updates} updates")
+    if slow_received:
+        print(f"slow consumers received on average {statistics.mean(slow_received):.1f}/{updates} updates")
+    print(f"updates conflated away (drop-to-latest): {dropped}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--subscribers', type=int, default=2000)
+    parser.add_argument('--updates', type=int, default=200)
+    parser.add_argument('--slow-fraction', type=float, default=0.1)
+    parser.add_argument('--slow-delay', type=float, default=0.05, help='Seconds a slow consumer spends per batch.')
+    parser.add_argument('--interval', type=float, default=0.005, help='Seconds between published updates.')
+    args = parser.parse_args()
+    run(args.subscribers, args.updates, args.slow_fraction, args.slow_delay, args.interval)
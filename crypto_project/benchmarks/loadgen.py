@@ -0,0 +1,353 @@
+"""
+Scenario-driven load generator for a running API server.
+
+A scenario file (JSON) describes the virtual users to provision and a list
+of phases, each with a duration, a target arrival rate and a weighted mix
+of requests. Users are created through /api/bulk-create-accounts and logged
+in through /api/login. Each user can optionally be seeded with transactions
+through /api/create-transaction. Each phase then sends requests open-loop at
+the target rate from a thread pool or an asyncio event loop. Latency is
+measured from each request's scheduled start, so a server that falls behind
+shows up as latency instead of silently lowering the offered load.
+
+Request paths and JSON bodies may use the placeholders {username},
+{password}, {user_id}, {token} and {coin}; a value that is exactly one
+placeholder keeps its type (e.g. an integer user ID).
+
+Run from the crypto_project directory against a running server:
+
+    python -m benchmarks.loadgen benchmarks/scenarios/market_open.json --url http://127.0.0.1:5000
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+@dataclass
+class RequestSpec:
+    name: str
+    method: str
+    path: str
+    weight: float = 1.0
+    json: Optional[object] = None
+    auth: bool = False
+
+
+@dataclass
+class Phase:
+    name: str
+    duration: float
+    rps: float
+    mix: List[RequestSpec]
+    arrival: str = 'constant'  # or 'poisson'
+
+
+@dataclass
+class Scenario:
+    name: str
+    users: int
+    phases: List[Phase]
+    user_prefix: str = 'load'
+    password: str = 'load-password'
+    seed_transactions: int = 0
+    coins: List[str] = field(default_factory=lambda: ['bitcoin', 'ethereum'])
+
+    @classmethod
+    def load(cls, path: str) -> 'Scenario':
+        with open(path) as f:
+            data = json.load(f)
+        phases = [
+            Phase(name=phase['name'], duration=float(phase['duration']), rps=float(phase['rps']),
+                  arrival=phase.get('arrival', 'constant'),
+                  mix=[RequestSpec(**request) for request in phase['mix']])
+            for phase in data.pop('phases')
+        ]
+        return cls(phases=phases, **data)
+
+
+@dataclass
+class VirtualUser:
+    username: str
+    password: str
+    user_id: Optional[int] = None
+    token: Optional[str] = None
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+    def record(self, status: int, latency: float) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not (200 <= status < 300 or status == 304):  # 0 means the request itself failed
+            self.errors += 1
+
+
+def substitute(value, context: Dict[str, object]):
+    """Fill placeholders in a path or JSON body from a user's context."""
+    if isinstance(value, str):
+        whole = _PLACEHOLDER.fullmatch(value)
+        if whole:
+            return context[whole.group(1)]
+        return _PLACEHOLDER.sub(lambda match: str(context[match.group(1)]), value)
+    if isinstance(value, dict):
+        return {key: substitute(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute(item, context) for item in value]
+    return value
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def arrival_times(phase: Phase, rng: random.Random) -> List[float]:
+    """Offsets (seconds from the phase start) at which requests are sent."""
+    times, offset = [], 0.0
+    while True:
+        offset += rng.expovariate(phase.rps) if phase.arrival == 'poisson' else 1.0 / phase.rps
+        if offset >= phase.duration:
+            return times
+        times.append(offset)
+
+
+class ThreadClient:
+    """Blocking HTTP client with one keep-alive connection per thread."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host, self.port, self.timeout = host, port, timeout
+        self._local = threading.local()
+
+    def send(self, method: str, path: str, body=None, token: Optional[str] = None) -> Tuple[int, bytes]:
+        headers = {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        for attempt in range(2):
+            connection = getattr(self._local, 'connection', None)
+            if connection is None:
+                connection = self._local.connection = http.client.HTTPConnection(
+                    self.host, self.port, timeout=self.timeout)
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                return response.status, response.read()
+            except (OSError, http.client.HTTPException):
+                # Stale keep-alive connection: reconnect once, then report a failure
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    return 0, b''
+        return 0, b''
+
+
+async def async_send(host: str, port: int, method: str, path: str, body=None,
+                     token: Optional[str] = None, timeout: float = 30.0) -> int:
+    """Send one HTTP/1.1 request on a fresh connection from the event loop; returns the status (0 on failure)."""
+    payload = json.dumps(body).encode() if body is not None else b''
+    lines = [f"{method} {path} HTTP/1.1", f"Host: {host}:{port}", "Connection: close",
+             f"Content-Length: {len(payload)}"]
+    if body is not None:
+        lines.append("Content-Type: application/json")
+    if token:
+        lines.append(f"Authorization: Bearer {token}")
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        try:
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), timeout)
+            await asyncio.wait_for(reader.read(), timeout)
+            return int(status_line.split()[1])
+        finally:
+            writer.close()
+    except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+        return 0
+
+
+def setup_users(client: ThreadClient, scenario: Scenario, concurrency: int) -> List[VirtualUser]:
+    """Create, log in and optionally seed the scenario's users through the public API."""
+    users = [VirtualUser(f"{scenario.user_prefix}{i}", scenario.password) for i in range(scenario.users)]
+    status, _ = client.send('POST', '/api/bulk-create-accounts',
+                            {'users': [{'username': u.username, 'password': u.password} for u in users]})
+    print(f"setup: bulk-create-accounts -> {status}")
+
+    def login(user: VirtualUser) -> int:
+        status, body = client.send('POST', '/api/login', {'username': user.username, 'password': user.password})
+        if status != 200:
+            return status
+        user.token = json.loads(body)['token']
+        status, body = client.send('GET', '/api/session', token=user.token)
+        if status == 200:
+            user.user_id = json.loads(body)['user_id']
+        return status
+
+    def seed(user: VirtualUser) -> List[int]:
+        return [client.send('POST', '/api/create-transaction', {
+            'user_id': user.user_id, 'crypto_id': random.choice(scenario.coins),
+            'transaction_type': 'buy', 'quantity': 0.01, 'price': 100.0})[0]
+            for _ in range(scenario.seed_transactions)]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        login_statuses = list(pool.map(login, users))
+        ready = [user for user in users if user.user_id is not None]
+        seed_statuses = [status for statuses in pool.map(seed, ready) for status in statuses]
+    print(f"setup: {len(ready)}/{len(users)} users logged in; "
+          f"{sum(1 for s in login_statuses if s != 200)} login failures")
+    if seed_statuses:
+        seeded = sum(1 for s in seed_statuses if 200 <= s < 300)
+        print(f"setup: seeded {seeded}/{len(seed_statuses)} transactions")
+        if seeded < len(seed_statuses):
+            print(f"WARNING: seeding failed with statuses {sorted(set(seed_statuses) - set(range(200, 300)))}")
+    return ready
+
+
+def _pick(phase: Phase, users: List[VirtualUser], coins: List[str], rng: random.Random):
+    spec = rng.choices(phase.mix, weights=[request.weight for request in phase.mix])[0]
+    user = rng.choice(users) if users else VirtualUser('anonymous', '')
+    context = {'username': user.username, 'password': user.password, 'user_id': user.user_id,
+               'token': user.token, 'coin': rng.choice(coins)}
+    return spec, substitute(spec.path, context), substitute(spec.json, context), user.token if spec.auth else None
+
+
+def run_phase_threads(client: ThreadClient, phase: Phase, users, coins, concurrency, rng, stats):
+    lock = threading.Lock()
+
+    def task(spec, path, body, token, scheduled):
+        status, _ = client.send(spec.method, path, body, token)
+        latency = time.perf_counter() - scheduled
+        with lock:
+            stats.setdefault(spec.name, EndpointStats()).record(status, latency)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for offset in arrival_times(phase, rng):
+            scheduled = started + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(task, *_pick(phase, users, coins, rng), scheduled)
+    return time.perf_counter() - started
+
+
+async def _run_phase_async(host, port, phase: Phase, users, coins, concurrency, rng, stats, timeout):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def task(spec, path, body, token, scheduled):
+        async with semaphore:
+            status = await async_send(host, port, spec.method, path, body, token, timeout)
+        stats.setdefault(spec.name, EndpointStats()).record(status, time.perf_counter() - scheduled)
+
+    started = time.perf_counter()
+    tasks = []
+    for offset in arrival_times(phase, rng):
+        scheduled = started + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(task(*_pick(phase, users, coins, rng), scheduled)))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - started
+
+
+def report(phase_name: str, elapsed: float, target_rps: float, stats: Dict[str, EndpointStats],
+           max_error_rate: float = 1.0) -> Dict:
+    total = sum(len(s.latencies) for s in stats.values())
+    errors = sum(s.errors for s in stats.values())
+    print(f"\nphase '{phase_name}': {total} requests in {elapsed:.1f} s "
+          f"({total / elapsed:.1f} req/s achieved, {target_rps:.1f} target), "
+          f"error rate {errors / total if total else 0:.1%}")
+    print(f"  {'endpoint':<24}{'count':>8}{'req/s':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    summary = {}
+    for name, s in sorted(stats.items()):
+        row = {
+            'count': len(s.latencies),
+            'rps': round(len(s.latencies) / elapsed, 2),
+            'error_rate': round(s.errors / len(s.latencies), 4) if s.latencies else 0.0,
+            'statuses': {str(status): count for status, count in sorted(s.statuses.items())},
+            'p50_ms': round(percentile(s.latencies, 50) * 1e3, 2),
+            'p95_ms': round(percentile(s.latencies, 95) * 1e3, 2),
+            'p99_ms': round(percentile(s.latencies, 99) * 1e3, 2),
+        }
+        summary[name] = row
+        print(f"  {name:<24}{row['count']:>8}{row['rps']:>9.1f}{s.errors:>8}"
+              f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+    for name, row in sorted(summary.items()):
+        # A failing mix entry measures error pages, not the endpoint; flag it even if the phase total passes
+        if row['error_rate'] > max_error_rate:
+            print(f"  WARNING: {name} error rate {row['error_rate']:.1%} (statuses {row['statuses']})")
+    return {'elapsed_s': round(elapsed, 3), 'target_rps': target_rps, 'requests': total,
+            'errors': errors, 'endpoints': summary}
+
+
+def run(args) -> int:
+    scenario = Scenario.load(args.scenario)
+    url = urlparse(args.url)
+    host, port = url.hostname or '127.0.0.1', url.port or 80
+    client = ThreadClient(host, port, args.timeout)
+    rng = random.Random(args.seed)
+
+    users = [] if args.skip_setup else setup_users(client, scenario, min(args.concurrency, 32))
+    results = {'scenario': scenario.name, 'engine': args.engine, 'phases': {}}
+    for phase in scenario.phases:
+        phase.duration *= args.duration_scale
+        phase.rps *= args.rate_scale
+        stats: Dict[str, EndpointStats] = {}
+        if args.engine == 'asyncio':
+            elapsed = asyncio.run(_run_phase_async(host, port, phase, users, scenario.coins,
+                                                   args.concurrency, rng, stats, args.timeout))
+        else:
+            elapsed = run_phase_threads(client, phase, users, scenario.coins, args.concurrency, rng, stats)
+        results['phases'][phase.name] = report(phase.name, elapsed, phase.rps, stats, args.max_error_rate)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"\nWrote results to {args.json}")
+    total = sum(phase['requests'] for phase in results['phases'].values())
+    errors = sum(phase['errors'] for phase in results['phases'].values())
+    if total and errors / total > args.max_error_rate:
+        print(f"\nFAILED: {errors}/{total} requests were not 2xx/304 "
+              f"({errors / total:.1%} > --max-error-rate {args.max_error_rate:.1%})")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('scenario', help='Scenario JSON file.')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='Base URL of the running server.')
+    parser.add_argument('--engine', choices=['thread', 'asyncio'], default='thread')
+    parser.add_argument('--concurrency', type=int, default=64, help='Maximum requests in flight.')
+    parser.add_argument('--duration-scale', type=float, default=1.0, help='Multiply every phase duration.')
+    parser.add_argument('--rate-scale', type=float, default=1.0, help='Multiply every phase arrival rate.')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds.')
+    parser.add_argument('--skip-setup', action='store_true', help='Do not create or log in users.')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for request mixes and arrivals.')
+    parser.add_argument('--json', help='Write per-phase results to this file.')
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help='Exit with status 1 when the overall share of non-2xx/304 responses is higher; '
+                             'endpoints above it are flagged in each phase report.')
+    sys.exit(run(parser.parse_args()))
@@ -1,17 +1,99 @@
 import os
 
+from dotenv import load_dotenv
+
+# Load environment variables from .env file before the config classes read them
+load_dotenv()
+
 class ProductionConfig():
     """Production configuration."""
     DEBUG = False
-    SQLALCHEMY_TRACK_MODIFICATIONS = True  # This would almost universally be false in a Flask app
-                                           # But we are doing unnecessarily complicated Redis
-                                           # write-throughs
-    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', "DATABASE_URL=sqlite:////app/db/app.db")  # Production database URI from environment
+    # Model changes reach the user cache through explicit write-throughs, so the
+    # per-object modification signals are not needed
+    SQLALCHEMY_TRACK_MODIFICATIONS = os.getenv('SQLALCHEMY_TRACK_MODIFICATIONS', 'false').lower() == 'true'
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL') or "sqlite:////app/db/app.db"  # Production database URI from environment
+    # Engine performance profile: default, throughput or durable (see utils/db_profiles.py)
+    DB_PROFILE = os.getenv('DB_PROFILE', 'throughput')
+    DB_POOL_SIZE = int(os.environ['DB_POOL_SIZE']) if os.getenv('DB_POOL_SIZE') else None  # Overrides the profile
+    DB_MAX_OVERFLOW = int(os.environ['DB_MAX_OVERFLOW']) if os.getenv('DB_MAX_OVERFLOW') else None
+    # Read endpoints use a separate engine: DB_READ_URL (a replica) or read-only connections to the same file
+    DB_READ_SPLIT = os.getenv('DB_READ_SPLIT', 'true').lower() == 'true'
+    DB_READ_URL = os.getenv('DB_READ_URL')
+    # Opt-in SQL profiling: logs per-request statement counts, N+1 patterns and slow queries
+    SQL_PROFILING = os.getenv('SQL_PROFILING', 'false').lower() == 'true'
+    SQL_PROFILE_SLOW_MS = float(os.getenv('SQL_PROFILE_SLOW_MS', '100'))
+    SQL_PROFILE_REPEAT_THRESHOLD = int(os.getenv('SQL_PROFILE_REPEAT_THRESHOLD', '5'))
+    SQL_PROFILE_HEADER = os.getenv('SQL_PROFILE_HEADER', 'true').lower() == 'true'
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'  # Serve /api/metrics
+    FAST_JSON = os.getenv('FAST_JSON', 'true').lower() == 'true'  # Serialize responses with orjson when installed
+    # ETag / Cache-Control / 304 handling for GET endpoints, with a cache of serialized bodies
+    HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+    HTTP_BODY_CACHE_SIZE = int(os.getenv('HTTP_BODY_CACHE_SIZE', '512'))
+    HTTP_CACHE_MARKET_MAX_AGE = int(os.getenv('HTTP_CACHE_MARKET_MAX_AGE', '30'))
+    # gzip (or brotli, when installed) for responses above COMPRESSION_MIN_SIZE bytes
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', '6'))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+    COMPRESSION_CACHE_SIZE = int(os.getenv('COMPRESSION_CACHE_SIZE', '256'))
+    # Upstream calls: per-request timeout, and the per-call limit when multi-call routes fan out concurrently
+    UPSTREAM_TIMEOUT = float(os.getenv('UPSTREAM_TIMEOUT', '10'))
+    UPSTREAM_FANOUT_TIMEOUT = float(os.getenv('UPSTREAM_FANOUT_TIMEOUT', '5'))
+    DASHBOARD_MAX_IDS = int(os.getenv('DASHBOARD_MAX_IDS', '10'))
+    # Logging: LOG_LEVEL is read by configure_logger; price fetch messages are rate limited per second
+    LOG_RATE_LIMIT = float(os.getenv('LOG_RATE_LIMIT', '5'))
+    LOG_RATE_BURST = int(os.getenv('LOG_RATE_BURST', '20'))
+    CREATE_DB = os.getenv('CREATE_DB', 'true').lower() == 'true'  # Create missing tables on startup
+    SECRET_KEY = os.getenv('SECRET_KEY') or os.urandom(32).hex()  # Signs session tokens; set it to share tokens across processes
+    SESSION_TOKEN_MAX_AGE = int(os.getenv('SESSION_TOKEN_MAX_AGE', '3600'))
+    SESSION_TOKEN_CACHE_SIZE = int(os.getenv('SESSION_TOKEN_CACHE_SIZE', '10000'))
+    SESSION_REQUIRE_TOTP = os.getenv('SESSION_REQUIRE_TOTP', 'false').lower() == 'true'
+    # Logouts are stored in the database; each process reloads them this often (seconds)
+    SESSION_REVOCATION_SYNC_INTERVAL = float(os.getenv('SESSION_REVOCATION_SYNC_INTERVAL', '5'))
+    # User lookup cache; set USER_CACHE_REDIS_URL to share it between processes
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+    USER_CACHE_REDIS_URL = os.getenv('USER_CACHE_REDIS_URL')
+    # Always finite: an invalidation missed by this process (another worker, a racing fill) ages out
+    USER_CACHE_LOCAL_TTL = float(os.getenv('USER_CACHE_LOCAL_TTL', '5'))
+    # Cash every user starts with; portfolios are rebuilt from transactions on top of it
+    PORTFOLIO_OPENING_CASH = float(os.getenv('PORTFOLIO_OPENING_CASH', '10000'))
+    BULK_PROVISION_CHUNK_SIZE = int(os.getenv('BULK_PROVISION_CHUNK_SIZE', '500'))
+    BULK_PROVISION_WORKERS = int(os.getenv('BULK_PROVISION_WORKERS', '4'))
+    TOTP_ISSUER = os.getenv('TOTP_ISSUER', 'CryptoApp')
+    QR_CACHE_SIZE = int(os.getenv('QR_CACHE_SIZE', '1024'))
+    QR_RENDER_WORKERS = int(os.getenv('QR_RENDER_WORKERS', '2'))
+    # Server-sent event streams: one upstream poll per interval for all subscribers
+    STREAM_POLL_INTERVAL = float(os.getenv('STREAM_POLL_INTERVAL', '10'))
+    STREAM_HEARTBEAT_SECONDS = float(os.getenv('STREAM_HEARTBEAT_SECONDS', '15'))
+    STREAM_MAX_QUEUE = int(os.getenv('STREAM_MAX_QUEUE', '100'))
+    # Seconds between reloads of the pending price alert index, to pick up alerts created by other processes
+    PRICE_ALERT_SYNC_INTERVAL = float(os.getenv('PRICE_ALERT_SYNC_INTERVAL', '5'))
+    # Downsampled /api/historical-data charts (?points=) are cached per coin, range and size
+    CHART_CACHE_SIZE = int(os.getenv('CHART_CACHE_SIZE', '256'))
+    CHART_CACHE_TTL = float(os.getenv('CHART_CACHE_TTL', '60'))
+    # Multi-process serving (serve.py): shared-memory price snapshot
+    PRICE_SNAPSHOT_NAME = None  # Set by serve.py for its workers
+    PRICE_SNAPSHOT_CAPACITY = int(os.getenv('PRICE_SNAPSHOT_CAPACITY', '256'))
+    PRICE_SNAPSHOT_MAX_AGE = float(os.getenv('PRICE_SNAPSHOT_MAX_AGE', '60'))
+    PRICE_SNAPSHOT_IDS = os.getenv('PRICE_SNAPSHOT_IDS', 'bitcoin,ethereum,tether,binancecoin,solana,ripple,cardano,dogecoin')
+    PRICE_SNAPSHOT_INTERVAL = float(os.getenv('PRICE_SNAPSHOT_INTERVAL', '10'))
+    # Group commit: batch transaction inserts from concurrent requests into one DB commit
+    TRANSACTION_GROUP_COMMIT = os.getenv('TRANSACTION_GROUP_COMMIT', 'false').lower() == 'true'
+    GROUP_COMMIT_MAX_ROWS = int(os.getenv('GROUP_COMMIT_MAX_ROWS', '100'))
+    GROUP_COMMIT_MAX_WAIT_MS = float(os.getenv('GROUP_COMMIT_MAX_WAIT_MS', '5'))
 
 class TestConfig():
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'  # Use in-memory database for tests
-    os.environ['DATABASE_URL'] = SQLALCHEMY_DATABASE_URI
+    TRANSACTION_GROUP_COMMIT = False
+    SECRET_KEY = 'test-secret-key'
+    SESSION_TOKEN_MAX_AGE = 3600
+    SESSION_TOKEN_CACHE_SIZE = 100
+    SESSION_REQUIRE_TOTP = False
+    USER_CACHE_SIZE = 100
+    USER_CACHE_REDIS_URL = None
+    STREAM_POLL_INTERVAL = 0  # Tests publish prices directly
+    STREAM_HEARTBEAT_SECONDS = 0.05
 
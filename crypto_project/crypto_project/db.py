@@ -1,3 +1,135 @@
-from flask_sqlalchemy import SQLAlchemy
-
-db = SQLAlchemy()
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Iterator, Optional
+
+from flask import current_app, has_app_context
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.dml import UpdateBase
+
+from crypto_project.utils.db_profiles import is_memory_database
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+_read_only: ContextVar[bool] = ContextVar('db_read_only', default=False)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends read-only work to the read engine.
+
+    Inside ``use_read_engine`` (or a view decorated with ``read_only``),
+    SELECTs run on the read engine when one is configured. Flushes and
+    INSERT/UPDATE/DELETE statements always go to the primary, so a read
+    endpoint that writes opportunistically (e.g. saving a snapshot) still
+    works.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and _read_only.get() and not self._flushing
+                and not isinstance(clause, UpdateBase)):
+            read_engine = get_read_engine()
+            if read_engine is not None:
+                return read_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+def read_bind_uri(primary_uri: Optional[str], replica_uri: Optional[str] = None) -> Optional[str]:
+    """
+    Return the URI for the read engine, or None if reads cannot be split.
+
+    Args:
+        primary_uri (str): The primary database URI.
+        replica_uri (str, optional): A replica database URL to read from.
+
+    Returns:
+        str: The replica URL if given, otherwise the primary URI when it is a
+        file database (read through separate WAL connections). None for
+        in-memory databases, which cannot be shared between engines.
+    """
+    if replica_uri:
+        return replica_uri
+    if not primary_uri or is_memory_database(primary_uri):
+        return None
+    return primary_uri
+
+
+def create_read_engine(replica_uri: Optional[str] = None, **engine_options) -> Optional[Engine]:
+    """
+    Create the read engine for the current application's database.
+
+    Must be called inside an application context, before the engine is used.
+    Connections to the primary's own SQLite file are opened with
+    ``query_only``, so they can never take the write lock.
+
+    Args:
+        replica_uri (str, optional): A replica database URL to read from.
+        **engine_options: Keyword arguments for create_engine.
+
+    Returns:
+        Engine: The read engine, or None if reads cannot be split.
+    """
+    read_uri = read_bind_uri(db.engine.url.render_as_string(hide_password=False), replica_uri)
+    if read_uri is None:
+        return None
+    engine = create_engine(read_uri, **engine_options)
+    if engine.dialect.name == 'sqlite' and not replica_uri:
+        @event.listens_for(engine, 'connect')
+        def _query_only(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA query_only=ON")
+    return engine
+
+
+def get_read_engine() -> Optional[Engine]:
+    """Return the current application's read engine, if reads are split."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('read_engine')
+
+
+@contextmanager
+def use_read_engine() -> Iterator[None]:
+    """Run the queries in a block on the read engine, if one is configured."""
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+def read_only(view):
+    """Route a view's (sync or async) queries to the read engine, so long scans never hold up writes."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with use_read_engine():
+            return current_app.ensure_sync(view)(*args, **kwargs)
+    return wrapper
+
+
+def ensure_schema() -> bool:
+    """
+    Create any missing tables. Must be called inside an application context.
+
+    Checks the database catalog first, so booting against an existing
+    database costs one metadata query instead of a CREATE TABLE pass.
+
+    Returns:
+        bool: True if tables were created, False if the schema was already in place.
+    """
+    existing = set(inspect(db.engine).get_table_names())
+    missing = [table for table in db.metadata.sorted_tables if table.name not in existing]
+    if not missing:
+        return False
+    logger.info("Creating missing tables: %s", ", ".join(table.name for table in missing))
+    db.metadata.create_all(db.engine, tables=missing)
+    return True
@@ -1,13 +1,15 @@
-import hashlib
 import logging
-import os
-import pyotp
-from datetime import datetime
+import time
 from typing import Dict, List, Optional
-import requests
-from sqlalchemy.exc import IntegrityError
-from crypto_project.db import db
+from flask import current_app, has_app_context
+from crypto_project.models.price_alert_model import PriceAlert
+from crypto_project.utils.fanout import call_timeout
+from crypto_project.utils.lazy_import import lazy_import
 from crypto_project.utils.logger import configure_logger
+from crypto_project.utils.metrics import get_metrics
+
+# The HTTP client is only loaded when the first upstream request is made
+requests = lazy_import("requests")
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
@@ -17,8 +19,53 @@ class CryptoDataModel:
     def __init__(self):
         self.base_url = "https://api.coingecko.com/api/v3"
         self.supported_intervals = ["1h", "24h", "7d", "30d", "1y"]
+        # Optional SharedPriceSnapshot filled by a separate ingester process
+        self.price_snapshot = None
+        self.snapshot_max_age = 60.0
+        # Seconds to wait for CoinGecko before giving up on a request
+        self.timeout = 10.0
         logger.info("Initialized CryptoDataModel")
 
+    def _get(self, endpoint: str, params: Dict, label: Optional[str] = None):
+        """
+        Send a GET request to the CoinGecko API, recording its latency and status.
+
+        Args:
+            endpoint (str): The API path, e.g. '/simple/price'.
+            params (dict): Query parameters.
+            label (str, optional): Metrics label for paths that embed IDs (defaults to the path).
+
+        Returns:
+            requests.Response: The response.
+
+        Raises:
+            requests.RequestException: If the request fails.
+        """
+        metrics = get_metrics()
+        timeout = call_timeout(self.timeout)  # Shorter inside a fan-out, so abandoned calls end with it
+        if metrics is None:
+            return requests.get(f"{self.base_url}{endpoint}", params=params, timeout=timeout)
+        label = label or endpoint
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = requests.get(f"{self.base_url}{endpoint}", params=params, timeout=timeout)
+            status = response.status_code
+            return response
+        finally:
+            metrics.upstream_duration.observe(time.perf_counter() - started, endpoint=label)
+            metrics.upstream_requests.inc(endpoint=label, status=status)
+
+    def _snapshot_price(self, crypto_id: str) -> Optional[float]:
+        """Return a fresh price from the shared snapshot, or None if there is none."""
+        if self.price_snapshot is None:
+            return None
+        price = self.price_snapshot.get(crypto_id, max_age=self.snapshot_max_age)
+        metrics = get_metrics()
+        if metrics is not None:
+            metrics.price_cache.inc(result="miss" if price is None else "hit")
+        return price
+
     def get_crypto_price(self, crypto_id: str) -> Optional[float]:
         """
         Get the current price of a specific cryptocurrency in USD.
@@ -29,25 +76,69 @@ class CryptoDataModel:
         Returns:
             float: Current price in USD, or None if the request fails.
         """
+        price = self._snapshot_price(crypto_id)
+        if price is not None:
+            return price
+
         endpoint = f"/simple/price"
         params = {
             "ids": crypto_id,
             "vs_currencies": "usd"
         }
         try:
-            logger.info(f"Requesting price for {crypto_id} from CoinGecko API")
-            response = requests.get(f"{self.base_url}{endpoint}", params=params)
+            logger.info("Requesting price for %s from CoinGecko API", crypto_id)
+            response = self._get(endpoint, params)
             response.raise_for_status()
             data = response.json()
             if crypto_id in data and "usd" in data[crypto_id]:
-                logger.info(f"Fetched price for {crypto_id}: {data[crypto_id]['usd']}")
+                logger.info("Fetched price for %s: %s", crypto_id, data[crypto_id]['usd'])
                 return float(data[crypto_id]["usd"])
             else:
                 raise ValueError(f"Unexpected response structure: {data}")
         except (requests.RequestException, ValueError) as e:
-            logger.error(f"Failed to fetch price for {crypto_id}: {e}")
+            logger.error("Failed to fetch price for %s: %s", crypto_id, e)
             return None
 
+    def get_crypto_prices(self, crypto_ids: List[str]) -> Dict[str, float]:
+        """
+        Get the current USD prices of several cryptocurrencies in one request.
+
+        Prices found in the shared snapshot are served from it; only the
+        remaining IDs are requested from CoinGecko.
+
+        Args:
+            crypto_ids (List[str]): The IDs of the cryptocurrencies.
+
+        Returns:
+            dict: Prices keyed by cryptocurrency ID; IDs without a price are omitted.
+        """
+        prices = {}
+        for crypto_id in crypto_ids:
+            price = self._snapshot_price(crypto_id)
+            if price is not None:
+                prices[crypto_id] = price
+        missing = [crypto_id for crypto_id in crypto_ids if crypto_id not in prices]
+        if not missing:
+            return prices
+        endpoint = "/simple/price"
+        params = {
+            "ids": ",".join(missing),
+            "vs_currencies": "usd"
+        }
+        try:
+            logger.info("Requesting prices for %s cryptocurrencies from CoinGecko API", len(missing))
+            response = self._get(endpoint, params)
+            response.raise_for_status()
+            data = response.json()
+            prices.update({
+                crypto_id: float(data[crypto_id]["usd"])
+                for crypto_id in missing
+                if crypto_id in data and "usd" in data[crypto_id]
+            })
+        except (requests.RequestException, ValueError) as e:
+            logger.error("Failed to fetch prices for %s: %s", missing, e)
+        return prices
+
     def get_price_trends(self, crypto_id: str, days: str = "7") -> Optional[Dict]:
         """
         Get price trends for a specific cryptocurrency.
@@ -66,17 +157,17 @@ class CryptoDataModel:
             "interval": "daily"
         }
         try:
-            logger.info(f"Requesting price trends for {crypto_id} over {days} days")
-            response = requests.get(f"{self.base_url}{endpoint}", params=params)
+            logger.info("Requesting price trends for %s over %s days", crypto_id, days)
+            response = self._get(endpoint, params, label="/coins/{id}/market_chart")
             response.raise_for_status()
             data = response.json()
             if "prices" in data:
-                logger.info(f"Fetched price trends for {crypto_id}")
+                logger.info("Fetched price trends for %s", crypto_id)
                 return data
-            logger.error(f"Unexpected structure for price trends: {data}")
+            logger.error("Unexpected structure for price trends: %s", data)
             return None
         except requests.RequestException as e:
-            logger.error(f"Request failed for price trends of {crypto_id}: {e}")
+            logger.error("Request failed for price trends of %s: %s", crypto_id, e)
             return None
 
     def get_top_performing_cryptos(self, limit: int = 10) -> List[Dict]:
@@ -97,36 +188,44 @@ class CryptoDataModel:
             "page": 1
         }
         try:
-            logger.info(f"Requesting top {limit} performing cryptocurrencies")
-            response = requests.get(f"{self.base_url}{endpoint}", params=params)
+            logger.info("Requesting top %s performing cryptocurrencies", limit)
+            response = self._get(endpoint, params)
             response.raise_for_status()
             data = response.json()
-            logger.info(f"Fetched top {limit} performing cryptocurrencies")
+            logger.info("Fetched top %s performing cryptocurrencies", limit)
             return data
         except requests.RequestException as e:
-            logger.error(f"Request failed for top performing cryptocurrencies: {e}")
+            logger.error("Request failed for top performing cryptocurrencies: %s", e)
             return []
 
-    def set_price_alert(self, crypto_id: str, target_price: float) -> bool:
-        """Set price alert for a specific cryptocurrency."""
+    def set_price_alert(self, crypto_id: str, target_price: float, user_id: Optional[int] = None,
+                        direction: Optional[str] = None) -> Optional[PriceAlert]:
+        """
+        Set and persist a price alert for a specific cryptocurrency.
+
+        Args:
+            crypto_id (str): The ID of the cryptocurrency.
+            target_price (float): The price that triggers the alert.
+            user_id (int, optional): The user who owns the alert.
+            direction (str, optional): "above" or "below"; inferred from the current price if omitted.
+
+        Returns:
+            PriceAlert: The stored alert, or None if it could not be set.
+        """
         try:
-            logger.info(f"Setting price alert for {crypto_id} at {target_price}")
+            logger.info("Setting price alert for %s at %s", crypto_id, target_price)
             current_price = self.get_crypto_price(crypto_id)
             if current_price is None:
-                logger.error(f"Cannot set alert: Could not fetch price for {crypto_id}.")
-                return False
-
-            alert = {
-                'crypto_id': crypto_id,
-                'target_price': target_price,
-                'current_price': current_price,
-                'timestamp': datetime.now().isoformat()
-            }
-            logger.info(f"Price alert set for {crypto_id}: {alert}")
-            return True
+                logger.error("Cannot set alert: Could not fetch price for %s.", crypto_id)
+                return None
+
+            alert = PriceAlert.create_alert(crypto_id, float(target_price), current_price,
+                                            user_id=user_id, direction=direction)
+            logger.info("Price alert set for %s: %s", crypto_id, alert.to_dict())
+            return alert
         except Exception as e:
-            logger.error(f"Error setting price alert for {crypto_id}: {e}")
-            return False
+            logger.error("Error setting price alert for %s: %s", crypto_id, e)
+            return None
 
     def compare_cryptos(self, crypto_id1: str, crypto_id2: str) -> Dict:
         """
@@ -148,15 +247,36 @@ class CryptoDataModel:
             "page": 1
         }
         try:
-            logger.info(f"Comparing {crypto_id1} vs {crypto_id2}")
-            response = requests.get(f"{self.base_url}{endpoint}", params=params)
+            logger.info("Comparing %s vs %s", crypto_id1, crypto_id2)
+            response = self._get(endpoint, params)
             response.raise_for_status()
             data = response.json()
             if isinstance(data, list) and len(data) == 2:
-                logger.info(f"Comparison data for {crypto_id1} and {crypto_id2}: {data}")
+                logger.debug("Comparison data for %s and %s: %s", crypto_id1, crypto_id2, data)
                 return {crypto_id1: data[0], crypto_id2: data[1]}
-            logger.error(f"Unexpected structure for crypto comparison: {data}")
+            logger.error("Unexpected structure for crypto comparison: %s", data)
             return {}
         except requests.RequestException as e:
-            logger.error(f"Request failed for crypto comparison {crypto_id1} vs {crypto_id2}: {e}")
+            logger.error("Request failed for crypto comparison %s vs %s: %s", crypto_id1, crypto_id2, e)
             return {}
+
+
+_default_model: Optional[CryptoDataModel] = None
+
+
+def get_crypto_model() -> CryptoDataModel:
+    """
+    Return the shared CryptoDataModel.
+
+    Inside an application context this is the app's instance (which may read
+    from a shared price snapshot); otherwise a process-wide default is created
+    on first use.
+    """
+    global _default_model
+    if has_app_context():
+        model = current_app.extensions.get('crypto_model')
+        if model is not None:
+            return model
+    if _default_model is None:
+        _default_model = CryptoDataModel()
+    return _default_model
@@ -1,9 +1,12 @@
 import logging
-from typing import Dict, Optional
-from crypto_project.models.cryptodata_model import CryptoDataModel
+from typing import Dict
+from flask import current_app, has_app_context
+from crypto_project.models.cryptodata_model import get_crypto_model
+from crypto_project.utils.logger import configure_logger
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+configure_logger(logger)
 
 class Portfolio:
     def __init__(self, user_id: int, holdings: Dict[str, float], cash_balance: float):
@@ -19,7 +22,7 @@ class Portfolio:
         self.user_id = user_id
         self.holdings = holdings
         self.cash_balance = cash_balance
-        self.crypto_data = CryptoDataModel()  # Centralized API interaction
+        self.crypto_data = get_crypto_model()  # Shared API client
 
     def get_total_value(self, currency: str = 'USD') -> float:
         """
@@ -38,7 +41,7 @@ class Portfolio:
                 if price is not None:
                     total_value += price * amount
             except Exception as e:
-                logging.error(f"Error fetching price for {crypto_id}: {e}")
+                logger.error("Error fetching price for %s: %s", crypto_id, e)
         return total_value
 
     def get_portfolio_percentage(self) -> Dict[str, float]:
@@ -55,7 +58,7 @@ class Portfolio:
             if price is not None and total_value > 0:
                 value = price * amount
                 percentages[crypto_id] = (value / total_value) * 100
-        logging.info(f"Portfolio percentage breakdown for user {self.user_id}: {percentages}")
+        logger.info("Portfolio percentage breakdown for user %s: %s", self.user_id, percentages)
         return percentages
 
     def track_profit_loss(self, purchase_prices: Dict[str, float]) -> Dict[str, float]:
@@ -74,7 +77,7 @@ class Portfolio:
             purchase_price = purchase_prices.get(crypto_id, 0)
             if current_price is not None:
                 profit_loss[crypto_id] = (current_price - purchase_price) * amount
-        logging.info(f"Profit/loss for user {self.user_id}: {profit_loss}")
+        logger.info("Profit/loss for user %s: %s", self.user_id, profit_loss)
         return profit_loss
 
     def get_crypto_count(self, crypto_id: str) -> float:
@@ -88,24 +91,28 @@ class Portfolio:
             float: The number of units held.
         """
         count = self.holdings.get(crypto_id, 0.0)
-        logging.info(f"User {self.user_id} holds {count} units of {crypto_id}")
+        logger.info("User %s holds %s units of %s", self.user_id, count, crypto_id)
         return count
 
     @classmethod
-    def get_user_portfolio(cls, user_id: int) -> Optional['Portfolio']:
+    def get_user_portfolio(cls, user_id: int) -> 'Portfolio':
         """
-        Retrieves the portfolio for a given user.
+        Retrieves the current portfolio for a given user.
+
+        Portfolios are not stored; the holdings and cash balance are rebuilt
+        from the user's executed transactions (see ``PortfolioSnapshot``),
+        starting from the ``PORTFOLIO_OPENING_CASH`` balance.
 
         Args:
             user_id (int): The ID of the user.
 
         Returns:
-            Portfolio: The user's portfolio instance, or None if not found.
+            Portfolio: The user's portfolio instance.
         """
-        portfolio = cls.query.filter_by(user_id=user_id).first()
-        if not portfolio:
-            raise ValueError(f"No portfolio found for user ID {user_id}.")
-        return portfolio
+        from crypto_project.models.portfolio_snapshot_model import PortfolioSnapshot
+
+        opening_cash = current_app.config.get('PORTFOLIO_OPENING_CASH', 0.0) if has_app_context() else 0.0
+        return PortfolioSnapshot.get_state(user_id).to_portfolio(opening_cash)
 
     def get_cash_balance(self) -> float:
         """
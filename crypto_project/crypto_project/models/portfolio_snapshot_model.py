@@ -0,0 +1,237 @@
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import Column, Integer, Float, DateTime, JSON
+
+from crypto_project.db import db
+from crypto_project.models.portfolio_model import Portfolio
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class PortfolioState:
+    """
+    Holdings, cash and cost basis obtained by folding a user's transactions in order.
+
+    Cash is the net cash flow of the folded trades (sale proceeds minus
+    purchase costs), i.e. relative to an opening balance of zero. Cost basis
+    uses the average-cost method: a sale removes basis in proportion to the
+    quantity sold.
+    """
+
+    def __init__(self, user_id: int, holdings: Optional[Dict[str, float]] = None,
+                 cost_basis: Optional[Dict[str, float]] = None, cash_balance: float = 0.0,
+                 last_transaction_id: int = 0, as_of: Optional[datetime] = None, event_count: int = 0):
+        self.user_id = user_id
+        self.holdings = dict(holdings or {})
+        self.cost_basis = dict(cost_basis or {})
+        self.cash_balance = cash_balance
+        self.last_transaction_id = last_transaction_id
+        self.as_of = as_of
+        self.event_count = event_count
+
+    def apply(self, transaction) -> None:
+        """
+        Fold a single transaction event into the state.
+
+        Args:
+            transaction (TransactionModel): The next transaction for this user.
+        """
+        crypto_id = transaction.crypto_id
+        if transaction.transaction_type == "buy":
+            self.holdings[crypto_id] = self.holdings.get(crypto_id, 0.0) + transaction.quantity
+            self.cost_basis[crypto_id] = self.cost_basis.get(crypto_id, 0.0) + transaction.total_value
+            self.cash_balance -= transaction.total_value
+        else:
+            held = self.holdings.get(crypto_id, 0.0)
+            remaining = held - transaction.quantity
+            if remaining <= 0:
+                self.holdings.pop(crypto_id, None)
+                self.cost_basis.pop(crypto_id, None)
+            else:
+                self.holdings[crypto_id] = remaining
+                self.cost_basis[crypto_id] = self.cost_basis.get(crypto_id, 0.0) * remaining / held
+            self.cash_balance += transaction.total_value
+        self.last_transaction_id = transaction.id
+        self.as_of = transaction.timestamp
+        self.event_count += 1
+
+    def to_portfolio(self, opening_cash: float = 0.0) -> Portfolio:
+        """
+        Build a Portfolio from this state.
+
+        Args:
+            opening_cash (float): Cash the user held before their first transaction.
+
+        Returns:
+            Portfolio: A portfolio with the folded holdings and cash balance.
+        """
+        return Portfolio(self.user_id, dict(self.holdings), opening_cash + self.cash_balance)
+
+    def to_dict(self) -> Dict:
+        return {
+            'user_id': self.user_id,
+            'holdings': self.holdings,
+            'cost_basis': self.cost_basis,
+            'cash_balance': self.cash_balance,
+            'last_transaction_id': self.last_transaction_id,
+            'as_of': self.as_of.isoformat() if self.as_of else None,
+            'event_count': self.event_count,
+        }
+
+
+class PortfolioSnapshot(db.Model):
+    """
+    Periodic snapshots of a user's event-sourced portfolio state.
+
+    Transactions are the event log. Reconstructing a portfolio loads the
+    latest snapshot at or before the requested time and replays only the
+    transactions recorded after it; whenever that tail reaches
+    ``SNAPSHOT_INTERVAL`` events a fresh snapshot is written, so replay cost
+    stays bounded. Point-in-time reads assume transaction timestamps increase
+    with their IDs.
+
+    Only executed trades are folded (see ``TransactionModel.is_executed``).
+    Changing an existing row (editing, soft-deleting or executing an order)
+    must call ``invalidate`` so snapshots that already folded it are dropped.
+    """
+    __tablename__ = 'portfolio_snapshots'
+
+    SNAPSHOT_INTERVAL = 100
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    last_transaction_id = Column(Integer, nullable=False)
+    as_of = Column(DateTime, nullable=True)
+    event_count = Column(Integer, nullable=False)
+    holdings = Column(JSON, nullable=False)
+    cost_basis = Column(JSON, nullable=False)
+    cash_balance = Column(Float, nullable=False)
+
+    def to_state(self) -> PortfolioState:
+        return PortfolioState(
+            user_id=self.user_id,
+            holdings=self.holdings,
+            cost_basis=self.cost_basis,
+            cash_balance=self.cash_balance,
+            last_transaction_id=self.last_transaction_id,
+            as_of=self.as_of,
+            event_count=self.event_count
+        )
+
+    @classmethod
+    def get_latest(cls, user_id: int, as_of: Optional[datetime] = None) -> Optional['PortfolioSnapshot']:
+        """
+        Retrieve the newest snapshot for a user, optionally no later than a given time.
+
+        Args:
+            user_id (int): The ID of the user.
+            as_of (datetime, optional): Ignore snapshots taken after this time.
+
+        Returns:
+            PortfolioSnapshot: The snapshot, or None if the user has none.
+        """
+        query = cls.query.filter_by(user_id=user_id)
+        if as_of is not None:
+            query = query.filter(cls.as_of <= as_of)
+        return query.order_by(cls.last_transaction_id.desc()).first()
+
+    @classmethod
+    def get_state(cls, user_id: int, as_of: Optional[datetime] = None,
+                  snapshot_interval: Optional[int] = None) -> PortfolioState:
+        """
+        Reconstruct a user's portfolio state from the latest snapshot plus the event tail.
+
+        Args:
+            user_id (int): The ID of the user.
+            as_of (datetime, optional): Reconstruct the state at this time instead of now.
+            snapshot_interval (int, optional): Tail length that triggers a new snapshot
+                (defaults to SNAPSHOT_INTERVAL).
+
+        Returns:
+            PortfolioState: The reconstructed state.
+        """
+        from crypto_project.models.transaction_archive_model import TransactionArchive
+        from crypto_project.models.transaction_model import TransactionModel
+
+        interval = snapshot_interval or cls.SNAPSHOT_INTERVAL
+        snapshot = cls.get_latest(user_id, as_of)
+        state = snapshot.to_state() if snapshot else PortfolioState(user_id)
+
+        # Hot rows are selected by ID so events whose timestamps were moved
+        # (e.g. recurring transactions) are never skipped; archives are only
+        # read from the snapshot's month onwards.
+        query = TransactionModel.query.filter(TransactionModel.user_id == user_id,
+                                              TransactionModel.id > state.last_transaction_id,
+                                              TransactionModel.is_executed)
+        if as_of is not None:
+            query = query.filter(TransactionModel.timestamp <= as_of)
+        tail = [
+            transaction
+            for transaction in TransactionArchive.get_archived_transactions(user_id, start=state.as_of, end=as_of)
+            if transaction.id > state.last_transaction_id and transaction.is_executed
+        ] + query.all()
+        tail.sort(key=lambda transaction: transaction.id)
+        for transaction in tail:
+            state.apply(transaction)
+        logger.debug("Replayed %d events for user %s on top of snapshot %s",
+                     len(tail), user_id, snapshot.id if snapshot else None)
+
+        if as_of is None and len(tail) >= interval:
+            cls.save_state(state)
+        return state
+
+    @classmethod
+    def invalidate(cls, user_id: int, transaction_id: int) -> int:
+        """
+        Drop a user's snapshots that folded a transaction which has since changed.
+
+        The deletion joins the caller's database transaction; the caller commits.
+
+        Args:
+            user_id (int): The ID of the user.
+            transaction_id (int): The ID of the edited, deleted or executed transaction.
+
+        Returns:
+            int: The number of snapshots removed.
+        """
+        removed = cls.query.filter(cls.user_id == user_id,
+                                   cls.last_transaction_id >= transaction_id).delete(synchronize_session=False)
+        if removed:
+            logger.info("Invalidated %d portfolio snapshots for user %s from transaction %s",
+                        removed, user_id, transaction_id)
+        return removed
+
+    @classmethod
+    def save_state(cls, state: PortfolioState) -> 'PortfolioSnapshot':
+        """
+        Persist a portfolio state as a new snapshot.
+
+        Args:
+            state (PortfolioState): The state to persist.
+
+        Returns:
+            PortfolioSnapshot: The stored snapshot.
+        """
+        snapshot = cls(
+            user_id=state.user_id,
+            last_transaction_id=state.last_transaction_id,
+            as_of=state.as_of,
+            event_count=state.event_count,
+            holdings=dict(state.holdings),
+            cost_basis=dict(state.cost_basis),
+            cash_balance=state.cash_balance
+        )
+        try:
+            db.session.add(snapshot)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Failed to save portfolio snapshot for user %s: %s", state.user_id, str(e))
+            raise
+        logger.info("Saved portfolio snapshot for user %s at transaction %s",
+                    state.user_id, state.last_transaction_id)
+        return snapshot
@@ -0,0 +1,313 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import Column, Integer, Float, String, Boolean, DateTime, update
+
+from crypto_project.db import db
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# SQLite limits the number of bound parameters per statement
+_UPDATE_CHUNK_SIZE = 900
+
+
+class PriceAlert(db.Model):
+    __tablename__ = 'price_alerts'
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=True, index=True)
+    crypto_id = Column(String, nullable=False)
+    target_price = Column(Float, nullable=False)
+    direction = Column(String, nullable=False)  # "above" or "below"
+    created_at = Column(DateTime, default=datetime.utcnow)
+    fired = Column(Boolean, default=False, index=True)
+    fired_at = Column(DateTime, nullable=True)
+    fired_price = Column(Float, nullable=True)
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'crypto_id': self.crypto_id,
+            'target_price': self.target_price,
+            'direction': self.direction,
+            'fired': self.fired,
+            'fired_at': self.fired_at.isoformat() if self.fired_at else None,
+            'fired_price': self.fired_price,
+        }
+
+    @classmethod
+    def create_alert(cls, crypto_id: str, target_price: float, current_price: float,
+                     user_id: Optional[int] = None, direction: Optional[str] = None) -> 'PriceAlert':
+        """
+        Persist a new price alert and register it with the in-memory index.
+
+        Args:
+            crypto_id (str): The ID of the cryptocurrency.
+            target_price (float): The price that triggers the alert.
+            current_price (float): The price when the alert is set, used to infer the direction.
+            user_id (int, optional): The user who owns the alert.
+            direction (str, optional): "above" or "below"; inferred from the current price if omitted.
+
+        Returns:
+            PriceAlert: The stored alert.
+
+        Raises:
+            ValueError: If the target price or direction is invalid.
+        """
+        if target_price <= 0:
+            raise ValueError("Target price must be a positive number.")
+        if direction is None:
+            direction = "above" if target_price > current_price else "below"
+        if direction not in ("above", "below"):
+            raise ValueError("Direction must be 'above' or 'below'.")
+
+        alert = cls(user_id=user_id, crypto_id=crypto_id, target_price=target_price, direction=direction)
+        try:
+            db.session.add(alert)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Failed to store price alert for %s: %s", crypto_id, str(e))
+            raise
+        index = get_alert_index()
+        if index is not None:
+            # Sync the index with the price the direction was inferred from
+            # before registering, so the first move is measured from it.
+            index.on_price(crypto_id, current_price)
+            index.add(alert.id, crypto_id, direction, target_price)
+        logger.info("Stored price alert %s for %s %s %s", alert.id, crypto_id, direction, target_price)
+        return alert
+
+    @classmethod
+    def get_alerts(cls, alert_ids: List[int]) -> List['PriceAlert']:
+        """
+        Retrieve alerts by ID.
+
+        Args:
+            alert_ids (List[int]): IDs of the alerts.
+
+        Returns:
+            List[PriceAlert]: The matching alerts.
+        """
+        alerts = []
+        for start in range(0, len(alert_ids), _UPDATE_CHUNK_SIZE):
+            alerts.extend(cls.query.filter(cls.id.in_(alert_ids[start:start + _UPDATE_CHUNK_SIZE])).all())
+        return alerts
+
+    @classmethod
+    def mark_fired(cls, alert_ids: List[int], price: float) -> List[int]:
+        """
+        Mark alerts as fired in a single database transaction.
+
+        Only alerts that are still pending are updated, so when several
+        processes see the same price move each alert is claimed exactly once.
+
+        Args:
+            alert_ids (List[int]): IDs of the alerts that fired.
+            price (float): The price that triggered them.
+
+        Returns:
+            List[int]: IDs of the alerts this call marked as fired.
+        """
+        now = datetime.utcnow()
+        claimed = []
+        try:
+            for start in range(0, len(alert_ids), _UPDATE_CHUNK_SIZE):
+                chunk = alert_ids[start:start + _UPDATE_CHUNK_SIZE]
+                result = db.session.execute(
+                    update(cls).where(cls.id.in_(chunk), cls.fired.is_(False))
+                    .values(fired=True, fired_at=now, fired_price=price)
+                    .returning(cls.id)
+                )
+                claimed.extend(result.scalars())
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Failed to mark %d price alerts as fired: %s", len(alert_ids), str(e))
+            raise
+        return claimed
+
+
+class _CoinThresholds:
+    """Sorted, parallel threshold/ID arrays for one coin and direction."""
+
+    __slots__ = ('thresholds', 'ids')
+
+    def __init__(self):
+        self.thresholds: List[float] = []
+        self.ids: List[int] = []
+
+    def add(self, threshold: float, alert_id: int) -> None:
+        position = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(position, threshold)
+        self.ids.insert(position, alert_id)
+
+    def pop_range(self, lo: int, hi: int) -> List[Tuple[float, int]]:
+        """Remove and return the (threshold, ID) pairs in positions [lo, hi)."""
+        fired = list(zip(self.thresholds[lo:hi], self.ids[lo:hi]))
+        del self.thresholds[lo:hi]
+        del self.ids[lo:hi]
+        return fired
+
+
+class PriceAlertIndex:
+    """
+    In-memory index of pending price alerts.
+
+    For each coin, "above" and "below" thresholds are kept in sorted arrays.
+    When the price moves from ``previous`` to ``current``, the alerts it
+    crossed form one contiguous slice of the relevant array, located with two
+    bisections and removed in one slice deletion. Evaluation is therefore
+    O(log n + k) for k fired alerts, regardless of how many are pending.
+
+    When several processes share the database, each keeps its own index. A
+    ``sync_interval`` reloads the index from the database at most that often
+    (on the next price observation), so alerts created by another process are
+    evaluated here too; ``PriceAlert.mark_fired`` makes sure only one process
+    fires each alert.
+    """
+
+    def __init__(self, sync_interval: Optional[float] = None):
+        """
+        Args:
+            sync_interval (float, optional): Seconds between reloads from the database (None never reloads).
+        """
+        self._coins: Dict[Tuple[str, str], _CoinThresholds] = {}
+        self._last_prices: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.sync_interval = sync_interval
+        self._next_sync = time.monotonic() + sync_interval if sync_interval else None
+
+    def __len__(self) -> int:
+        return sum(len(side.ids) for side in self._coins.values())
+
+    @property
+    def crypto_ids(self) -> List[str]:
+        """IDs of the coins that have pending alerts."""
+        with self._lock:
+            return sorted({crypto_id for (crypto_id, _), side in self._coins.items() if side.ids})
+
+    def load(self) -> int:
+        """
+        Load every pending alert from the database, replacing the current contents.
+
+        Returns:
+            int: The number of alerts loaded.
+        """
+        rows = db.session.query(PriceAlert.id, PriceAlert.crypto_id, PriceAlert.direction, PriceAlert.target_price) \
+            .filter(PriceAlert.fired.is_(False)) \
+            .order_by(PriceAlert.target_price).all()
+        coins: Dict[Tuple[str, str], _CoinThresholds] = {}
+        for alert_id, crypto_id, direction, target_price in rows:
+            # Rows arrive sorted by threshold, so appending keeps each array sorted
+            side = coins.setdefault((crypto_id, direction), _CoinThresholds())
+            side.thresholds.append(target_price)
+            side.ids.append(alert_id)
+        with self._lock:
+            self._coins = coins
+            if self.sync_interval:
+                self._next_sync = time.monotonic() + self.sync_interval
+        logger.info("Loaded %d pending price alerts", len(rows))
+        return len(rows)
+
+    def _sync_due(self) -> bool:
+        """Whether a reload is due; claims it so concurrent callers do not reload too."""
+        if self._next_sync is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_sync:
+                return False
+            self._next_sync = now + self.sync_interval
+        return True
+
+    def add(self, alert_id: int, crypto_id: str, direction: str, target_price: float) -> None:
+        """Register a pending alert."""
+        with self._lock:
+            self._coins.setdefault((crypto_id, direction), _CoinThresholds()).add(target_price, alert_id)
+
+    def _pop_crossed(self, crypto_id: str, previous: Optional[float],
+                     current: float) -> List[Tuple[str, float, int]]:
+        fired = []
+        with self._lock:
+            above = self._coins.get((crypto_id, "above"))
+            if above is not None and (previous is None or current > previous):
+                lo = 0 if previous is None else bisect_right(above.thresholds, previous)
+                fired.extend(("above", threshold, alert_id)
+                             for threshold, alert_id in above.pop_range(lo, bisect_right(above.thresholds, current)))
+            below = self._coins.get((crypto_id, "below"))
+            if below is not None and (previous is None or current < previous):
+                hi = len(below.thresholds) if previous is None else bisect_left(below.thresholds, previous)
+                fired.extend(("below", threshold, alert_id)
+                             for threshold, alert_id in below.pop_range(bisect_left(below.thresholds, current), hi))
+        return fired
+
+    def find_crossed(self, crypto_id: str, previous: Optional[float], current: float) -> List[int]:
+        """
+        Remove and return the alerts crossed by a price move.
+
+        Args:
+            crypto_id (str): The ID of the cryptocurrency.
+            previous (float, optional): The previous price; None fires every alert already satisfied.
+            current (float): The new price.
+
+        Returns:
+            List[int]: IDs of the crossed alerts.
+        """
+        return [alert_id for _, _, alert_id in self._pop_crossed(crypto_id, previous, current)]
+
+    def on_price(self, crypto_id: str, price: float) -> List[int]:
+        """
+        Evaluate alerts for a new price observation and mark crossed ones as fired.
+
+        If the alerts cannot be marked as fired, they are put back into the
+        index (and the price move is forgotten) so the next observation
+        evaluates them again, and the error is raised.
+
+        Args:
+            crypto_id (str): The ID of the cryptocurrency.
+            price (float): The newly observed price.
+
+        Returns:
+            List[int]: IDs of the alerts that fired here (not already fired by another process).
+        """
+        if self._sync_due():
+            try:
+                self.load()
+            except Exception as e:
+                logger.error("Failed to reload pending price alerts: %s", str(e))
+        with self._lock:
+            previous = self._last_prices.get(crypto_id)
+            self._last_prices[crypto_id] = price
+        crossed = self._pop_crossed(crypto_id, previous, price)
+        if not crossed:
+            return []
+        try:
+            fired = PriceAlert.mark_fired([alert_id for _, _, alert_id in crossed], price)
+        except Exception:
+            with self._lock:
+                for direction, threshold, alert_id in crossed:
+                    self._coins.setdefault((crypto_id, direction), _CoinThresholds()).add(threshold, alert_id)
+                if self._last_prices.get(crypto_id) == price:
+                    if previous is None:
+                        self._last_prices.pop(crypto_id, None)
+                    else:
+                        self._last_prices[crypto_id] = previous
+            raise
+        logger.info("Fired %d price alerts for %s at %s", len(fired), crypto_id, price)
+        return fired
+
+
+def get_alert_index() -> Optional[PriceAlertIndex]:
+    """Return the current application's price alert index, if one is configured."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('price_alerts')
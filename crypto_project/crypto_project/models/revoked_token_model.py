@@ -0,0 +1,53 @@
+import logging
+import time
+from typing import Dict
+
+from sqlalchemy import Column, Float, String, delete
+
+from crypto_project.db import db
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class RevokedToken(db.Model):
+    """
+    Session token IDs revoked by a logout, shared by every process using the database.
+
+    Rows are only needed until the token would have expired anyway, so expired
+    ones are deleted whenever a new revocation is stored.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    jti = Column(String, primary_key=True)
+    expires_at = Column(Float, nullable=False, index=True)  # Unix time
+
+    @classmethod
+    def add(cls, jti: str, expires_at: float) -> None:
+        """
+        Store a revoked token ID and drop the expired ones.
+
+        Args:
+            jti (str): The ID of the revoked token.
+            expires_at (float): When the token expires (Unix time).
+        """
+        try:
+            db.session.execute(delete(cls).where(cls.expires_at <= time.time()))
+            db.session.merge(cls(jti=jti, expires_at=expires_at))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Failed to store revoked session token: %s", str(e))
+            raise
+
+    @classmethod
+    def load(cls) -> Dict[str, float]:
+        """
+        Return every revoked token ID that has not expired yet.
+
+        Returns:
+            Dict[str, float]: Token ID -> expiry (Unix time).
+        """
+        rows = db.session.query(cls.jti, cls.expires_at).filter(cls.expires_at > time.time()).all()
+        return dict(rows)
@@ -0,0 +1,182 @@
+import logging
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from sqlalchemy import Column, Integer, Float, String, Date, case, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from crypto_project.db import db
+from crypto_project.models.transaction_version_model import TransactionVersion
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class TradingRollup(db.Model):
+    """
+    Per user, asset and day trading totals.
+
+    Rows are upserted in the same database transaction as every change to an
+    executed trade in ``transactions`` (see the ``after_insert`` and
+    ``after_update`` listeners registered in ``transaction_model``), so stats
+    queries never have to scan the transaction log. Custom orders are only
+    counted once they execute.
+    """
+    __tablename__ = 'trading_rollups'
+
+    user_id = Column(Integer, primary_key=True)
+    crypto_id = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    trade_count = Column(Integer, nullable=False, default=0)
+    buy_quantity = Column(Float, nullable=False, default=0.0)
+    sell_quantity = Column(Float, nullable=False, default=0.0)
+    buy_notional = Column(Float, nullable=False, default=0.0)
+    sell_notional = Column(Float, nullable=False, default=0.0)
+
+    @classmethod
+    def apply_transaction(cls, connection, transaction, sign: int = 1) -> None:
+        """
+        Add a single transaction to (or, with ``sign=-1``, remove it from) its rollup row.
+
+        Uses an atomic upsert; a row whose trade count drops to zero is deleted.
+
+        Args:
+            connection (Connection): The connection the transaction is being written on.
+            transaction (TransactionModel): The transaction, or an object with the same
+                attributes holding its previous values.
+            sign (int): 1 to add the transaction, -1 to remove it.
+        """
+        is_buy = transaction.transaction_type == "buy"
+        quantity = sign * float(transaction.quantity)
+        notional = sign * float(transaction.total_value)
+        timestamp = transaction.timestamp or datetime.utcnow()
+        values = {
+            'user_id': transaction.user_id,
+            'crypto_id': transaction.crypto_id,
+            'day': timestamp.date(),
+            'trade_count': sign,
+            'buy_quantity': quantity if is_buy else 0.0,
+            'sell_quantity': 0.0 if is_buy else quantity,
+            'buy_notional': notional if is_buy else 0.0,
+            'sell_notional': 0.0 if is_buy else notional,
+        }
+
+        dialect = sqlite if connection.dialect.name == 'sqlite' else postgresql
+        stmt = dialect.insert(cls.__table__).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id', 'crypto_id', 'day'],
+            set_={
+                name: getattr(cls.__table__.c, name) + getattr(stmt.excluded, name)
+                for name in ('trade_count', 'buy_quantity', 'sell_quantity', 'buy_notional', 'sell_notional')
+            }
+        )
+        connection.execute(stmt)
+        if sign < 0:
+            table = cls.__table__
+            connection.execute(table.delete().where(
+                table.c.user_id == values['user_id'],
+                table.c.crypto_id == values['crypto_id'],
+                table.c.day == values['day'],
+                table.c.trade_count <= 0
+            ))
+
+    @classmethod
+    def get_stats(cls, user_id: Optional[int] = None, crypto_id: Optional[str] = None,
+                  start: Optional[date] = None, end: Optional[date] = None) -> Dict:
+        """
+        Aggregate rollup rows matching the given filters.
+
+        Args:
+            user_id (int, optional): Restrict to a single user.
+            crypto_id (str, optional): Restrict to a single cryptocurrency.
+            start (date, optional): First day to include.
+            end (date, optional): Last day to include.
+
+        Returns:
+            dict: Trade count, buy/sell quantities and notionals, and VWAPs.
+        """
+        query = select(
+            func.coalesce(func.sum(cls.trade_count), 0),
+            func.coalesce(func.sum(cls.buy_quantity), 0.0),
+            func.coalesce(func.sum(cls.sell_quantity), 0.0),
+            func.coalesce(func.sum(cls.buy_notional), 0.0),
+            func.coalesce(func.sum(cls.sell_notional), 0.0),
+        )
+        if user_id is not None:
+            query = query.where(cls.user_id == user_id)
+        if crypto_id is not None:
+            query = query.where(cls.crypto_id == crypto_id)
+        if start is not None:
+            query = query.where(cls.day >= start)
+        if end is not None:
+            query = query.where(cls.day <= end)
+
+        trade_count, buy_quantity, sell_quantity, buy_notional, sell_notional = db.session.execute(query).one()
+        total_quantity = buy_quantity + sell_quantity
+        return {
+            'trade_count': trade_count,
+            'buy_quantity': buy_quantity,
+            'sell_quantity': sell_quantity,
+            'buy_notional': buy_notional,
+            'sell_notional': sell_notional,
+            'notional': buy_notional + sell_notional,
+            'buy_vwap': buy_notional / buy_quantity if buy_quantity else None,
+            'sell_vwap': sell_notional / sell_quantity if sell_quantity else None,
+            'vwap': (buy_notional + sell_notional) / total_quantity if total_quantity else None,
+        }
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """
+        Recompute every rollup row from the ``transactions`` table.
+
+        Used to backfill rollups for history recorded before they existed.
+
+        Returns:
+            int: The number of rollup rows written.
+        """
+        from crypto_project.models.transaction_model import TransactionModel
+
+        is_buy = TransactionModel.transaction_type == "buy"
+        day = func.date(TransactionModel.timestamp)
+        query = select(
+            TransactionModel.user_id,
+            TransactionModel.crypto_id,
+            day,
+            func.count(),
+            func.sum(case((is_buy, TransactionModel.quantity), else_=0.0)),
+            func.sum(case((is_buy, 0.0), else_=TransactionModel.quantity)),
+            func.sum(case((is_buy, TransactionModel.total_value), else_=0.0)),
+            func.sum(case((is_buy, 0.0), else_=TransactionModel.total_value)),
+        ).where(TransactionModel.is_executed).group_by(TransactionModel.user_id, TransactionModel.crypto_id, day)
+
+        logger.info("Rebuilding trading rollups from transactions")
+        try:
+            previous_users = db.session.execute(select(cls.user_id).distinct()).scalars().all()
+            db.session.query(cls).delete()
+            rows = [
+                {
+                    'user_id': user_id,
+                    'crypto_id': crypto_id,
+                    'day': row_day if isinstance(row_day, date) else date.fromisoformat(row_day),
+                    'trade_count': trade_count,
+                    'buy_quantity': buy_quantity,
+                    'sell_quantity': sell_quantity,
+                    'buy_notional': buy_notional,
+                    'sell_notional': sell_notional,
+                }
+                for user_id, crypto_id, row_day, trade_count, buy_quantity, sell_quantity, buy_notional, sell_notional
+                in db.session.execute(query)
+            ]
+            if rows:
+                db.session.execute(cls.__table__.insert(), rows)
+            # Stats served from the old rollups are no longer valid
+            TransactionVersion.bump(db.session.connection(), previous_users + [row['user_id'] for row in rows])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Failed to rebuild trading rollups: %s", str(e))
+            raise
+        logger.info("Rebuilt %d trading rollup rows", len(rows))
+        return len(rows)
@@ -0,0 +1,158 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import Column, Date, Index, Integer, MetaData, String, Table, delete, func, insert, select
+
+from crypto_project.db import db
+from crypto_project.models.transaction_version_model import TransactionVersion
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# Archive tables are created on demand, so they live outside db.metadata and
+# are never touched by db.create_all().
+archive_metadata = MetaData()
+
+
+def _month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+
+
+class TransactionArchive(db.Model):
+    """
+    Registry of monthly archive tables holding cold, inactive transactions.
+
+    ``archive_inactive`` moves inactive rows older than a threshold out of the
+    hot ``transactions`` table into ``transactions_archive_YYYY_MM`` tables and
+    records each table here, so readers can tell which months have archived
+    rows without inspecting the schema.
+    """
+    __tablename__ = 'transaction_archives'
+
+    table_name = Column(String, primary_key=True)
+    month = Column(Date, nullable=False, unique=True)
+    row_count = Column(Integer, nullable=False, default=0)
+
+    @staticmethod
+    def _archive_table(table_name: str) -> Table:
+        """Return the archive table definition for the given name."""
+        if table_name in archive_metadata.tables:
+            return archive_metadata.tables[table_name]
+        from crypto_project.models.transaction_model import TransactionModel
+
+        table = TransactionModel.__table__.to_metadata(archive_metadata, name=table_name)
+        Index(f"ix_{table_name}_user_id", table.c.user_id)
+        return table
+
+    @classmethod
+    def archive_inactive(cls, older_than_days: int = 90) -> int:
+        """
+        Move inactive transactions older than the threshold into monthly archive tables.
+
+        All months are moved in a single database transaction, so a failure
+        leaves the hot table untouched.
+
+        Args:
+            older_than_days (int): Only rows whose timestamp is older than this are archived.
+
+        Returns:
+            int: The number of rows moved out of the hot table.
+
+        Raises:
+            ValueError: If older_than_days is negative.
+        """
+        from crypto_project.models.transaction_model import TransactionModel
+
+        if older_than_days < 0:
+            raise ValueError("older_than_days must not be negative.")
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        hot = TransactionModel.__table__
+        eligible = (hot.c.active.is_(False)) & (hot.c.timestamp < cutoff)
+
+        months = db.session.execute(
+            select(func.min(hot.c.timestamp)).where(eligible).group_by(func.strftime('%Y-%m', hot.c.timestamp))
+        ).scalars().all()
+
+        moved = 0
+        try:
+            for first_timestamp in months:
+                month = _month_start(first_timestamp)
+                table_name = f"transactions_archive_{month.year:04d}_{month.month:02d}"
+                archive = cls._archive_table(table_name)
+                archive.create(bind=db.session.connection(), checkfirst=True)
+
+                lower = datetime.combine(month, datetime.min.time())
+                upper = datetime.combine(_next_month(month), datetime.min.time())
+                in_month = eligible & (hot.c.timestamp >= lower) & (hot.c.timestamp < upper)
+                # Core statements bypass the ORM listeners, so bump the owners' versions here
+                user_ids = db.session.execute(select(hot.c.user_id).where(in_month).distinct()).scalars().all()
+                TransactionVersion.bump(db.session.connection(), user_ids)
+                db.session.execute(insert(archive).from_select(list(hot.c.keys()), select(hot).where(in_month)))
+                count = db.session.execute(delete(hot).where(in_month)).rowcount
+
+                entry = db.session.get(cls, table_name)
+                if entry is None:
+                    db.session.add(cls(table_name=table_name, month=month, row_count=count))
+                else:
+                    entry.row_count += count
+                moved += count
+                logger.info("Archived %d transactions into %s", count, table_name)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Failed to archive transactions: %s", str(e))
+            raise
+        return moved
+
+    @classmethod
+    def get_archived_transactions(cls, user_id: int, start: Optional[datetime] = None,
+                                  end: Optional[datetime] = None) -> List:
+        """
+        Retrieve a user's archived transactions, reading only archives the range reaches.
+
+        Args:
+            user_id (int): The ID of the user.
+            start (datetime, optional): Earliest timestamp to include.
+            end (datetime, optional): Latest timestamp to include.
+
+        Returns:
+            List[TransactionModel]: Transient (not session-bound) transactions, oldest archive first.
+        """
+        from crypto_project.models.transaction_model import TransactionModel
+
+        query = cls.query.filter(cls.row_count > 0)
+        if start is not None:
+            query = query.filter(cls.month >= _month_start(start))
+        if end is not None:
+            query = query.filter(cls.month <= _month_start(end))
+
+        transactions = []
+        for entry in query.order_by(cls.month).all():
+            archive = cls._archive_table(entry.table_name)
+            stmt = select(archive).where(archive.c.user_id == user_id)
+            if start is not None:
+                stmt = stmt.where(archive.c.timestamp >= start)
+            if end is not None:
+                stmt = stmt.where(archive.c.timestamp <= end)
+            for row in db.session.execute(stmt.order_by(archive.c.id)).mappings():
+                transaction = TransactionModel(
+                    user_id=row['user_id'],
+                    crypto_id=row['crypto_id'],
+                    transaction_type=row['transaction_type'],
+                    quantity=row['quantity'],
+                    price=row['price'],
+                    target_price=row['target_price'],
+                    recurring=row['recurring']
+                )
+                transaction.id = row['id']
+                transaction.total_value = row['total_value']
+                transaction.timestamp = row['timestamp']
+                transaction.active = row['active']
+                transactions.append(transaction)
+        return transactions
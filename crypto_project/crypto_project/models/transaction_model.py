@@ -1,12 +1,34 @@
 from datetime import datetime, timedelta
-from sqlalchemy import Column, Integer, Float, String, Boolean, DateTime
+from flask import current_app, has_app_context
+from types import SimpleNamespace
+from sqlalchemy import Column, Integer, Float, String, Boolean, DateTime, and_, event, inspect, or_
+from sqlalchemy.ext.hybrid import hybrid_property
 from crypto_project.db import db
 from crypto_project.models.portfolio_model import Portfolio
-from crypto_project.models.cryptodata_model import CryptoDataModel
+from crypto_project.models.portfolio_snapshot_model import PortfolioSnapshot
+from crypto_project.models.cryptodata_model import get_crypto_model
+from crypto_project.models.trading_rollup_model import TradingRollup
+from crypto_project.models.transaction_archive_model import TransactionArchive
+from crypto_project.models.transaction_version_model import TransactionVersion
+from crypto_project.utils.logger import configure_logger
 import logging
 
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# Columns that decide whether and where a transaction counts in the trading rollups
+_ROLLUP_FIELDS = ('user_id', 'crypto_id', 'transaction_type', 'quantity', 'total_value', 'timestamp',
+                  'target_price', 'active')
+
+
+def _is_executed(active, target_price) -> bool:
+    active = active is not False  # Unflushed rows are active by default
+    return active if target_price is None else not active
+
 class TransactionModel(db.Model):
     __tablename__ = 'transactions'
+    # Never reuse IDs of rows that were moved to an archive table
+    __table_args__ = {'sqlite_autoincrement': True}
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=False)
@@ -30,6 +52,22 @@ class TransactionModel(db.Model):
         self.target_price = target_price
         self.recurring = recurring
 
+    @hybrid_property
+    def is_executed(self):
+        """
+        Whether this row is a trade that took place.
+
+        Plain trades are executed while active (inactive ones were soft-deleted);
+        custom orders with a target price only once they have been deactivated
+        by execute_custom_transactions.
+        """
+        return _is_executed(self.active, self.target_price)
+
+    @is_executed.expression
+    def is_executed(cls):
+        return or_(and_(cls.target_price.is_(None), cls.active.is_(True)),
+                   and_(cls.target_price.isnot(None), cls.active.is_(False)))
+
     @classmethod
     def create_transaction(cls, user_id, crypto_id, transaction_type, quantity, price, target_price=None, recurring=False):
         """
@@ -85,8 +123,13 @@ class TransactionModel(db.Model):
             target_price=target_price,
             recurring=recurring
         )
-        db.session.add(new_transaction)
-        db.session.commit()
+        group_commit = current_app.extensions.get('group_commit') if has_app_context() else None
+        if group_commit is not None:
+            # Wait for the writer thread to commit this row together with its group
+            group_commit.submit(new_transaction)
+        else:
+            db.session.add(new_transaction)
+            db.session.commit()
         return new_transaction
 
 
@@ -105,21 +148,26 @@ class TransactionModel(db.Model):
         Returns:
                 TransactionModel: The updated transaction.
         """
-        logging.info(f"Editing transaction {transaction_id} with updates {kwargs}.")
+        logger.info("Editing transaction %s with updates %s.", transaction_id, kwargs)
         transaction = cls.query.filter_by(id=transaction_id, active=True).first()
         if not transaction:
-            logging.error(f"Transaction with ID {transaction_id} not found or inactive.")
+            logger.error("Transaction with ID %s not found or inactive.", transaction_id)
             raise ValueError(f"Transaction with ID {transaction_id} not found or inactive.")
 
+        user_ids = {transaction.user_id}
         for key, value in kwargs.items():
             if hasattr(transaction, key):
                 setattr(transaction, key, value)
-                logging.info(f"Updated {key} to {value}.")
+                logger.info("Updated %s to %s.", key, value)
             else:
-                logging.error(f"Invalid attribute: {key}")
+                logger.error("Invalid attribute: %s", key)
                 raise ValueError(f"Invalid attribute: {key}")
+        user_ids.add(transaction.user_id)
+        for user_id in user_ids:
+            # Snapshots that already folded this row are now stale
+            PortfolioSnapshot.invalidate(user_id, transaction.id)
         db.session.commit()
-        logging.info(f"Transaction {transaction_id} updated successfully.")
+        logger.info("Transaction %s updated successfully.", transaction_id)
         return transaction
 
     @classmethod
@@ -136,22 +184,23 @@ class TransactionModel(db.Model):
         Returns:
             None
         """
-        logging.info(f"Deleting transaction {transaction_id}.")
+        logger.info("Deleting transaction %s.", transaction_id)
         transaction = cls.query.filter_by(id=transaction_id, active=True).first()
         if not transaction:
-            logging.error(f"Transaction with ID {transaction_id} not found or already inactive.")
+            logger.error("Transaction with ID %s not found or already inactive.", transaction_id)
             raise ValueError(f"Transaction with ID {transaction_id} not found or already inactive.")
 
         transaction.active = False
+        PortfolioSnapshot.invalidate(transaction.user_id, transaction.id)
         db.session.commit()
-        logging.info(f"Transaction {transaction_id} marked as inactive.")
+        logger.info("Transaction %s marked as inactive.", transaction_id)
 
     @classmethod
     def execute_custom_transactions(cls):
         """
         Execute custom buy/sell transactions if target price is reached.
         """
-        crypto_data = CryptoDataModel()
+        crypto_data = get_crypto_model()
         pending_transactions = cls.query.filter_by(active=True).filter(cls.target_price.isnot(None)).all()
 
         for transaction in pending_transactions:
@@ -161,10 +210,12 @@ class TransactionModel(db.Model):
 
             if transaction.transaction_type == "buy" and current_price <= transaction.target_price:
                 transaction.active = False
+                PortfolioSnapshot.invalidate(transaction.user_id, transaction.id)
                 db.session.commit()
 
             elif transaction.transaction_type == "sell" and current_price >= transaction.target_price:
                 transaction.active = False
+                PortfolioSnapshot.invalidate(transaction.user_id, transaction.id)
                 db.session.commit()
 
     @classmethod
@@ -186,14 +237,80 @@ class TransactionModel(db.Model):
 
 
     @classmethod
-    def get_user_transactions(cls, user_id):
+    def get_user_transactions(cls, user_id, start=None, end=None):
         """
         Retrieve all transactions for a specific user.
 
+        Archived transactions are included transparently, but only the monthly
+        archives that overlap the requested range are read.
+
+        Args:
+            user_id (int): The ID of the user.
+            start (datetime, optional): Earliest timestamp to include.
+            end (datetime, optional): Latest timestamp to include.
+
+        Returns:
+            List[TransactionModel]: A list of transactions for the user, archived ones first.
+        """
+        query = cls.query.filter_by(user_id=user_id)
+        if start is not None:
+            query = query.filter(cls.timestamp >= start)
+        if end is not None:
+            query = query.filter(cls.timestamp <= end)
+        return TransactionArchive.get_archived_transactions(user_id, start, end) + query.all()
+
+    @classmethod
+    def get_version(cls, user_id: int) -> int:
+        """
+        Identify the current state of a user's transaction log.
+
+        The version grows with every insert, edit, soft-delete, execution and
+        archive of the user's transactions, so it can be used to validate
+        cached responses derived from the log.
+
         Args:
             user_id (int): The ID of the user.
 
         Returns:
-            List[TransactionModel]: A list of transactions for the user.
+            int: The user's transaction log version.
         """
-        return cls.query.filter_by(user_id=user_id).all()
\ No newline at end of file
+        return TransactionVersion.get(user_id)
+
+
+@event.listens_for(TransactionModel, 'after_insert')
+def _bump_version_on_insert(mapper, connection, target):
+    """Bump the owner's transaction log version with every inserted transaction."""
+    TransactionVersion.bump(connection, [target.user_id])
+
+
+@event.listens_for(TransactionModel, 'after_update')
+def _bump_version_on_update(mapper, connection, target):
+    """Bump the transaction log version of the old and new owner when any column changes."""
+    attrs = inspect(target).attrs
+    if not any(attr.history.has_changes() for attr in attrs):
+        return
+    history = attrs['user_id'].history
+    TransactionVersion.bump(connection, [target.user_id] + list(history.deleted))
+
+
+@event.listens_for(TransactionModel, 'after_insert')
+def _update_trading_rollup(mapper, connection, target):
+    """Keep trading rollups in step with every inserted trade, in the same DB transaction."""
+    if target.is_executed:
+        TradingRollup.apply_transaction(connection, target)
+
+
+@event.listens_for(TransactionModel, 'after_update')
+def _move_trading_rollup(mapper, connection, target):
+    """Apply edits, soft-deletes and order executions to the rollups as a remove/add delta."""
+    attrs = inspect(target).attrs
+    if not any(attrs[name].history.has_changes() for name in _ROLLUP_FIELDS):
+        return
+    previous = SimpleNamespace(**{
+        name: attrs[name].history.deleted[0] if attrs[name].history.deleted else getattr(target, name)
+        for name in _ROLLUP_FIELDS
+    })
+    if _is_executed(previous.active, previous.target_price):
+        TradingRollup.apply_transaction(connection, previous, sign=-1)
+    if target.is_executed:
+        TradingRollup.apply_transaction(connection, target)
@@ -0,0 +1,56 @@
+import logging
+from typing import Iterable
+
+from sqlalchemy import Column, Integer, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from crypto_project.db import db
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class TransactionVersion(db.Model):
+    """
+    Per user counter of changes to the transaction log.
+
+    The counter is bumped in the same database transaction as every insert,
+    edit, soft-delete, execution and archive of a user's transactions (see
+    the listeners registered in ``transaction_model``) and every rollup
+    rebuild, so it only ever grows and identifies the state cached portfolio
+    and stats responses were built from. Users without a row are at version 0.
+    """
+    __tablename__ = 'transaction_versions'
+
+    user_id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    @classmethod
+    def bump(cls, connection, user_ids: Iterable[int]) -> None:
+        """
+        Increment the version of each user with an atomic upsert.
+
+        Args:
+            connection (Connection): The connection the change is being written on.
+            user_ids (Iterable[int]): Users whose transactions changed.
+        """
+        dialect = sqlite if connection.dialect.name == 'sqlite' else postgresql
+        for user_id in set(user_ids):
+            stmt = dialect.insert(cls.__table__).values(user_id=user_id, version=1)
+            stmt = stmt.on_conflict_do_update(index_elements=['user_id'],
+                                              set_={'version': cls.__table__.c.version + 1})
+            connection.execute(stmt)
+
+    @classmethod
+    def get(cls, user_id: int) -> int:
+        """
+        Return a user's current version.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            int: The version, 0 if the user's transactions never changed.
+        """
+        return db.session.execute(select(cls.version).where(cls.user_id == user_id)).scalar() or 0
@@ -2,10 +2,15 @@ import hashlib
 import logging
 import os
 import pyotp
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Tuple
 
+from sqlalchemy import insert, select
 from sqlalchemy.exc import IntegrityError
 from crypto_project.db import db
 from crypto_project.utils.logger import configure_logger
+from crypto_project.utils.user_cache import get_user_cache
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
@@ -35,6 +40,38 @@ class Users(db.Model):
         hashed_password = hashlib.sha256((password + salt).encode()).hexdigest()
         return salt, hashed_password
 
+    def _to_record(self) -> dict:
+        """Return the fields needed for authentication as a cacheable dict."""
+        return {'id': self.id, 'salt': self.salt, 'password': self.password, 'totp_secret': self.totp_secret}
+
+    @classmethod
+    def _get_user_record(cls, username: str) -> dict:
+        """
+        Look up a user's authentication record, using the user cache when available.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            dict: The user's id, salt, password hash and TOTP secret.
+
+        Raises:
+            ValueError: If the user does not exist.
+        """
+        cache = get_user_cache()
+        record = cache.get(username) if cache else None
+        if record is None:
+            generation = cache.generation() if cache else None
+            user = cls.query.filter_by(username=username).first()
+            if not user:
+                logger.info("User %s not found", username)
+                raise ValueError(f"User {username} not found")
+            record = user._to_record()
+            if cache:
+                # Refused if the user was updated or deleted while we were reading
+                cache.fill(username, record, generation)
+        return record
+
     @classmethod
     def _generate_totp_secret(cls) -> str:
         """
@@ -64,6 +101,9 @@ class Users(db.Model):
             db.session.add(new_user)
             db.session.commit()
             logger.info("User successfully added to the database: %s", username)
+            cache = get_user_cache()
+            if cache:
+                cache.set(username, new_user._to_record())
         except IntegrityError:
             db.session.rollback()
             logger.error("Duplicate username: %s", username)
@@ -73,6 +113,87 @@ class Users(db.Model):
             logger.error("Database error: %s", str(e))
             raise
 
+    @classmethod
+    def _prepare_row(cls, credentials: Tuple[str, str]) -> Dict[str, str]:
+        """Hash a password and generate a TOTP secret for one bulk-provisioned user."""
+        username, password = credentials
+        salt, hashed_password = cls._generate_hashed_password(password)
+        return {'username': username, 'salt': salt, 'password': hashed_password,
+                'totp_secret': cls._generate_totp_secret()}
+
+    @classmethod
+    def bulk_create_users(cls, credentials: Iterable[Tuple[str, str]], chunk_size: int = 500,
+                          workers: int = 4) -> Dict:
+        """
+        Create many users from a stream of (username, password) pairs.
+
+        The stream is consumed in chunks. Each chunk is deduplicated against the
+        database with a single query, hashed in a thread pool and inserted with
+        one executemany statement and one commit. Rows that cannot be created
+        are reported instead of aborting the run.
+
+        Args:
+            credentials (Iterable[Tuple[str, str]]): Usernames and passwords to create.
+            chunk_size (int): Number of rows handled per query/insert.
+            workers (int): Number of hashing threads.
+
+        Returns:
+            dict: The number of users created and a list of per-row conflicts.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive number.")
+        created = 0
+        conflicts = []
+        seen = set()
+        iterator = iter(credentials)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+
+                candidates = {}
+                for username, password in chunk:
+                    if not username or not password:
+                        conflicts.append({'username': username, 'reason': "'username' and 'password' are required."})
+                    elif username in seen or username in candidates:
+                        conflicts.append({'username': username, 'reason': "Duplicate username in request."})
+                    else:
+                        candidates[username] = password
+
+                existing = set(db.session.execute(
+                    select(cls.username).where(cls.username.in_(list(candidates)))
+                ).scalars()) if candidates else set()
+                for username in existing:
+                    conflicts.append({'username': username, 'reason': f"User with username '{username}' already exists"})
+                    del candidates[username]
+                seen.update(candidates)
+                seen.update(existing)
+
+                if not candidates:
+                    continue
+                rows = list(pool.map(cls._prepare_row, candidates.items()))
+                try:
+                    db.session.execute(insert(cls), rows)
+                    db.session.commit()
+                except IntegrityError:
+                    # Another writer created some of these usernames since the check
+                    db.session.rollback()
+                    for row in rows:
+                        try:
+                            db.session.execute(insert(cls), [row])
+                            db.session.commit()
+                        except IntegrityError:
+                            db.session.rollback()
+                            conflicts.append({'username': row['username'],
+                                              'reason': f"User with username '{row['username']}' already exists"})
+                            continue
+                        created += 1
+                    continue
+                created += len(rows)
+                logger.info("Bulk-created %d users", len(rows))
+        return {'created': created, 'conflicts': conflicts}
+
     @classmethod
     def check_password(cls, username: str, password: str) -> bool:
         """
@@ -88,12 +209,9 @@ class Users(db.Model):
         Raises:
             ValueError: If the user does not exist.
         """
-        user = cls.query.filter_by(username=username).first()
-        if not user:
-            logger.info("User %s not found", username)
-            raise ValueError(f"User {username} not found")
-        hashed_password = hashlib.sha256((password + user.salt).encode()).hexdigest()
-        return hashed_password == user.password
+        user = cls._get_user_record(username)
+        hashed_password = hashlib.sha256((password + user['salt']).encode()).hexdigest()
+        return hashed_password == user['password']
 
     @classmethod
     def verify_totp_token(cls, username: str, token: str) -> bool:
@@ -110,13 +228,26 @@ class Users(db.Model):
         Raises:
             ValueError: If the user does not exist.
         """
-        user = cls.query.filter_by(username=username).first()
-        if not user:
-            logger.info("User %s not found", username)
-            raise ValueError(f"User {username} not found")
-        totp = pyotp.TOTP(user.totp_secret)
+        user = cls._get_user_record(username)
+        totp = pyotp.TOTP(user['totp_secret'])
         return totp.verify(token)
 
+    @classmethod
+    def get_totp_secret(cls, username: str) -> str:
+        """
+        Retrieve the TOTP secret of a user.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            str: The user's base32 TOTP secret.
+
+        Raises:
+            ValueError: If the user does not exist.
+        """
+        return cls._get_user_record(username)['totp_secret']
+
     @classmethod
     def delete_user(cls, username: str) -> None:
         """
@@ -134,6 +265,9 @@ class Users(db.Model):
             raise ValueError(f"User {username} not found")
         db.session.delete(user)
         db.session.commit()
+        cache = get_user_cache()
+        if cache:
+            cache.invalidate(username)
         logger.info("User %s deleted successfully", username)
 
     @classmethod
@@ -150,11 +284,7 @@ class Users(db.Model):
         Raises:
             ValueError: If the user does not exist.
         """
-        user = cls.query.filter_by(username=username).first()
-        if not user:
-            logger.info("User %s not found", username)
-            raise ValueError(f"User {username} not found")
-        return user.id
+        return cls._get_user_record(username)['id']
 
     @classmethod
     def update_password(cls, username: str, new_password: str) -> None:
@@ -177,4 +307,7 @@ class Users(db.Model):
         user.salt = salt
         user.password = hashed_password
         db.session.commit()
+        cache = get_user_cache()
+        if cache:
+            cache.set(username, user._to_record())
         logger.info("Password updated successfully for user: %s", username)
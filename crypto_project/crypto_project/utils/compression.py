@@ -0,0 +1,140 @@
+import gzip
+import zlib
+from typing import Iterable, Iterator, Optional, Tuple
+
+from flask import request
+
+from crypto_project.utils.lru import LRUCache
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+# Bodies of these types are compressed; event streams are left alone so every event is flushed immediately
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript',
+                      'application/xml', 'text/plain', 'text/html', 'text/csv', 'text/css')
+# Streamed responses of these types are compressed chunk by chunk
+STREAMING_TYPES = ('application/x-ndjson',)
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """The content codings this process can produce, in order of preference."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encodings) -> Optional[str]:
+    """
+    Choose a content coding from an Accept-Encoding header.
+
+    Args:
+        accept_encodings (werkzeug.datastructures.Accept): The parsed header.
+
+    Returns:
+        str: 'br' or 'gzip', or None if the client accepts neither.
+    """
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class Compressor:
+    """
+    Response compression with a size threshold and a cache of compressed bodies.
+
+    Buffered responses above ``min_size`` are compressed with the best coding
+    the client accepts (brotli when installed, otherwise gzip). Responses
+    that carry an ETag are compressed once per (ETag, coding): the encoded
+    bytes are kept in an LRU, so popular responses (including those served
+    from the response cache) are not recompressed per request. Streamed
+    NDJSON responses are compressed incrementally, flushing after each chunk.
+    Compressed responses get a weak ETag, as the bytes differ from the
+    identity representation.
+    """
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5,
+                 cache_size: int = 256):
+        """
+        Args:
+            min_size (int): Smallest body, in bytes, that is compressed.
+            gzip_level (int): gzip compression level (1-9).
+            brotli_quality (int): brotli quality (0-11).
+            cache_size (int): Compressed bodies kept in memory (0 disables the cache).
+        """
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self._cache = LRUCache(cache_size)  # (ETag, coding) -> compressed body
+
+    def init_app(self, app) -> None:
+        """Compress responses. Registers an after_request hook on the app."""
+
+        @app.after_request
+        def _compress_response(response):
+            return self.process(response)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _cached_compress(self, etag: Optional[str], body: bytes, encoding: str) -> bytes:
+        if etag is None or not self.cache_size:
+            return self.compress(body, encoding)
+        key = (etag, encoding)
+        compressed = self._cache.get(key)
+        if compressed is None:
+            compressed = self.compress(body, encoding)
+            self._cache.set(key, compressed)
+        return compressed
+
+    def _stream(self, chunks: Iterable, encoding: str) -> Iterator[bytes]:
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            for chunk in chunks:
+                data = compressor.process(chunk.encode() if isinstance(chunk, str) else chunk) + compressor.flush()
+                if data:
+                    yield data
+            yield compressor.finish()
+        else:
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+            for chunk in chunks:
+                data = compressor.compress(chunk.encode() if isinstance(chunk, str) else chunk)
+                yield data + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield compressor.flush()
+
+    def process(self, response):
+        """Compress a response if the client, type and size allow it."""
+        if response.mimetype not in COMPRESSIBLE_TYPES and response.status_code != 304:
+            return response
+        encoding = negotiate(request.accept_encodings)
+        etag, weak = response.get_etag()
+        if response.status_code == 304:
+            # Match the ETag of the compressed representation the client holds
+            if encoding is not None and etag is not None and not weak:
+                response.set_etag(etag, weak=True)
+            return response
+        response.vary.add('Accept-Encoding')
+        if (encoding is None or request.method == 'HEAD' or response.status_code < 200
+                or response.status_code == 204 or 'Content-Encoding' in response.headers
+                or response.direct_passthrough):
+            return response
+
+        if response.is_streamed:
+            if response.mimetype not in STREAMING_TYPES:
+                return response
+            response.response = self._stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            response.set_data(self._cached_compress(etag, body, encoding))
+        response.headers['Content-Encoding'] = encoding
+        if etag is not None:
+            response.set_etag(etag, weak=True)
+        return response
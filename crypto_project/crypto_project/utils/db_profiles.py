@@ -0,0 +1,157 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# Pragmas read back by the diagnostics endpoint, whatever the profile sets
+REPORTED_PRAGMAS = ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store', 'busy_timeout')
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    """
+    A named set of SQLite pragmas and connection pool settings.
+
+    Pragmas are applied to every new DBAPI connection through a connect
+    event. Pool settings only apply to file databases: in-memory databases
+    share a single connection.
+    """
+
+    name: str
+    description: str
+    pragmas: Dict[str, Any] = field(default_factory=dict)
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    pool_timeout: Optional[float] = None
+
+    def engine_options(self, uri: Optional[str], pool_size: Optional[int] = None,
+                       max_overflow: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return the SQLALCHEMY_ENGINE_OPTIONS for a database URI.
+
+        Args:
+            uri (str): The database URI.
+            pool_size (int, optional): Overrides the profile's pool size.
+            max_overflow (int, optional): Overrides the profile's overflow.
+
+        Returns:
+            dict: Keyword arguments for create_engine.
+        """
+        if not uri or is_memory_database(uri):
+            return {}
+        options = {
+            'pool_size': pool_size if pool_size is not None else self.pool_size,
+            'max_overflow': max_overflow if max_overflow is not None else self.max_overflow,
+            'pool_timeout': self.pool_timeout,
+        }
+        return {key: value for key, value in options.items() if value is not None}
+
+    def install(self, engine) -> None:
+        """Apply the profile's pragmas to every connection the engine opens from now on."""
+        if engine.dialect.name != 'sqlite' or not self.pragmas:
+            return
+        memory = is_memory_database(str(engine.url))
+        pragmas = [(name, value) for name, value in self.pragmas.items()
+                   if not (memory and name == 'journal_mode')]
+
+        @event.listens_for(engine, 'connect')
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas:
+                    cursor.execute(f"PRAGMA {name}={value}")
+            finally:
+                cursor.close()
+
+
+PROFILES: Dict[str, EngineProfile] = {
+    'default': EngineProfile(
+        'default', 'SQLite and SQLAlchemy defaults: rollback journal, synchronous=FULL, default pool.'),
+    'throughput': EngineProfile(
+        'throughput',
+        'WAL with synchronous=NORMAL, memory-mapped reads and a 64 MiB page cache; sized for threaded servers.',
+        pragmas={
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,
+        },
+        pool_size=10, max_overflow=20, pool_timeout=30),
+    'durable': EngineProfile(
+        'durable',
+        'WAL with synchronous=FULL: every commit is on disk before it returns.',
+        pragmas={
+            'journal_mode': 'WAL',
+            'synchronous': 'FULL',
+            'cache_size': -16 * 1024,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,
+        },
+        pool_size=5, max_overflow=10, pool_timeout=30),
+}
+
+
+def is_memory_database(uri: str) -> bool:
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def get_profile(name: str) -> EngineProfile:
+    """
+    Look up an engine profile by name.
+
+    Raises:
+        ValueError: If there is no profile with that name.
+    """
+    try:
+        return PROFILES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown DB_PROFILE {name!r}; expected one of: {', '.join(PROFILES)}")
+
+
+def describe_engine(engine, profile: Optional[EngineProfile]) -> Dict[str, Any]:
+    """
+    Report the active profile, the pragmas in effect on a pooled connection and the pool state.
+
+    Returns:
+        dict: A JSON-serializable description of the engine.
+    """
+    pragmas = {}
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as connection:
+            for name in REPORTED_PRAGMAS:
+                pragmas[name] = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+    pool = engine.pool
+    pool_info: Dict[str, Any] = {'class': type(pool).__name__, 'status': pool.status()}
+    for attribute in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, attribute, None)
+        if callable(method):
+            pool_info[attribute] = method()
+    if hasattr(pool, '_max_overflow'):
+        pool_info['max_overflow'] = pool._max_overflow
+    return {
+        'profile': profile.name if profile else None,
+        'description': profile.description if profile else None,
+        'configured_pragmas': dict(profile.pragmas) if profile else {},
+        'pragmas': pragmas,
+        'pool': pool_info,
+        'dialect': engine.dialect.name,
+        'database': engine.url.render_as_string(hide_password=True),
+    }
+
+
+def get_db_profile() -> Optional[EngineProfile]:
+    """Return the current application's engine profile."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('db_profile')
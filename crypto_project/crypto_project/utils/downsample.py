@@ -0,0 +1,123 @@
+from typing import Dict, List, Sequence
+
+from crypto_project.utils.lru import LRUCache
+
+MODES = ('lttb', 'minmax')
+
+# The market_chart series that are downsampled; other keys are passed through
+CHART_SERIES = ('prices', 'market_caps', 'total_volumes')
+
+
+def lttb(points: Sequence[Sequence[float]], threshold: int) -> List:
+    """
+    Downsample a [timestamp, value] series with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, from each of ``threshold - 2``
+    equal-width buckets in between, the point forming the largest triangle
+    with the previously kept point and the average of the next bucket. This
+    preserves the series' visual shape (peaks and dips) far better than
+    picking every n-th point.
+
+    Args:
+        points (Sequence): [timestamp, value] pairs sorted by timestamp.
+        threshold (int): Number of points to return (at least 3).
+
+    Returns:
+        list: The selected points, or ``points`` unchanged if it is already short enough.
+    """
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(points)
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    every = (count - 2) / (threshold - 2)
+    sampled = [points[0]]
+    selected = 0
+    for bucket in range(threshold - 2):
+        next_start = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, count)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        ax, ay = xs[selected], ys[selected]
+        dx, dy = ax - avg_x, avg_y - ay
+        start, end = int(bucket * every) + 1, next_start
+        # Twice the triangle area; the constant factor does not change the winner
+        areas = [abs(dx * (y - ay) - (ax - x) * dy) for x, y in zip(xs[start:end], ys[start:end])]
+        selected = start + areas.index(max(areas))
+        sampled.append(points[selected])
+    sampled.append(points[-1])
+    return sampled
+
+
+def min_max_envelope(points: Sequence[Sequence[float]], threshold: int) -> List:
+    """
+    Downsample a [timestamp, value] series to the minimum and maximum of each bucket.
+
+    Splits the series into ``threshold // 2`` buckets and keeps each
+    bucket's lowest and highest points in time order, so every extreme is
+    still drawn.
+
+    Args:
+        points (Sequence): [timestamp, value] pairs sorted by timestamp.
+        threshold (int): Maximum number of points to return (at least 2).
+
+    Returns:
+        list: The selected points, or ``points`` unchanged if it is already short enough.
+    """
+    count = len(points)
+    if threshold >= count or threshold < 2:
+        return list(points)
+    buckets = threshold // 2
+    every = count / buckets
+    ys = [point[1] for point in points]
+    sampled = []
+    for bucket in range(buckets):
+        start, end = int(bucket * every), int((bucket + 1) * every)
+        window = ys[start:end]
+        low = start + window.index(min(window))
+        high = start + window.index(max(window))
+        sampled.extend(points[index] for index in sorted({low, high}))
+    return sampled
+
+
+def downsample_chart(data: Dict, points: int, mode: str = 'lttb') -> Dict:
+    """
+    Downsample each series of a CoinGecko market_chart response.
+
+    Args:
+        data (dict): The response, with 'prices', 'market_caps' and 'total_volumes' series.
+        points (int): Number of points to keep per series.
+        mode (str): 'lttb' or 'minmax'.
+
+    Returns:
+        dict: A copy of ``data`` with each series downsampled.
+
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown downsampling mode {mode!r}; expected one of: {', '.join(MODES)}")
+    reduce = lttb if mode == 'lttb' else min_max_envelope
+    return {
+        key: reduce(series, points) if key in CHART_SERIES and isinstance(series, list) else series
+        for key, series in data.items()
+    }
+
+
+class ChartCache(LRUCache):
+    """
+    Small LRU cache of downsampled charts with a time-to-live.
+
+    Keyed by (coin, range, points, mode), so popular chart requests skip both
+    the upstream call and the downsampling.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 60.0):
+        """
+        Args:
+            max_size (int): Maximum number of charts kept in memory.
+            ttl (float): Seconds a chart stays valid.
+        """
+        super().__init__(max_size, ttl=ttl)
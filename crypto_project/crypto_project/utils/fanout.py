@@ -0,0 +1,120 @@
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+FANOUT_WORKERS = int(os.getenv("UPSTREAM_FANOUT_WORKERS", "32"))
+
+# Shared by every request's event loop; recreated in forked workers
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_slots: Optional[threading.BoundedSemaphore] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+# Monotonic deadline of the fan-out call running in the current context
+_call_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("fanout_call_deadline", default=None)
+
+
+def _get_executor() -> Tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    """Return the shared pool and the semaphore counting its free threads."""
+    global _executor, _executor_slots, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="upstream")
+            _executor_slots = threading.BoundedSemaphore(FANOUT_WORKERS)
+            _executor_pid = os.getpid()
+        return _executor, _executor_slots
+
+
+def call_timeout(timeout: float) -> float:
+    """
+    Cap a blocking call's own timeout by the fan-out deadline of the current call, if any.
+
+    ``asyncio.wait_for`` stops waiting for a call but cannot stop the thread
+    running it, so upstream clients pass their timeout through this to give up
+    when the fan-out does and free the thread.
+
+    Args:
+        timeout (float): The timeout the caller would use on its own.
+
+    Returns:
+        float: The smaller of ``timeout`` and the seconds left before the deadline.
+    """
+    deadline = _call_deadline.get()
+    if deadline is None:
+        return timeout
+    return max(min(timeout, deadline - time.monotonic()), 0.001)
+
+
+def _is_empty(result: Any) -> bool:
+    # The model's upstream methods return None, {} or [] when a request fails
+    return result is None or (isinstance(result, (dict, list)) and not result)
+
+
+async def fan_out(calls: Dict[str, Callable[[], Any]], timeout: float) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Run blocking upstream calls concurrently, each with its own timeout.
+
+    Every call runs on a shared thread pool with a copy of the caller's
+    context (so the app context and metrics are available). The whole
+    fan-out takes as long as the slowest call, capped at ``timeout``, rather
+    than the sum of the calls. A call that raises, times out or returns no
+    data does not fail the others.
+
+    Calls never queue behind busy threads: when every pool thread is taken,
+    the call fails immediately instead of spending its timeout waiting, and
+    calls see their deadline through ``call_timeout``.
+
+    Args:
+        calls (dict): Name -> zero-argument callable.
+        timeout (float): Seconds to wait for each call.
+
+    Returns:
+        tuple: (results, errors): name -> result for the calls that succeeded, and
+        name -> error message for those that did not.
+    """
+    loop = asyncio.get_running_loop()
+    executor, slots = _get_executor()
+
+    def bounded(call: Callable[[], Any]) -> Any:
+        try:
+            _call_deadline.set(time.monotonic() + timeout)
+            return call()
+        finally:
+            slots.release()
+
+    async def run(call: Callable[[], Any]) -> Any:
+        if not slots.acquire(blocking=False):
+            raise RuntimeError("Upstream pool is busy")
+        context = contextvars.copy_context()
+        try:
+            future = loop.run_in_executor(executor, context.run, bounded, call)
+        except BaseException:
+            slots.release()
+            raise
+        return await asyncio.wait_for(future, timeout)
+
+    outcomes = await asyncio.gather(*(run(call) for call in calls.values()), return_exceptions=True)
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for name, outcome in zip(calls, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            errors[name] = f"Timed out after {timeout:g} seconds"
+        elif isinstance(outcome, Exception):
+            errors[name] = str(outcome) or type(outcome).__name__
+        elif _is_empty(outcome):
+            errors[name] = "No data returned"
+        else:
+            results[name] = outcome
+    if errors:
+        logger.warning("Upstream fan-out returned partial results; failed: %s", ", ".join(errors))
+    return results, errors
@@ -0,0 +1,111 @@
+import hashlib
+from functools import wraps
+from typing import Any, Callable, Optional, Tuple, Union
+
+from flask import current_app, request
+
+from crypto_project.utils.lru import LRUCache
+
+# A number of seconds, or a callable taking the view's arguments
+MaxAge = Union[float, Callable[..., Optional[float]]]
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha256("\0".join(str(part) for part in parts).encode()).hexdigest()[:32]
+
+
+class ResponseCache:
+    """
+    Conditional GET support for views whose data has a cheap version token.
+
+    A view's ``version`` function (given the view's arguments) returns a
+    value that changes whenever the response would: a price snapshot
+    sequence, a chart's last timestamp, a user's transaction log version. The
+    ETag is derived from the request URL and that token, so a matching
+    ``If-None-Match`` gets a 304 without running the view. Serialized bodies
+    of versioned responses are kept in a small LRU, so repeat hits with an
+    unchanged token skip serialization too.
+
+    When ``version`` returns None (the data's version is unknown), the view
+    runs and the ETag is a hash of the body: clients still save the transfer,
+    but not the work. Responses the view marks ``Cache-Control: no-store``
+    are passed through untouched.
+    """
+
+    def __init__(self, max_entries: int = 512, enabled: bool = True):
+        """
+        Args:
+            max_entries (int): Serialized bodies kept in memory (0 disables the body cache).
+            enabled (bool): When False, views are left undecorated.
+        """
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._bodies = LRUCache(max_entries)  # URL -> (ETag, body, mimetype)
+
+    def _get_body(self, key: str, etag: str) -> Optional[Tuple[bytes, str]]:
+        entry = self._bodies.get(key)
+        if entry is None or entry[0] != etag:
+            return None
+        return entry[1], entry[2]
+
+    def _store_body(self, key: str, etag: str, body: bytes, mimetype: str) -> None:
+        self._bodies.set(key, (etag, body, mimetype))
+
+    def clear(self) -> None:
+        self._bodies.clear()
+
+    @staticmethod
+    def _cache_control(response, etag: str, max_age: Optional[float], private: bool):
+        response.set_etag(etag)
+        visibility = 'private' if private else 'public'
+        if max_age:
+            response.headers['Cache-Control'] = f"{visibility}, max-age={int(max_age)}"
+        else:
+            response.headers['Cache-Control'] = f"{visibility}, no-cache"
+        return response
+
+    def cached(self, version: Optional[Callable[..., Any]] = None, max_age: MaxAge = 0, private: bool = False):
+        """
+        Decorate a GET view (sync or async) with ETag, Cache-Control and 304 handling.
+
+        Args:
+            version (callable, optional): Returns the data's version token for the view's
+                arguments, or None if it is unknown.
+            max_age (float or callable): Seconds clients may reuse the response without
+                revalidating (0 means always revalidate).
+            private (bool): Mark responses as cacheable by the client only, not shared caches.
+        """
+
+        def decorator(view):
+            if not self.enabled:
+                return view
+
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                token = version(**kwargs) if version is not None else None
+                seconds = max_age(**kwargs) if callable(max_age) else max_age
+                key = request.full_path
+                etag = _digest(key, token) if token is not None else None
+
+                if etag is not None:
+                    # Weak comparison: compressed responses carry the weak form of the ETag
+                    if request.if_none_match.contains_weak(etag):
+                        response = current_app.response_class(status=304)
+                        return self._cache_control(response, etag, seconds, private)
+                    cached_body = self._get_body(key, etag) if self.max_entries else None
+                    if cached_body is not None:
+                        response = current_app.response_class(cached_body[0], mimetype=cached_body[1])
+                        return self._cache_control(response, etag, seconds, private)
+
+                response = current_app.make_response(current_app.ensure_sync(view)(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed or response.cache_control.no_store:
+                    return response
+                body = response.get_data()
+                if etag is None:
+                    etag = _digest(key, hashlib.sha256(body).hexdigest())
+                elif self.max_entries:
+                    self._store_body(key, etag, body, response.mimetype)
+                self._cache_control(response, etag, seconds, private)
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
@@ -0,0 +1,82 @@
+import re
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: without it the app uses Flask's json module provider
+    orjson = None
+
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
+
+def _escape_non_ascii(match: 're.Match') -> str:
+    code = ord(match.group())
+    if code > 0xFFFF:  # Outside the BMP: a UTF-16 surrogate pair, as the json module writes it
+        code -= 0x10000
+        return '\\u{:04x}\\u{:04x}'.format(0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return '\\u{:04x}'.format(code)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson.
+
+    Output matches Flask's default provider: keys are sorted when
+    ``sort_keys`` is set, dates use the HTTP date format, and Decimal, UUID
+    and ``__html__`` objects go through the same ``default`` hook. Responses
+    are written straight from orjson's bytes. orjson always writes raw UTF-8,
+    so with ``ensure_ascii`` set (the default) non-ASCII characters in its
+    output are replaced by the same ``\\uXXXX`` escapes the json module
+    writes; ASCII-only output is left as is. Arguments orjson does not support
+    (other than ``indent=2`` and ``separators``) fall back to the json module.
+
+    One difference remains: NaN and Infinity floats are written as ``null``
+    (valid JSON), where the default provider writes the non-standard
+    ``NaN`` / ``Infinity`` tokens.
+    """
+
+    def _option(self, indent: Any = None) -> int:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj: Any, indent: Any = None) -> bytes:
+        """Serialize data as UTF-8 JSON bytes."""
+        try:
+            data = orjson.dumps(obj, default=self.default, option=self._option(indent))
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which the json module handles
+            return super().dumps(obj, ensure_ascii=self.ensure_ascii, indent=indent,
+                                 separators=None if indent else (",", ":")).encode()
+        if self.ensure_ascii and not data.isascii():
+            # Non-ASCII bytes only occur inside strings, so escaping them keeps the JSON valid
+            return _NON_ASCII.sub(_escape_non_ascii, data.decode()).encode()
+        return data
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        indent = kwargs.pop('indent', None)
+        kwargs.pop('separators', None)
+        if kwargs or indent not in (None, 2):
+            return super().dumps(obj, indent=indent, **kwargs)
+        return self.dumps_bytes(obj, indent=indent).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent=2 if pretty else None) + b"\n",
+                                        mimetype=self.mimetype)
+
+
+def json_provider_class() -> type:
+    """Return FastJSONProvider when orjson is installed, otherwise Flask's default provider."""
+    return FastJSONProvider if orjson is not None else DefaultJSONProvider
@@ -0,0 +1,38 @@
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return a module whose code only runs on first attribute access.
+
+    Used for heavy dependencies that only some requests need (HTTP client,
+    Redis, QR rendering), so importing the app and starting a worker does
+    not pay for them. Modules that are already imported are returned as is.
+
+    Args:
+        name (str): The absolute module name, e.g. ``"requests"``.
+
+    Returns:
+        ModuleType: The (lazily loaded) module.
+
+    Raises:
+        ModuleNotFoundError: If the module cannot be found.
+    """
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        return module
@@ -1,26 +1,138 @@
+import atexit
 import logging
+import os
+import queue
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
 
-from flask import current_app, has_request_context
+_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
+# Every configured logger enqueues records; one listener thread writes them
+# to stderr, so request threads never block on console or pipe I/O.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_queue_handler = QueueHandler(_log_queue)
+_stream_handler = logging.StreamHandler(sys.stderr)
+_stream_handler.setFormatter(logging.Formatter(_FORMAT))
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
 
-def configure_logger(logger):
-    logger.setLevel(logging.DEBUG)  # Set the desired logging level here
 
-    # Create a console handler that logs to stderr
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setLevel(logging.DEBUG)
+def _default_level() -> int:
+    return logging.getLevelName(os.getenv('LOG_LEVEL', 'INFO').upper())
 
-    # Create a formatter with a timestamp
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-    # Add the formatter to the handler
-    handler.setFormatter(formatter)
+def start_log_listener() -> None:
+    """Start the background thread that writes queued log records (idempotent)."""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = QueueListener(_log_queue, _stream_handler, respect_handler_level=True)
+            _listener.start()
 
-    # Add the handler to the logger
-    logger.addHandler(handler)
 
-    if has_request_context():
-        app_logger = current_app.logger
-        for handler in app_logger.handlers:
-            logger.addHandler(handler)
\ No newline at end of file
+def stop_log_listener() -> None:
+    """Write out every queued record and stop the listener thread."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _restart_listener_after_fork() -> None:
+    # Threads do not survive fork: forked workers need their own listener
+    global _listener, _listener_lock
+    _listener_lock = threading.Lock()
+    _listener = None
+    start_log_listener()
+
+
+atexit.register(stop_log_listener)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
+def configure_logger(logger: logging.Logger, log_level: Optional[int] = None) -> None:
+    """
+    Route a logger through the shared queue handler.
+
+    Safe to call more than once for the same logger: the handler is only
+    attached once, and records are not propagated to the root logger, so
+    nothing is written twice.
+
+    Args:
+        logger (logging.Logger): The logger to configure.
+        log_level (int, optional): The log level (defaults to the LOG_LEVEL environment variable, or INFO).
+    """
+    logger.setLevel(log_level if log_level is not None else _default_level())
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
+    logger.propagate = False
+    start_log_listener()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token-bucket rate limit per message template.
+
+    Each distinct (logger, message format string) pair may emit ``rate``
+    records per second, with bursts of up to ``burst``; the rest are dropped.
+    The next record let through reports how many similar records were
+    suppressed. Records above ``max_level`` (warnings and errors by default)
+    are never dropped.
+    """
+
+    def __init__(self, rate: float, burst: int = 10, max_level: int = logging.INFO):
+        """
+        Args:
+            rate (float): Records per second allowed for each message template.
+            burst (int): Maximum number of records allowed at once.
+            max_level (int): Highest level that is rate limited.
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_level = max_level
+        # (logger name, template) -> (tokens, last refill, suppressed count)
+        self._buckets: Dict[Tuple[str, str], Tuple[float, float, int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, suppressed = self._buckets.get(key, (float(self.burst), now, 0))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+        if suppressed and isinstance(record.args, tuple):
+            msg = str(record.msg) if record.args else str(record.msg).replace('%', '%%')
+            record.msg = msg + " (%d similar messages suppressed)"
+            record.args = record.args + (suppressed,)
+        return True
+
+
+def rate_limit_logger(logger: logging.Logger, rate: float, burst: int = 10) -> RateLimitFilter:
+    """
+    Rate limit a high-volume logger's messages, replacing any earlier limit.
+
+    Args:
+        logger (logging.Logger): The logger to limit.
+        rate (float): Records per second allowed for each message template.
+        burst (int): Maximum number of records allowed at once.
+
+    Returns:
+        RateLimitFilter: The installed filter.
+    """
+    for existing in [f for f in logger.filters if isinstance(f, RateLimitFilter)]:
+        logger.removeFilter(existing)
+    limiter = RateLimitFilter(rate, burst)
+    logger.addFilter(limiter)
+    return limiter
@@ -0,0 +1,244 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class Subscription:
+    """
+    A single consumer's mailbox.
+
+    Conflated topics (prices) keep only the latest message per topic, so a
+    slow consumer skips intermediate updates instead of building a backlog.
+    Other topics (alerts) are queued, up to ``max_queue`` messages, dropping
+    the oldest when full.
+    """
+
+    def __init__(self, topics: Iterable[str], max_queue: int = 100):
+        self.topics: Set[str] = set(topics)
+        self.dropped = 0
+        self.closed = False
+        self._latest: "OrderedDict[str, Tuple[str, Dict]]" = OrderedDict()
+        self._queue: "deque[Tuple[str, Dict]]" = deque(maxlen=max_queue)
+        self._cond = threading.Condition()
+
+    def deliver(self, topic: str, event: str, data: Dict, conflate: bool) -> None:
+        with self._cond:
+            if conflate:
+                if topic in self._latest:
+                    self.dropped += 1
+                    del self._latest[topic]
+                self._latest[topic] = (event, data)
+            else:
+                if len(self._queue) == self._queue.maxlen:
+                    self.dropped += 1
+                self._queue.append((event, data))
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> List[Tuple[str, Dict]]:
+        """
+        Wait for pending messages and take all of them.
+
+        Args:
+            timeout (float, optional): Seconds to wait; an empty list is returned on timeout.
+
+        Returns:
+            List[Tuple[str, dict]]: (event, data) pairs, queued messages first.
+        """
+        with self._cond:
+            if not self._latest and not self._queue and not self.closed:
+                self._cond.wait(timeout)
+            messages = list(self._queue) + list(self._latest.values())
+            self._queue.clear()
+            self._latest.clear()
+            return messages
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class PubSub:
+    """In-process topic fan-out. Publishing never blocks on subscribers."""
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(topics, max_queue=self.max_queue)
+        with self._lock:
+            for topic in subscription.topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._topics[topic]
+
+    def publish(self, topic: str, event: str, data: Dict, conflate: bool = True) -> int:
+        """
+        Deliver a message to every subscriber of a topic.
+
+        Returns:
+            int: The number of subscribers the message was delivered to.
+        """
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        for subscription in subscribers:
+            subscription.deliver(topic, event, data, conflate)
+        return len(subscribers)
+
+    def topics(self, prefix: str = "") -> List[str]:
+        """Return the topics that currently have subscribers."""
+        with self._lock:
+            return [topic for topic in self._topics if topic.startswith(prefix)]
+
+
+def price_topic(crypto_id: str) -> str:
+    return f"price:{crypto_id}"
+
+
+def alert_topic(user_id: int) -> str:
+    return f"alerts:{user_id}"
+
+
+def format_sse(event: str, data: Dict) -> str:
+    """Encode a message in the text/event-stream format."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class MarketStream:
+    """
+    Fans out live prices and fired alerts to streaming clients.
+
+    Every price observation goes through ``publish_price``: it is published
+    to the coin's topic, evaluated against pending price alerts, and each
+    fired alert is pushed to its owner's alert topic. A single poller thread
+    fetches all subscribed coins with one upstream request per interval, so
+    upstream load no longer grows with the number of clients.
+    """
+
+    def __init__(self, app, crypto_model, alert_index=None, poll_interval: float = 10.0,
+                 heartbeat: float = 15.0, max_queue: int = 100):
+        """
+        Args:
+            app (Flask): The application, used for the poller's app context.
+            crypto_model (CryptoDataModel): Upstream price client.
+            alert_index (PriceAlertIndex, optional): Pending alerts to evaluate.
+            poll_interval (float): Seconds between upstream polls; 0 disables the poller.
+            heartbeat (float): Seconds between keep-alive comments on idle streams.
+            max_queue (int): Maximum queued alert messages per subscriber.
+        """
+        self.app = app
+        self.crypto_model = crypto_model
+        self.alert_index = alert_index
+        self.poll_interval = poll_interval
+        self.heartbeat = heartbeat
+        self.pubsub = PubSub(max_queue=max_queue)
+        self._poller: Optional[threading.Thread] = None
+        self._poller_lock = threading.Lock()
+
+    def publish_price(self, crypto_id: str, price: float) -> List[int]:
+        """
+        Publish a price update and push any alerts it fires.
+
+        Args:
+            crypto_id (str): The ID of the cryptocurrency.
+            price (float): The observed price.
+
+        Returns:
+            List[int]: IDs of the alerts that fired.
+        """
+        self.pubsub.publish(price_topic(crypto_id), 'price',
+                            {'crypto_id': crypto_id, 'price_usd': price, 'timestamp': time.time()})
+        if self.alert_index is None:
+            return []
+        fired = self.alert_index.on_price(crypto_id, price)
+        if fired:
+            from crypto_project.models.price_alert_model import PriceAlert
+
+            for alert in PriceAlert.get_alerts(fired):
+                if alert.user_id is not None:
+                    self.pubsub.publish(alert_topic(alert.user_id), 'alert', alert.to_dict(), conflate=False)
+        return fired
+
+    def subscribe(self, crypto_ids: Iterable[str], user_id: Optional[int] = None) -> Subscription:
+        """Subscribe to price topics and, for a logged-in user, their alert topic."""
+        topics = [price_topic(crypto_id) for crypto_id in crypto_ids]
+        if user_id is not None:
+            topics.append(alert_topic(user_id))
+        subscription = self.pubsub.subscribe(topics)
+        self._ensure_poller()
+        return subscription
+
+    def events(self, subscription: Subscription) -> Iterator[str]:
+        """
+        Yield a subscription's messages as server-sent events until the client disconnects.
+        """
+        try:
+            yield "retry: 3000\n\n"
+            while not subscription.closed:
+                messages = subscription.get(timeout=self.heartbeat)
+                if not messages:
+                    yield ": keep-alive\n\n"
+                for event, data in messages:
+                    yield format_sse(event, data)
+        finally:
+            self.pubsub.unsubscribe(subscription)
+
+    def poll_once(self) -> int:
+        """
+        Fetch every coin that has subscribers in one upstream request and publish the prices.
+
+        Returns:
+            int: The number of prices published.
+        """
+        crypto_ids = {topic.split(':', 1)[1] for topic in self.pubsub.topics('price:')}
+        if self.alert_index is not None and self.pubsub.topics('alerts:'):
+            crypto_ids.update(self.alert_index.crypto_ids)
+        if not crypto_ids:
+            return 0
+        prices = self.crypto_model.get_crypto_prices(sorted(crypto_ids))
+        for crypto_id, price in prices.items():
+            self.publish_price(crypto_id, price)
+        return len(prices)
+
+    def _ensure_poller(self) -> None:
+        if self.poll_interval <= 0:
+            return
+        with self._poller_lock:
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll_loop, name="price-poller", daemon=True)
+                self._poller.start()
+
+    def _poll_loop(self) -> None:
+        with self.app.app_context():
+            while True:
+                # Decide to stop under the lock so a concurrent subscribe either
+                # keeps this thread alive or starts a new one.
+                with self._poller_lock:
+                    if not self.pubsub.topics():
+                        self._poller = None
+                        break
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    logger.error("Price poll failed: %s", str(e))
+                time.sleep(self.poll_interval)
+        logger.info("Price poller stopped: no subscribers left")
@@ -0,0 +1,184 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+
+# Upper bounds in seconds; +Inf is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """A monotonically increasing count per label combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value:g}" for key, value in items]
+
+
+class Histogram:
+    """
+    Observations counted into fixed buckets per label combination.
+
+    Observing is a binary search plus two additions under a lock; buckets are
+    only made cumulative when the metrics are rendered.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, **labels) -> int:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    The application's metrics, rendered in the Prometheus text exposition format.
+
+    Each process keeps its own registry; with several workers, scrape each
+    one or aggregate by instance.
+    """
+
+    def __init__(self):
+        self.http_requests = Counter(
+            'http_requests_total', 'HTTP requests handled.', ('method', 'route', 'status'))
+        self.http_duration = Histogram(
+            'http_request_duration_seconds', 'Time spent in Flask views.', ('method', 'route'))
+        self.upstream_requests = Counter(
+            'upstream_requests_total', 'CoinGecko API requests.', ('endpoint', 'status'))
+        self.upstream_duration = Histogram(
+            'upstream_request_duration_seconds', 'CoinGecko API request latency.', ('endpoint',))
+        self.price_cache = Counter(
+            'price_cache_lookups_total', 'Shared price snapshot lookups.', ('result',))
+        self.db_queries = Counter(
+            'db_queries_total', 'SQL statements executed.', ('statement',))
+        self.db_duration = Histogram(
+            'db_query_duration_seconds', 'SQL statement execution time.', ('statement',), buckets=QUERY_BUCKETS)
+        self._metrics = [self.http_requests, self.http_duration, self.upstream_requests,
+                         self.upstream_duration, self.price_cache, self.db_queries, self.db_duration]
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def init_app(self, app) -> None:
+        """Time every request. Registers request hooks on the app."""
+
+        @app.before_request
+        def _start_timer():
+            g._metrics_started = time.perf_counter()
+
+        @app.after_request
+        def _record_request(response):
+            started = g.pop('_metrics_started', None)
+            if started is not None:
+                route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+                self.http_duration.observe(time.perf_counter() - started, method=request.method, route=route)
+                self.http_requests.inc(method=request.method, route=route, status=response.status_code)
+            return response
+
+    def instrument_engine(self, engine) -> None:
+        """Count and time every SQL statement executed on an engine."""
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _before_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('_metrics_started', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _after_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info['_metrics_started'].pop()
+            kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+            if kind not in ('SELECT', 'INSERT', 'UPDATE', 'DELETE'):
+                kind = 'OTHER'
+            self.db_queries.inc(statement=kind)
+            self.db_duration.observe(time.perf_counter() - started, statement=kind)
+
+        @event.listens_for(engine, 'handle_error')
+        def _on_error(exception_context):
+            connection = exception_context.connection
+            if connection is not None and connection.info.get('_metrics_started'):
+                connection.info['_metrics_started'].pop()
+
+
+def get_metrics() -> Optional[MetricsRegistry]:
+    """Return the current application's metrics registry, if metrics are enabled."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('metrics')
@@ -0,0 +1,58 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+FORMATS = ('records', 'columnar')
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated ``fields`` query parameter.
+
+    Returns:
+        list: The field names in request order without duplicates, or None when no projection was requested.
+    """
+    if value is None:
+        return None
+    fields = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    return fields or None
+
+
+def project(record: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Keep only the requested fields of a record; missing fields are returned as None."""
+    if fields is None:
+        return record
+    return {name: record.get(name) for name in fields}
+
+
+def to_columns(records: Iterable[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> Dict[str, List[Any]]:
+    """
+    Convert a list of records into parallel arrays, one per field.
+
+    Each field name is sent once instead of once per record, which also
+    compresses better.
+
+    Args:
+        records (Iterable[dict]): The records.
+        fields (Sequence[str], optional): The fields to include (defaults to every
+            field, in the order first seen).
+
+    Returns:
+        dict: Field name -> list of values, in record order (None where a record lacks the field).
+    """
+    records = list(records)
+    if fields is None:
+        fields = list(dict.fromkeys(name for record in records for name in record))
+    return {name: [record.get(name) for record in records] for name in fields}
+
+
+def format_records(records: List[Dict[str, Any]], fields: Optional[Sequence[str]], fmt: str = 'records'):
+    """
+    Apply a field projection and response format to a list of records.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of: {', '.join(FORMATS)}")
+    if fmt == 'columnar':
+        return to_columns(records, fields)
+    return [project(record, fields) for record in records]
@@ -0,0 +1,86 @@
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from crypto_project.utils.logger import configure_logger
+from crypto_project.utils.lru import LRUCache
+from crypto_project.utils.twofa_utils import generate_qr_code_png
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class QRCodeCache:
+    """
+    LRU cache of PNG-encoded 2FA QR codes rendered in a worker pool.
+
+    Entries are keyed by (username, TOTP secret, issuer), so a rotated secret
+    never serves a stale code. Concurrent requests for the same key wait on a
+    single render instead of encoding the image once each.
+    """
+
+    def __init__(self, max_size: int = 1024, workers: int = 2):
+        """
+        Args:
+            max_size (int): Maximum number of PNGs kept in memory.
+            workers (int): Number of rendering threads.
+        """
+        self.max_size = max_size
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="qr-render")
+        self._cache = LRUCache(max_size)  # (username, secret, issuer) -> PNG
+        self._pending: Dict[Tuple[str, str, str], Future] = {}
+        # Reentrant: a render that finishes before add_done_callback runs its
+        # callback immediately, while get_png still holds the lock.
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def etag(username: str, totp_secret: str, issuer_name: str) -> str:
+        """
+        Compute the ETag of a QR code without rendering it.
+
+        The image is a pure function of its key, so the key's digest identifies it.
+        """
+        return hashlib.sha256(f"{issuer_name}\0{username}\0{totp_secret}".encode()).hexdigest()[:32]
+
+    def get_png(self, username: str, totp_secret: str, issuer_name: str = "CryptoApp",
+                timeout: Optional[float] = 10.0) -> bytes:
+        """
+        Return the PNG for a QR code, rendering it in the worker pool on a miss.
+
+        Args:
+            username (str): The username for the TOTP setup.
+            totp_secret (str): The TOTP secret key.
+            issuer_name (str): The name of the application or issuer.
+            timeout (float, optional): Seconds to wait for a render.
+
+        Returns:
+            bytes: The PNG-encoded QR code.
+        """
+        key = (username, totp_secret, issuer_name)
+        with self._lock:
+            png = self._cache.get(key)
+            if png is not None:
+                return png
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pool.submit(generate_qr_code_png, *key)
+                self._pending[key] = future
+                # Stores the render even if every waiter has timed out
+                future.add_done_callback(lambda done: self._store(key, done))
+        png = future.result(timeout=timeout)
+        # The callback may still be pending on the render thread; store before returning
+        self._store(key, future)
+        return png
+
+    def _store(self, key: Tuple[str, str, str], future: Future) -> None:
+        """Move a finished render from pending into the LRU; safe to call more than once."""
+        with self._lock:
+            if self._pending.get(key) is not future:
+                return  # Already stored by the callback or an earlier waiter
+            del self._pending[key]
+            if future.exception() is not None:
+                logger.error("Failed to render QR code for %s: %s", key[0], future.exception())
+                return
+            self._cache.set(key, future.result())
@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+import uuid
+from functools import wraps
+from typing import Dict, Optional
+
+from flask import current_app, g, jsonify, request
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+from crypto_project.utils.logger import configure_logger
+from crypto_project.utils.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class SessionTokenManager:
+    """
+    Issues signed, expiring session tokens and verifies them without touching the database.
+
+    Tokens are signed with the application's SECRET_KEY. A bounded LRU keeps
+    the claims of recently validated tokens, so verifying a token on each
+    request is a dictionary lookup instead of a signature check (and never a
+    password check). Revoked token IDs are kept until the token would have
+    expired anyway.
+
+    With a ``revocation_store`` (anything with ``add(jti, expires_at)`` and
+    ``load()``, such as ``RevokedToken``), revocations are also written to
+    shared storage and the local set is reloaded from it at most every
+    ``sync_interval`` seconds, so a logout in one process is honoured by the
+    others within that interval.
+    """
+
+    def __init__(self, secret_key: str, max_age: int = 3600, cache_size: int = 10000,
+                 revocation_store=None, sync_interval: float = 5.0):
+        """
+        Args:
+            secret_key (str): Key used to sign tokens.
+            max_age (int): Token lifetime in seconds.
+            cache_size (int): Maximum number of validated tokens kept in memory.
+            revocation_store (optional): Shared store of revoked token IDs.
+            sync_interval (float): Seconds between reloads of the shared revocations.
+        """
+        if not secret_key:
+            raise ValueError("A SECRET_KEY is required to issue session tokens.")
+        self.max_age = max_age
+        self.cache_size = cache_size
+        self._serializer = URLSafeTimedSerializer(secret_key, salt="session-token")
+        self._cache = LRUCache(cache_size)  # Token -> claims
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.revocation_store = revocation_store
+        self.sync_interval = sync_interval
+        self._next_sync = 0.0
+
+    def issue(self, user_id: int, username: str, totp_verified: bool = False) -> str:
+        """
+        Issue a new session token.
+
+        Args:
+            user_id (int): The ID of the authenticated user.
+            username (str): The username of the authenticated user.
+            totp_verified (bool): Whether the login also passed a TOTP check.
+
+        Returns:
+            str: The signed token.
+        """
+        claims = {
+            'user_id': user_id,
+            'username': username,
+            'jti': uuid.uuid4().hex,
+            '2fa': totp_verified,
+        }
+        token = self._serializer.dumps(claims)
+        self._remember(token, dict(claims, exp=time.time() + self.max_age))
+        logger.info("Issued session token for user %s", username)
+        return token
+
+    def verify(self, token: str) -> Optional[Dict]:
+        """
+        Validate a session token.
+
+        Args:
+            token (str): The token presented by the client.
+
+        Returns:
+            dict: The token claims, or None if the token is invalid, expired or revoked.
+        """
+        self._sync_revocations()
+        claims = self._cache.get(token)
+        if claims is not None:
+            if claims['exp'] > time.time() and claims['jti'] not in self._revoked:
+                return claims
+            self._cache.pop(token)
+            return None
+
+        try:
+            claims, signed_at = self._serializer.loads(token, max_age=self.max_age, return_timestamp=True)
+        except SignatureExpired:
+            return None
+        except BadSignature:
+            logger.info("Rejected session token with a bad signature")
+            return None
+        if claims.get('jti') in self._revoked:
+            return None
+        claims = dict(claims, exp=signed_at.timestamp() + self.max_age)
+        self._remember(token, claims)
+        return claims
+
+    def revoke(self, token: str) -> bool:
+        """
+        Revoke a session token until it expires.
+
+        Args:
+            token (str): The token to revoke.
+
+        Returns:
+            bool: True if the token was valid and is now revoked, False otherwise.
+        """
+        claims = self.verify(token)
+        if claims is None:
+            return False
+        now = time.time()
+        with self._lock:
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            self._revoked[claims['jti']] = claims['exp']
+            self._cache.pop(token, None)
+        if self.revocation_store is not None:
+            self.revocation_store.add(claims['jti'], claims['exp'])
+        logger.info("Revoked session token for user %s", claims['username'])
+        return True
+
+    def _sync_revocations(self) -> None:
+        """Reload revocations from the shared store when the sync interval has passed."""
+        if self.revocation_store is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_sync:
+                return
+            self._next_sync = now + self.sync_interval
+        try:
+            revoked = self.revocation_store.load()
+        except Exception as e:
+            # Keep the revocations known so far and retry after the next interval
+            logger.error("Failed to load revoked session tokens: %s", str(e))
+            return
+        with self._lock:
+            revoked.update(self._revoked)
+            self._revoked = {jti: exp for jti, exp in revoked.items() if exp > time.time()}
+
+    def _remember(self, token: str, claims: Dict) -> None:
+        self._cache.set(token, claims)
+
+
+def get_bearer_token() -> Optional[str]:
+    """Return the bearer token from the Authorization header, if any."""
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):].strip() or None
+    return None
+
+
+def login_required(view):
+    """
+    Require a valid session token on a (sync or async) route.
+
+    The token claims are available to the view as ``g.session``.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = get_bearer_token()
+        claims = current_app.extensions['session_tokens'].verify(token) if token else None
+        if claims is None:
+            return jsonify({'error': "A valid session token is required."}), 401
+        g.session = claims
+        return current_app.ensure_sync(view)(*args, **kwargs)
+    return wrapper
+
+
+def owner_required(view):
+    """
+    Restrict a ``login_required`` route to the session's own user.
+
+    The user is the ``user_id`` view argument, or the ``user_id`` query
+    parameter when the route has none. Requests naming another user get 403.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user_id = kwargs['user_id'] if 'user_id' in kwargs else request.args.get('user_id', type=int)
+        if user_id is not None and user_id != g.session['user_id']:
+            return jsonify({'error': "Cannot access another user's data."}), 403
+        return current_app.ensure_sync(view)(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,166 @@
+import logging
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional, Tuple
+
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+_HEADER = struct.Struct('<QQ')  # sequence counter, number of used slots
+_VALUE = struct.Struct('<d')
+_ID_SIZE = 64  # bytes reserved per cryptocurrency ID (UTF-8, NUL padded)
+_MAX_READ_ATTEMPTS = 100
+
+
+class SharedPriceSnapshot:
+    """
+    Latest market prices in a fixed-layout shared memory block.
+
+    Layout: a header (sequence counter, slot count) followed by three arrays
+    of ``capacity`` entries: cryptocurrency IDs, prices and update times. One
+    ingester process writes; any number of worker processes read without
+    locks. Writers make the sequence counter odd while they update and even
+    when they are done (a seqlock), so a reader that sees the same even value
+    before and after copying a slot knows the copy is consistent, and retries
+    otherwise.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, owner: bool):
+        self.shm = shm
+        self.capacity = capacity
+        self.owner = owner
+        self._ids_offset = _HEADER.size
+        self._prices_offset = self._ids_offset + capacity * _ID_SIZE
+        self._times_offset = self._prices_offset + capacity * _VALUE.size
+        self._slots: Dict[str, int] = {}
+        self._indexed_count = 0
+
+    @staticmethod
+    def size_for(capacity: int) -> int:
+        return _HEADER.size + capacity * (_ID_SIZE + 2 * _VALUE.size)
+
+    @classmethod
+    def create(cls, capacity: int = 256, name: Optional[str] = None) -> 'SharedPriceSnapshot':
+        """
+        Allocate a new, empty snapshot. The creator is responsible for ``unlink``.
+
+        Args:
+            capacity (int): Maximum number of cryptocurrencies.
+            name (str, optional): Shared memory name; generated if omitted.
+        """
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls.size_for(capacity))
+        _HEADER.pack_into(shm.buf, 0, 0, 0)
+        logger.info("Created shared price snapshot %s with %d slots", shm.name, capacity)
+        return cls(shm, capacity, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, capacity: int = 256) -> 'SharedPriceSnapshot':
+        """
+        Attach to a snapshot created by another process.
+
+        Args:
+            name (str): Shared memory name.
+            capacity (int): The capacity the snapshot was created with.
+        """
+        # Only the creating process may unlink the block, so attaching must not
+        # register it with the resource tracker (Python < 3.13 always does).
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args, **kwargs: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, capacity, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def sequence(self) -> int:
+        """The writer's sequence counter; it changes with every batch of updates."""
+        return self._read_header()[0]
+
+    def _read_header(self) -> Tuple[int, int]:
+        return _HEADER.unpack_from(self.shm.buf, 0)
+
+    def update(self, prices: Dict[str, float], timestamp: Optional[float] = None) -> None:
+        """
+        Write a batch of prices. Must only be called from the single ingester.
+
+        Args:
+            prices (dict): Prices keyed by cryptocurrency ID.
+            timestamp (float, optional): Update time (defaults to now).
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        buf = self.shm.buf
+        seq, count = self._read_header()
+        _HEADER.pack_into(buf, 0, seq + 1, count)
+        try:
+            for crypto_id, price in prices.items():
+                slot = self._slots.get(crypto_id)
+                if slot is None:
+                    if count >= self.capacity:
+                        logger.warning("Shared price snapshot is full; skipping %s", crypto_id)
+                        continue
+                    encoded = crypto_id.encode()[:_ID_SIZE]
+                    buf[self._ids_offset + count * _ID_SIZE:self._ids_offset + (count + 1) * _ID_SIZE] = \
+                        encoded.ljust(_ID_SIZE, b'\0')
+                    slot = self._slots[crypto_id] = count
+                    count += 1
+                _VALUE.pack_into(buf, self._prices_offset + slot * _VALUE.size, price)
+                _VALUE.pack_into(buf, self._times_offset + slot * _VALUE.size, timestamp)
+        finally:
+            _HEADER.pack_into(buf, 0, seq + 2, count)
+            self._indexed_count = count
+
+    def _refresh_index(self, count: int) -> None:
+        buf = self.shm.buf
+        for slot in range(self._indexed_count, count):
+            start = self._ids_offset + slot * _ID_SIZE
+            crypto_id = bytes(buf[start:start + _ID_SIZE]).rstrip(b'\0').decode()
+            self._slots[crypto_id] = slot
+        self._indexed_count = count
+
+    def get(self, crypto_id: str, max_age: Optional[float] = None) -> Optional[float]:
+        """
+        Read the latest price of a cryptocurrency without taking a lock.
+
+        Args:
+            crypto_id (str): The ID of the cryptocurrency.
+            max_age (float, optional): Ignore prices older than this many seconds.
+
+        Returns:
+            float: The price, or None if it is unknown, stale or could not be read consistently.
+        """
+        buf = self.shm.buf
+        for _ in range(_MAX_READ_ATTEMPTS):
+            seq, count = self._read_header()
+            if seq % 2:
+                continue
+            if crypto_id not in self._slots and count > self._indexed_count:
+                self._refresh_index(count)
+            slot = self._slots.get(crypto_id)
+            if slot is None:
+                price = updated_at = None
+            else:
+                price, = _VALUE.unpack_from(buf, self._prices_offset + slot * _VALUE.size)
+                updated_at, = _VALUE.unpack_from(buf, self._times_offset + slot * _VALUE.size)
+            if self._read_header()[0] != seq:
+                continue
+            if price is None or (max_age is not None and time.time() - updated_at > max_age):
+                return None
+            return price
+        return None
+
+    def close(self) -> None:
+        """Detach from the shared memory block, unlinking it if this process created it."""
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,195 @@
+import logging
+import os
+import re
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+
+from crypto_project.utils.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a SQL statement so that executions differing only in values compare equal.
+
+    Collapses whitespace, IN lists of any length and inline numbers.
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(?...)", shape)
+    return _NUMBER.sub("N", shape)
+
+
+def _origin(depth: int) -> str:
+    """Return the innermost project frames (outside this module) that issued a statement."""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(_PROJECT_ROOT) and frame.filename != __file__
+    ]
+    return " <- ".join(
+        f"{os.path.relpath(frame.filename, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+        for frame in reversed(frames[-depth:])
+    ) or "unknown"
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    duration_ms: float
+    origin: str
+
+
+@dataclass
+class QueryProfile:
+    """The SQL statements executed while handling one request or job."""
+
+    name: str
+    queries: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(query.duration_ms for query in self.queries)
+
+    def repeated(self, threshold: int) -> Dict[str, List[QueryRecord]]:
+        """Group statements by shape, keeping shapes executed at least ``threshold`` times."""
+        shapes: Dict[str, List[QueryRecord]] = {}
+        for query in self.queries:
+            shapes.setdefault(statement_shape(query.statement), []).append(query)
+        return {shape: queries for shape, queries in shapes.items() if len(queries) >= threshold}
+
+    def slow(self, slow_ms: float) -> List[QueryRecord]:
+        return [query for query in self.queries if query.duration_ms >= slow_ms]
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar('sql_profile', default=None)
+
+
+class SQLProfiler:
+    """
+    Opt-in per-request SQL profiling.
+
+    Records every statement executed while a profile is active, with its
+    duration and the project frames that issued it. When a profile ends, a
+    summary is logged. Each statement shape executed ``repeat_threshold`` or
+    more times is reported as a possible N+1 pattern, and each statement
+    slower than ``slow_ms`` is reported as slow. Requests are profiled
+    automatically; jobs can use ``profile``.
+    """
+
+    def __init__(self, slow_ms: float = 100.0, repeat_threshold: int = 5, stack_depth: int = 3,
+                 header: bool = True):
+        """
+        Args:
+            slow_ms (float): Statements at least this slow are reported.
+            repeat_threshold (int): Executions of one statement shape that count as an N+1 pattern.
+            stack_depth (int): Number of project frames recorded per statement.
+            header (bool): Add an X-SQL-Profile summary header to responses.
+        """
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self.stack_depth = stack_depth
+        self.header = header
+
+    def init_app(self, app) -> None:
+        """Profile every request. Registers request hooks on the app."""
+
+        @app.before_request
+        def _start_profile():
+            g._sql_profile_token = _current_profile.set(QueryProfile(f"{request.method} {request.path}"))
+
+        @app.after_request
+        def _finish_profile(response):
+            profile = _current_profile.get()
+            token = g.pop('_sql_profile_token', None)
+            if profile is None or token is None:
+                return response
+            _current_profile.reset(token)
+            summary = self.report(profile)
+            if self.header:
+                response.headers['X-SQL-Profile'] = summary
+            return response
+
+    def instrument_engine(self, engine) -> None:
+        """Record statements executed on an engine while a profile is active."""
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _before_execute(conn, cursor, statement, parameters, context, executemany):
+            if _current_profile.get() is not None:
+                conn.info.setdefault('_profile_started', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _after_execute(conn, cursor, statement, parameters, context, executemany):
+            profile = _current_profile.get()
+            started = conn.info.get('_profile_started')
+            if profile is None or not started:
+                return
+            duration_ms = (time.perf_counter() - started.pop()) * 1000
+            profile.queries.append(QueryRecord(statement, duration_ms, _origin(self.stack_depth)))
+
+        @event.listens_for(engine, 'handle_error')
+        def _on_error(exception_context):
+            connection = exception_context.connection
+            if connection is not None and connection.info.get('_profile_started'):
+                connection.info['_profile_started'].pop()
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[QueryProfile]:
+        """Profile the statements executed in a block, e.g. a CLI command or background job."""
+        token = _current_profile.set(QueryProfile(name))
+        try:
+            yield _current_profile.get()
+        finally:
+            profile = _current_profile.get()
+            _current_profile.reset(token)
+            self.report(profile)
+
+    def report(self, profile: QueryProfile) -> str:
+        """
+        Log a profile's summary, N+1 candidates and slow statements.
+
+        Returns:
+            str: A one-line summary, as used for the X-SQL-Profile header.
+        """
+        repeated = profile.repeated(self.repeat_threshold)
+        slow = profile.slow(self.slow_ms)
+        summary = (f"queries={len(profile.queries)}; time_ms={profile.total_ms:.1f}; "
+                   f"repeated={len(repeated)}; slow={len(slow)}")
+        logger.info("SQL profile for %s: %s", profile.name, summary)
+        for shape, queries in repeated.items():
+            logger.warning("Possible N+1 in %s: %d executions of %s (from %s)",
+                           profile.name, len(queries), shape, queries[0].origin)
+        for query in slow:
+            logger.warning("Slow query in %s (%.1f ms): %s (from %s)",
+                           profile.name, query.duration_ms, statement_shape(query.statement), query.origin)
+        return summary
+
+
+def get_sql_profiler() -> Optional[SQLProfiler]:
+    """Return the current application's SQL profiler, if profiling is enabled."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('sql_profiler')
+
+
+@contextmanager
+def profile_sql(name: str) -> Iterator[Optional[QueryProfile]]:
+    """Profile a block with the current application's profiler; does nothing when profiling is off."""
+    profiler = get_sql_profiler()
+    if profiler is None:
+        yield None
+        return
+    with profiler.profile(name) as profile:
+        yield profile
@@ -2,8 +2,12 @@ from contextlib import contextmanager
 import logging
 import os
 import sqlite3
+import threading
+import time
+import weakref
+from typing import Dict, Iterator, List
 
-from logger import configure_logger
+from crypto_project.utils.logger import configure_logger
 
 
 logger = logging.getLogger(__name__)
@@ -13,14 +17,110 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/meal_max.db")
 
+# Applied once when a connection is opened
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_STATEMENT_CACHE = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))
+# Idle connections are checked with SELECT 1 before reuse after this many seconds
+HEALTH_CHECK_INTERVAL = float(os.getenv("SQLITE_HEALTH_CHECK_INTERVAL", "30"))
+
+
+class _PooledConnection:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.pid = os.getpid()
+        self.last_used = time.monotonic()
+        self.suspect = False
+
+
+# One connection per (thread, database path), reused across calls. The
+# registry is weak so a finished thread's connection is closed with it.
+_local = threading.local()
+_registry: "weakref.WeakSet[_PooledConnection]" = weakref.WeakSet()
+_registry_lock = threading.Lock()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """Open a connection and apply the performance pragmas."""
+    conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, cached_statements=SQLITE_STATEMENT_CACHE)
+    if path != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE};")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB};")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS};")
+    return conn
+
+
+def _is_healthy(pooled: _PooledConnection) -> bool:
+    try:
+        pooled.conn.execute("SELECT 1;").fetchone()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def _acquire(path: str) -> _PooledConnection:
+    """Return this thread's connection to ``path``, opening or replacing it when needed."""
+    connections: Dict[str, _PooledConnection] = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    pooled = connections.get(path)
+    if pooled is not None:
+        if pooled.pid != os.getpid():
+            # Inherited across fork: never use the parent's connection
+            pooled = None
+        elif (pooled.suspect or time.monotonic() - pooled.last_used > HEALTH_CHECK_INTERVAL) \
+                and not _is_healthy(pooled):
+            logger.warning("Replacing unhealthy database connection to %s", path)
+            _discard(pooled)
+            pooled = None
+        else:
+            pooled.suspect = False
+    if pooled is None:
+        pooled = connections[path] = _PooledConnection(_connect(path))
+        with _registry_lock:
+            _registry.add(pooled)
+    return pooled
+
+
+def _discard(pooled: _PooledConnection) -> None:
+    with _registry_lock:
+        _registry.discard(pooled)
+    try:
+        pooled.conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def close_all_connections() -> int:
+    """
+    Close every pooled connection opened by this process.
+
+    Connections belonging to other threads are closed too, so only call this
+    at shutdown or in tests.
+
+    Returns:
+        int: The number of connections closed.
+    """
+    with _registry_lock:
+        pooled_connections: List[_PooledConnection] = [p for p in _registry if p.pid == os.getpid()]
+        _registry.clear()
+    for pooled in pooled_connections:
+        try:
+            pooled.conn.close()
+        except sqlite3.Error:
+            pass
+    _local.connections = {}
+    return len(pooled_connections)
+
 
 def check_database_connection():
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        # This ensures the connection is actually active
-        cursor.execute("SELECT 1;")
-        conn.close()
+        with get_db_connection() as conn:
+            # This ensures the connection is actually active
+            conn.execute("SELECT 1;")
     except sqlite3.Error as e:
         error_message = f"Database connection error: {e}"
         logger.error(error_message)
@@ -28,10 +128,8 @@ def check_database_connection():
 
 def check_table_exists(tablename: str):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT 1 FROM {tablename} LIMIT 1;")
-        conn.close()
+        with get_db_connection() as conn:
+            conn.execute(f"SELECT 1 FROM {tablename} LIMIT 1;")
     except sqlite3.Error as e:
         error_message = f"Table check error: {e}"
         logger.error(error_message)
@@ -44,15 +142,27 @@ def check_table_exists(tablename: str):
 #
 ###################################################
 @contextmanager
-def get_db_connection():
-    conn = None
+def get_db_connection() -> Iterator[sqlite3.Connection]:
+    """
+    Yield this thread's pooled connection to DB_PATH.
+
+    The connection stays open after the block. Changes that were not
+    committed are rolled back on exit, which is what closing a fresh
+    connection used to do. Statements are prepared once per connection and
+    cached by the sqlite3 module. A connection that raised an error, or sat
+    idle longer than HEALTH_CHECK_INTERVAL, is checked before it is reused.
+    """
+    pooled = _acquire(DB_PATH)
     try:
-        conn = sqlite3.connect(DB_PATH)
-        yield conn
+        yield pooled.conn
     except sqlite3.Error as e:
         logger.error("Database connection error: %s", str(e))
+        pooled.suspect = True
         raise e
     finally:
-        if conn:
-            conn.close()
-            logger.info("Database connection closed.")
\ No newline at end of file
+        try:
+            if pooled.conn.in_transaction:
+                pooled.conn.rollback()
+        except sqlite3.Error:
+            pooled.suspect = True
+        pooled.last_used = time.monotonic()
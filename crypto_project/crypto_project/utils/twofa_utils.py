@@ -1,22 +1,14 @@
-import logging
+import io
 import pyotp
-import qrcode
+from typing import TYPE_CHECKING
 
-from PIL import Image
+from crypto_project.utils.lazy_import import lazy_import
 
-def configure_logger(logger: logging.Logger, log_level=logging.INFO) -> None:
-    """
-    Configures the logger with the specified log level.
+# QR rendering (qrcode and PIL) is only needed by the 2FA setup routes
+qrcode = lazy_import("qrcode")
 
-    Args:
-        logger (logging.Logger): The logger to configure.
-        log_level (int): The log level (default is logging.INFO).
-    """
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-    logger.setLevel(log_level)
+if TYPE_CHECKING:
+    from PIL import Image
 
 # 2FA Utilities
 
@@ -29,7 +21,7 @@ def generate_totp_secret() -> str:
     """
     return pyotp.random_base32()
 
-def generate_qr_code(username: str, totp_secret: str, issuer_name: str = "CryptoApp") -> Image.Image:
+def generate_qr_code(username: str, totp_secret: str, issuer_name: str = "CryptoApp") -> "Image.Image":
     """
     Generate a QR code for the TOTP secret.
 
@@ -46,6 +38,22 @@ def generate_qr_code(username: str, totp_secret: str, issuer_name: str = "Crypto
     qr = qrcode.make(provisioning_uri)
     return qr
 
+def generate_qr_code_png(username: str, totp_secret: str, issuer_name: str = "CryptoApp") -> bytes:
+    """
+    Generate a QR code for the TOTP secret, encoded as PNG bytes.
+
+    Args:
+        username (str): The username for the TOTP setup.
+        totp_secret (str): The TOTP secret key.
+        issuer_name (str): The name of the application or issuer (default is "CryptoApp").
+
+    Returns:
+        bytes: The PNG-encoded QR code.
+    """
+    buffer = io.BytesIO()
+    generate_qr_code(username, totp_secret, issuer_name).save(buffer, format="PNG")
+    return buffer.getvalue()
+
 def verify_totp_token(totp_secret: str, token: str) -> bool:
     """
     Verify a TOTP token using the user's secret.
@@ -61,7 +69,7 @@ def verify_totp_token(totp_secret: str, token: str) -> bool:
     return totp.verify(token)
 
 # Save QR code 
-def save_qr_code_image(qr_image: Image.Image, file_path: str) -> None:
+def save_qr_code_image(qr_image: "Image.Image", file_path: str) -> None:
     """
     Save a QR code image to a file.
 
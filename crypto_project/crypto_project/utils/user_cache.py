@@ -0,0 +1,170 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from flask import current_app, has_app_context
+
+from crypto_project.utils.logger import configure_logger
+from crypto_project.utils.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# Redis value marking a recently invalidated user
+_TOMBSTONE = b"-"
+
+
+class UserCache:
+    """
+    Bounded username -> user record cache with an optional shared Redis tier.
+
+    A record is a dict with the user's ``id``, ``salt``, ``password`` hash and
+    ``totp_secret``. Lookups check the in-process LRU first, then Redis (if
+    configured), and callers fall back to the database on a miss. Writers are
+    expected to call ``set``/``invalidate`` after committing, so both tiers
+    stay in step with the ``users`` table.
+
+    Read-through fills race with those writes: a reader may load a row just
+    before it is deleted and store it just after the invalidation. Readers
+    therefore take a ``generation`` token before querying the database and
+    store the record with ``fill``, which drops it if the username was
+    written or invalidated since. In Redis, invalidation leaves a short-lived
+    tombstone that fills (``SET NX``) cannot overwrite.
+
+    When Redis is shared by several processes, give the local tier a short
+    ``local_ttl`` so an invalidation from another process is seen quickly.
+    """
+
+    def __init__(self, max_size: int = 10000, local_ttl: Optional[float] = None,
+                 redis_client=None, redis_ttl: int = 3600, key_prefix: str = "user:", tombstone_ttl: int = 60):
+        """
+        Args:
+            max_size (int): Maximum number of records kept in process.
+            local_ttl (float, optional): Seconds a local record stays valid (None means until evicted).
+            redis_client (redis.Redis, optional): Client for the shared tier.
+            redis_ttl (int): Expiry of records in Redis, in seconds.
+            key_prefix (str): Prefix of the Redis keys.
+            tombstone_ttl (int): Seconds an invalidated Redis key refuses read-through fills.
+        """
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis = redis_client
+        self.redis_ttl = redis_ttl
+        self.key_prefix = key_prefix
+        self.tombstone_ttl = tombstone_ttl
+        self._local = LRUCache(max_size, ttl=local_ttl)  # Username -> record
+        # Generation of the latest write or invalidation per username, bounded like the local tier;
+        # fills taken before _changed_floor are refused once older entries have been dropped
+        self._generation = 0
+        self._changed: "OrderedDict[str, int]" = OrderedDict()
+        self._changed_floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[Dict]:
+        """
+        Look up a user record.
+
+        Args:
+            username (str): The username.
+
+        Returns:
+            dict: The cached record, or None on a miss.
+        """
+        record = self._local.get(username)
+        if record is not None:
+            return record
+
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(self.key_prefix + username)
+        except Exception as e:
+            logger.warning("Redis user cache lookup failed: %s", str(e))
+            return None
+        if raw is None or raw == _TOMBSTONE:
+            return None
+        record = json.loads(raw)
+        self._local.set(username, record)
+        return record
+
+    def generation(self) -> int:
+        """Return the token to pass to ``fill``; take it before reading the record from the database."""
+        with self._lock:
+            return self._generation
+
+    def fill(self, username: str, record: Dict, generation: int) -> bool:
+        """
+        Store a record read from the database, unless the user changed since ``generation``.
+
+        Args:
+            username (str): The username.
+            record (dict): The user's id, salt, password hash and TOTP secret.
+            generation (int): The token returned by ``generation`` before the read.
+
+        Returns:
+            bool: True if the record was cached.
+        """
+        with self._lock:
+            if generation < self._changed_floor or self._changed.get(username, 0) > generation:
+                return False
+            self._local.set(username, record)
+        if self.redis is not None:
+            try:
+                self.redis.set(self.key_prefix + username, json.dumps(record), ex=self.redis_ttl, nx=True)
+            except Exception as e:
+                logger.warning("Redis user cache write failed: %s", str(e))
+        return True
+
+    def set(self, username: str, record: Dict) -> None:
+        """
+        Store a user record in every tier.
+
+        Args:
+            username (str): The username.
+            record (dict): The user's id, salt, password hash and TOTP secret.
+        """
+        with self._lock:
+            self._mark_changed(username)
+            self._local.set(username, record)
+        if self.redis is not None:
+            try:
+                self.redis.set(self.key_prefix + username, json.dumps(record), ex=self.redis_ttl)
+            except Exception as e:
+                logger.warning("Redis user cache write failed: %s", str(e))
+
+    def invalidate(self, username: str) -> None:
+        """
+        Drop a user record from every tier.
+
+        Args:
+            username (str): The username.
+        """
+        with self._lock:
+            self._mark_changed(username)
+            self._local.pop(username, None)
+        if self.redis is not None:
+            try:
+                self.redis.set(self.key_prefix + username, _TOMBSTONE, ex=self.tombstone_ttl)
+            except Exception as e:
+                logger.warning("Redis user cache invalidation failed: %s", str(e))
+
+    def clear(self) -> None:
+        """Drop every record from the local tier."""
+        self._local.clear()
+
+    def _mark_changed(self, username: str) -> None:
+        self._generation += 1
+        self._changed[username] = self._generation
+        self._changed.move_to_end(username)
+        while len(self._changed) > self.max_size:
+            _, dropped = self._changed.popitem(last=False)
+            self._changed_floor = dropped
+
+
+def get_user_cache() -> Optional[UserCache]:
+    """Return the current application's user cache, if one is configured."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('user_cache')
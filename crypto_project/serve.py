@@ -0,0 +1,142 @@
+"""
+Production serving mode: N worker processes behind one port.
+
+The parent process creates the listening socket and a shared-memory price
+snapshot, forks the workers (each runs its own Flask app on the inherited
+socket) and then acts as the single price ingester: it polls CoinGecko for
+PRICE_SNAPSHOT_IDS every PRICE_SNAPSHOT_INTERVAL seconds and writes the
+results into the snapshot, which every worker reads without locks.
+
+Usage:
+    python serve.py --workers 4 --port 5000
+"""
+import argparse
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from typing import List
+
+from werkzeug.serving import make_server
+
+from app import create_app, create_schema
+from config import ProductionConfig
+from crypto_project.models.cryptodata_model import CryptoDataModel
+from crypto_project.utils.logger import configure_logger
+from crypto_project.utils.shared_prices import SharedPriceSnapshot
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+def run_worker(fd: int, host: str, port: int, config_class) -> None:
+    """Serve the app on an inherited listening socket."""
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    app = create_app(config_class)
+    server = make_server(host, port, app, threaded=True, fd=fd)
+    logger.info("Worker %d serving on %s:%d", os.getpid(), host, port)
+    server.serve_forever()
+
+
+def shared_state_problems(config_class, workers: int) -> List[str]:
+    """
+    Check that per-process auth and alert state converges across workers.
+
+    Each worker keeps its own user cache, revoked-token set and alert index.
+    With more than one worker, those must either be shared (Redis for the
+    user cache) or refreshed from the database often enough.
+
+    Returns:
+        List[str]: One message per setting that would leave workers diverging.
+    """
+    if workers <= 1:
+        return []
+    problems = []
+    local_ttl = getattr(config_class, 'USER_CACHE_LOCAL_TTL', None)
+    if not getattr(config_class, 'USER_CACHE_REDIS_URL', None) and (local_ttl is None or not math.isfinite(local_ttl)):
+        problems.append("set USER_CACHE_REDIS_URL or a finite USER_CACHE_LOCAL_TTL")
+    if not getattr(config_class, 'PRICE_ALERT_SYNC_INTERVAL', None):
+        problems.append("set a positive PRICE_ALERT_SYNC_INTERVAL")
+    sync_interval = getattr(config_class, 'SESSION_REVOCATION_SYNC_INTERVAL', None)
+    if sync_interval is None or not math.isfinite(sync_interval):
+        problems.append("set a finite SESSION_REVOCATION_SYNC_INTERVAL")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+    problems = shared_state_problems(ProductionConfig, args.workers)
+    if problems:
+        parser.error(f"refusing to start {args.workers} workers: " + "; ".join(problems))
+
+    snapshot = SharedPriceSnapshot.create(capacity=ProductionConfig.PRICE_SNAPSHOT_CAPACITY)
+
+    class ServeConfig(ProductionConfig):
+        PRICE_SNAPSHOT_NAME = snapshot.name
+        CREATE_DB = False
+
+    # Create the schema once, before the workers race to do it; the full app is only built in the workers
+    create_schema(ProductionConfig)
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((args.host, args.port))
+    listener.listen(socket.SOMAXCONN)
+    listener.set_inheritable(True)
+
+    context = multiprocessing.get_context('fork')
+
+    def spawn():
+        process = context.Process(target=run_worker, args=(listener.fileno(), args.host, args.port, ServeConfig),
+                                  daemon=True)
+        process.start()
+        return process
+
+    workers = [spawn() for _ in range(args.workers)]
+    logger.info("Started %d workers on %s:%d", len(workers), args.host, args.port)
+
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    crypto_model = CryptoDataModel()
+    crypto_ids = [crypto_id for crypto_id in ProductionConfig.PRICE_SNAPSHOT_IDS.split(',') if crypto_id]
+    next_poll = 0.0
+    try:
+        while not stopping:
+            now = time.monotonic()
+            if now >= next_poll:
+                prices = crypto_model.get_crypto_prices(crypto_ids)
+                if prices:
+                    snapshot.update(prices)
+                next_poll = now + ProductionConfig.PRICE_SNAPSHOT_INTERVAL
+            for i, process in enumerate(workers):
+                if not process.is_alive():
+                    logger.error("Worker %d exited with %s; restarting", process.pid, process.exitcode)
+                    workers[i] = spawn()
+            time.sleep(0.5)
+    finally:
+        for process in workers:
+            process.terminate()
+        for process in workers:
+            process.join(timeout=5)
+        listener.close()
+        snapshot.close()
+        logger.info("Stopped all workers")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ import pytest
 from app import create_app
 from config import TestConfig
 from crypto_project.db import db
+from crypto_project.models.user_model import Users
 
 @pytest.fixture
 def app():
@@ -20,4 +21,12 @@ def client(app):
 @pytest.fixture
 def session(app):
     with app.app_context():
-        yield db.session
\ No newline at end of file
+        yield db.session
+
+
+@pytest.fixture
+def auth_headers(client, session):
+    """Authorization header of a session for user 1 (the first user created)."""
+    Users.create_user("testuser", "securepassword123")
+    token = client.post("/api/login", json={"username": "testuser", "password": "securepassword123"}).get_json()["token"]
+    return {"Authorization": f"Bearer {token}"}
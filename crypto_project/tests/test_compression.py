@@ -0,0 +1,82 @@
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, Response, jsonify
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from crypto_project.utils.compression import Compressor, negotiate
+from crypto_project.utils.http_cache import ResponseCache
+
+ROWS = [{"id": i, "name": f"coin-{i}", "price": i * 1.5} for i in range(200)]
+
+
+@pytest.fixture
+def compressed_app():
+    """A bare app with compression and a versioned, cached view."""
+    app = Flask(__name__)
+    compressor = Compressor(min_size=256)
+    compressor.init_app(app)
+    cache = ResponseCache()
+
+    @app.route("/large")
+    @cache.cached(version=lambda: 1)
+    def large():
+        return jsonify(ROWS)
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/stream")
+    def stream():
+        return Response((json.dumps(row) + "\n" for row in ROWS[:5]), mimetype="application/x-ndjson")
+
+    return app, compressor
+
+
+def test_negotiate_prefers_accepted_codings():
+    assert negotiate(parse_accept_header("gzip, deflate", Accept)) == "gzip"
+    assert negotiate(parse_accept_header("identity", Accept)) is None
+    assert negotiate(parse_accept_header("gzip;q=0", Accept)) is None
+
+
+def test_large_json_is_gzipped_with_weak_etag(compressed_app):
+    app, _ = compressed_app
+    response = app.test_client().get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"].startswith('W/"')
+    assert json.loads(gzip.decompress(response.data)) == ROWS
+
+    revalidated = app.test_client().get("/large", headers={"Accept-Encoding": "gzip",
+                                                           "If-None-Match": response.headers["ETag"]})
+    assert revalidated.status_code == 304
+
+
+def test_small_and_unaccepted_responses_are_not_compressed(compressed_app):
+    app, _ = compressed_app
+    client = app.test_client()
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/large").headers
+
+
+def test_compressed_bodies_are_reused_per_etag(compressed_app):
+    app, compressor = compressed_app
+    client = app.test_client()
+    with patch.object(compressor, "compress", wraps=compressor.compress) as compress:
+        first = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        second = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert first.data == second.data
+    compress.assert_called_once()
+
+
+def test_ndjson_stream_is_compressed_incrementally(compressed_app):
+    app, _ = compressed_app
+    response = app.test_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert [json.loads(line) for line in lines] == ROWS[:5]
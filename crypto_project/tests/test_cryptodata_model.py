@@ -56,3 +56,12 @@ def test_get_crypto_price_error_handling():
         mock_get.return_value.status_code = 404
         price = model.get_crypto_price("invalid-crypto")
         assert price is None
+
+def test_get_crypto_prices():
+    model = CryptoDataModel()
+    with patch("requests.get") as mock_get:
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {"bitcoin": {"usd": 29000.0}, "ethereum": {"usd": 1800.0}}
+        prices = model.get_crypto_prices(["bitcoin", "ethereum", "unknown"])
+        assert prices == {"bitcoin": 29000.0, "ethereum": 1800.0}
+        assert mock_get.call_count == 1
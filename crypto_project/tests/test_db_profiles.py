@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import create_app
+from config import ProductionConfig
+from crypto_project.db import db, get_read_engine
+from crypto_project.utils.db_profiles import PROFILES, describe_engine, get_profile
+
+
+def test_get_profile_rejects_unknown_names():
+    assert get_profile("THROUGHPUT") is PROFILES["throughput"]
+    with pytest.raises(ValueError, match="Unknown DB_PROFILE"):
+        get_profile("turbo")
+
+
+def test_engine_options_skip_pool_sizing_for_memory_databases():
+    profile = PROFILES["throughput"]
+    assert profile.engine_options("sqlite:///:memory:") == {}
+    assert profile.engine_options("sqlite:////tmp/app.db", pool_size=3) == {
+        "pool_size": 3, "max_overflow": 20, "pool_timeout": 30}
+
+
+def test_install_applies_pragmas_to_new_connections(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/profile.db", **PROFILES["throughput"].engine_options(
+        f"sqlite:///{tmp_path}/profile.db"))
+    PROFILES["throughput"].install(engine)
+
+    details = describe_engine(engine, PROFILES["throughput"])
+    assert details["pragmas"]["journal_mode"] == "wal"
+    assert details["pragmas"]["synchronous"] == 1  # NORMAL
+    assert details["pragmas"]["temp_store"] == 2  # MEMORY
+    assert details["pragmas"]["cache_size"] == -64 * 1024
+    assert details["pool"]["size"] == 10
+    assert details["pool"]["max_overflow"] == 20
+    engine.dispose()
+
+
+def test_diagnostics_endpoint_reports_active_profile(client):
+    response = client.get("/api/diagnostics/db")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["profile"] == "default"
+    assert data["dialect"] == "sqlite"
+    assert data["track_modifications"] is False
+    assert set(data["pragmas"]) >= {"journal_mode", "synchronous", "cache_size"}
+
+
+def test_production_config_is_not_overridden_by_test_config():
+    """Importing the app (and with it TestConfig) must not point production at an in-memory database."""
+    env = {key: value for key, value in os.environ.items() if key != "DATABASE_URL"}
+    script = ("import os, app, config; from crypto_project.utils.db_profiles import is_memory_database; "
+              "print(is_memory_database(config.ProductionConfig.SQLALCHEMY_DATABASE_URI), "
+              "is_memory_database(os.getenv('DATABASE_URL') or 'unset'))")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.split()[-2:] == ["False", "False"]
+
+
+def test_production_profile_applies_to_file_database(tmp_path, monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+
+    class FileConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path}/app.db"
+        METRICS_ENABLED = False
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        assert app.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_size"] == 10
+        assert app.test_client().get("/api/diagnostics/db").get_json()["pragmas"]["journal_mode"] == "wal"
+        assert get_read_engine() is not None
+        db.session.remove()
+        get_read_engine().dispose()
+        db.engine.dispose()
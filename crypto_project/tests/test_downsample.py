@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+import pytest
+
+from crypto_project.models.cryptodata_model import CryptoDataModel
+from crypto_project.utils.downsample import ChartCache, downsample_chart, lttb, min_max_envelope
+
+
+def make_series(count, spike_at=None):
+    return [[i * 1000, 1000.0 if i == spike_at else float(i % 7)] for i in range(count)]
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    series = make_series(1000, spike_at=421)
+    sampled = lttb(series, 50)
+    assert len(sampled) == 50
+    assert sampled[0] == series[0] and sampled[-1] == series[-1]
+    assert [421000, 1000.0] in sampled
+    assert [point[0] for point in sampled] == sorted(point[0] for point in sampled)
+
+
+def test_lttb_returns_short_series_unchanged():
+    series = make_series(10)
+    assert lttb(series, 50) == series
+
+
+def test_min_max_envelope_keeps_extremes_in_order():
+    series = make_series(1000, spike_at=10)
+    sampled = min_max_envelope(series, 100)
+    assert len(sampled) <= 100
+    assert [10000, 1000.0] in sampled
+    assert min(point[1] for point in sampled) == 0.0
+    assert [point[0] for point in sampled] == sorted(point[0] for point in sampled)
+
+
+def test_downsample_chart_rejects_unknown_mode():
+    with pytest.raises(ValueError, match="Unknown downsampling mode"):
+        downsample_chart({"prices": make_series(10)}, 5, mode="average")
+
+
+def test_chart_cache_expires_entries():
+    cache = ChartCache(max_size=1, ttl=0)
+    cache.set("key", {"prices": []})
+    assert cache.get("key") is None
+
+
+def test_historical_data_points_are_downsampled_and_cached(client):
+    chart = {key: make_series(2000) for key in ("prices", "market_caps", "total_volumes")}
+    with patch.object(CryptoDataModel, "get_price_trends", return_value=chart) as get_trends:
+        first = client.get("/api/historical-data/bitcoin/1825?points=100")
+        second = client.get("/api/historical-data/bitcoin/1825?points=100")
+
+    assert first.status_code == 200
+    assert first.get_json() == second.get_json()
+    data = first.get_json()["historical_data"]
+    assert all(len(data[key]) == 100 for key in chart)
+    get_trends.assert_called_once()
+
+
+def test_historical_data_rejects_bad_points(client):
+    assert client.get("/api/historical-data/bitcoin/30?points=2").status_code == 400
+    assert client.get("/api/historical-data/bitcoin/30?points=100&mode=average").status_code == 400
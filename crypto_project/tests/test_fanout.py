@@ -0,0 +1,110 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+from crypto_project.models.cryptodata_model import CryptoDataModel
+from crypto_project.models.transaction_model import TransactionModel
+from crypto_project.utils import fanout
+from crypto_project.utils.fanout import call_timeout, fan_out
+
+TRENDS = {"prices": [[0, 1.0], [1000, 2.0]]}
+
+
+def _sleep_then(value, seconds=0.2):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+
+def test_fan_out_runs_calls_concurrently():
+    calls = {f"call-{i}": _sleep_then(i + 1) for i in range(5)}
+    started = time.perf_counter()
+    results, errors = asyncio.run(fan_out(calls, timeout=2))
+    assert time.perf_counter() - started < 0.6
+    assert results == {f"call-{i}": i + 1 for i in range(5)} and errors == {}
+
+
+def test_fan_out_reports_failures_without_failing_others():
+    def boom():
+        raise RuntimeError("upstream down")
+
+    calls = {"ok": lambda: {"price": 1.0}, "slow": _sleep_then(1, seconds=1), "boom": boom, "empty": lambda: []}
+    results, errors = asyncio.run(fan_out(calls, timeout=0.2))
+    assert results == {"ok": {"price": 1.0}}
+    assert errors == {"slow": "Timed out after 0.2 seconds", "boom": "upstream down", "empty": "No data returned"}
+
+
+def test_fan_out_passes_its_deadline_to_calls():
+    """Test that blocking calls see the fan-out timeout, so abandoned calls end with it."""
+    assert call_timeout(10.0) == 10.0  # Outside a fan-out
+    results, errors = asyncio.run(fan_out({"call": lambda: call_timeout(10.0)}, timeout=0.5))
+    assert errors == {} and 0 < results["call"] <= 0.5
+
+
+def test_fan_out_rejects_calls_when_pool_is_busy():
+    """Test that calls fail at once instead of timing out in the pool queue."""
+    with patch.object(fanout, "FANOUT_WORKERS", 2), patch.object(fanout, "_executor", None), \
+            patch.object(fanout, "_executor_slots", None):
+        calls = {f"call-{i}": _sleep_then(i + 1) for i in range(3)}
+        started = time.perf_counter()
+        results, errors = asyncio.run(fan_out(calls, timeout=2))
+        assert time.perf_counter() - started < 1
+        assert results == {"call-0": 1, "call-1": 2}
+        assert errors == {"call-2": "Upstream pool is busy"}
+        # Threads are handed back once the calls finish
+        results, errors = asyncio.run(fan_out(calls, timeout=2))
+        assert results == {"call-0": 1, "call-1": 2}
+
+
+def test_compare_with_trends_returns_partial_results(client):
+    comparison = {"bitcoin": {"current_price": 1.0}, "ethereum": {"current_price": 2.0}}
+
+    def trends(crypto_id, days="7"):
+        return TRENDS if crypto_id == "bitcoin" else None
+
+    with patch.object(CryptoDataModel, "compare_cryptos", return_value=comparison), \
+            patch.object(CryptoDataModel, "get_price_trends", side_effect=trends):
+        response = client.get("/api/compare-cryptos/bitcoin/ethereum?trends=30")
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["comparison"] == comparison
+    assert body["trends"] == {"bitcoin": TRENDS}
+    assert body["errors"] == {"ethereum": "No data returned"}
+    assert response.headers["Cache-Control"] == "no-store"
+    assert client.get("/api/compare-cryptos/bitcoin/ethereum?trends=month").status_code == 400
+
+
+def test_dashboard_combines_calls_and_validates_ids(client):
+    with patch.object(CryptoDataModel, "get_crypto_prices", return_value={"bitcoin": 1.0}), \
+            patch.object(CryptoDataModel, "get_price_trends", return_value=TRENDS), \
+            patch.object(CryptoDataModel, "get_top_performing_cryptos", return_value=[]):
+        response = client.get("/api/dashboard?ids=bitcoin&days=7")
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["prices"] == {"bitcoin": 1.0}
+    assert body["trends"] == {"bitcoin": TRENDS}
+    assert body["top_cryptos"] is None and body["errors"] == {"top_cryptos": "No data returned"}
+    assert response.headers["Cache-Control"] == "no-store" and "ETag" not in response.headers
+    assert client.get("/api/dashboard").status_code == 400
+    assert client.get("/api/dashboard?ids=" + ",".join(f"coin-{i}" for i in range(11))).status_code == 400
+
+
+def test_portfolio_valuation_prices_holdings_concurrently(client, session, auth_headers):
+    session.add_all([
+        TransactionModel(user_id=1, crypto_id="bitcoin", transaction_type="buy", quantity=2.0, price=10.0),
+        TransactionModel(user_id=1, crypto_id="ethereum", transaction_type="buy", quantity=1.0, price=5.0),
+    ])
+    session.commit()
+
+    prices = {"bitcoin": 30.0}
+    with patch.object(CryptoDataModel, "get_crypto_price", side_effect=prices.get):
+        response = client.get("/api/portfolio/1?valuation=true", headers=auth_headers)
+
+    valuation = response.get_json()["valuation"]
+    assert response.status_code == 200
+    assert valuation["values"] == {"bitcoin": 60.0}
+    assert valuation["total_value"] == 60.0
+    assert valuation["errors"] == {"ethereum": "No data returned"}
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from crypto_project.db import db
+from crypto_project.models.portfolio_model import Portfolio
+from crypto_project.models.transaction_model import TransactionModel
+from crypto_project.utils.group_commit import GroupCommitWriter
+
+
+@pytest.fixture
+def writer(app):
+    """Fixture to provide a group-commit writer bound to the test app."""
+    writer = GroupCommitWriter(app, max_batch_rows=10, max_wait_ms=20)
+    app.extensions['group_commit'] = writer
+    yield writer
+    writer.close()
+    app.extensions.pop('group_commit', None)
+
+
+def make_transaction(crypto_id="bitcoin"):
+    return TransactionModel(user_id=1, crypto_id=crypto_id, transaction_type="buy", quantity=1.0, price=100.0)
+
+
+##########################################################
+# Group commit
+##########################################################
+
+def test_concurrent_submits_are_committed(session, writer):
+    """Test that rows submitted from many threads are all committed."""
+    results = []
+
+    def worker():
+        results.append(writer.submit(make_transaction(), timeout=5))
+
+    threads = [threading.Thread(target=worker) for _ in range(25)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 25
+    assert len({transaction.id for transaction in results}) == 25, "Every row should get its own primary key."
+    assert session.query(TransactionModel).count() == 25
+
+
+def test_failed_row_does_not_fail_its_group(session, writer):
+    """Test that a bad row raises for its caller while the rest of the group commits."""
+    errors = []
+    good = []
+
+    def submit(transaction, sink):
+        try:
+            sink.append(writer.submit(transaction, timeout=5))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=submit, args=(make_transaction(), good)) for _ in range(3)]
+    threads.append(threading.Thread(target=submit, args=(make_transaction(crypto_id=None), good)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 1
+    assert len(good) == 3
+    assert session.query(TransactionModel).count() == 3
+
+
+def test_submit_after_close(app):
+    """Test that a closed writer rejects new rows."""
+    writer = GroupCommitWriter(app)
+    writer.close()
+    with pytest.raises(RuntimeError, match="Group-commit writer is closed"):
+        writer.submit(make_transaction())
+
+
+def test_create_transaction_uses_group_commit(session, writer):
+    """Test that create_transaction routes its insert through the writer."""
+    mock_portfolio = MagicMock(spec=Portfolio)
+    mock_portfolio.validate_cash_for_purchase.return_value = True
+    mock_portfolio.holdings = {}
+
+    with patch("crypto_project.models.portfolio_model.Portfolio.get_user_portfolio", return_value=mock_portfolio), \
+         patch.object(writer, "submit", wraps=writer.submit) as mock_submit:
+        transaction = TransactionModel.create_transaction(
+            user_id=1, crypto_id="bitcoin", transaction_type="buy", quantity=2.0, price=50.0
+        )
+
+    mock_submit.assert_called_once()
+    assert transaction.id is not None
+    assert db.session.get(TransactionModel, transaction.id).total_value == 100.0
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, jsonify
+
+from crypto_project.models.cryptodata_model import CryptoDataModel
+from crypto_project.models.transaction_archive_model import TransactionArchive
+from crypto_project.models.transaction_model import TransactionModel
+from crypto_project.utils.http_cache import ResponseCache
+
+
+@pytest.fixture
+def versioned_app():
+    """A bare app with one versioned view that counts its calls."""
+    app = Flask(__name__)
+    cache = ResponseCache(max_entries=8)
+    state = {"version": 1, "calls": 0}
+
+    @app.route("/item/<int:item_id>")
+    @cache.cached(version=lambda item_id: state["version"], max_age=15)
+    def item(item_id):
+        state["calls"] += 1
+        return jsonify({"id": item_id, "version": state["version"]})
+
+    @app.route("/unversioned")
+    @cache.cached()
+    def unversioned():
+        state["calls"] += 1
+        return jsonify({"value": 42})
+
+    return app, state
+
+
+def test_matching_etag_gets_304_without_running_view(versioned_app):
+    app, state = versioned_app
+    client = app.test_client()
+    first = client.get("/item/1")
+    assert first.headers["Cache-Control"] == "public, max-age=15"
+
+    revalidated = client.get("/item/1", headers={"If-None-Match": first.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert state["calls"] == 1
+
+
+def test_serialized_body_is_reused_until_version_changes(versioned_app):
+    app, state = versioned_app
+    client = app.test_client()
+    first = client.get("/item/1")
+    second = client.get("/item/1")
+    assert second.data == first.data and state["calls"] == 1
+
+    state["version"] = 2
+    third = client.get("/item/1", headers={"If-None-Match": first.headers["ETag"]})
+    assert third.status_code == 200
+    assert third.headers["ETag"] != first.headers["ETag"]
+    assert third.get_json()["version"] == 2
+
+
+def test_unversioned_views_use_body_hash_etags(versioned_app):
+    app, state = versioned_app
+    client = app.test_client()
+    first = client.get("/unversioned")
+    assert first.headers["Cache-Control"] == "public, no-cache"
+    assert client.get("/unversioned", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    assert state["calls"] == 2
+
+
+def test_portfolio_etag_follows_transaction_version(client, session, auth_headers):
+    first = client.get("/api/portfolio/1", headers=auth_headers)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert client.get("/api/portfolio/1", headers={"If-None-Match": etag, **auth_headers}).status_code == 304
+
+    session.add(TransactionModel(user_id=1, crypto_id="bitcoin", transaction_type="buy", quantity=1.0, price=10.0))
+    session.commit()
+    changed = client.get("/api/portfolio/1", headers={"If-None-Match": etag, **auth_headers})
+    assert changed.status_code == 200
+    assert changed.get_json()["portfolio"]["holdings"] == {"bitcoin": 1.0}
+
+
+def test_stats_etag_changes_with_in_place_edits_and_archiving(client, session, auth_headers):
+    """Test that edits, recurring runs and archiving (which keep IDs and counts) invalidate the ETag."""
+    transaction = TransactionModel(user_id=1, crypto_id="bitcoin", transaction_type="buy", quantity=1.0,
+                                   price=10.0, recurring=True)
+    session.add(transaction)
+    session.commit()
+    etags = [client.get("/api/stats", headers=auth_headers).headers["ETag"]]
+
+    TransactionModel.edit_transaction(transaction.id, quantity=3.0)
+    etags.append(client.get("/api/stats", headers={"If-None-Match": etags[-1], **auth_headers}).headers["ETag"])
+    TransactionModel.execute_recurring_transactions()
+    etags.append(client.get("/api/stats", headers={"If-None-Match": etags[-1], **auth_headers}).headers["ETag"])
+
+    transaction.active = False
+    transaction.timestamp = datetime.utcnow() - timedelta(days=100)
+    session.commit()
+    etags.append(client.get("/api/stats", headers=auth_headers).headers["ETag"])
+    assert TransactionArchive.archive_inactive(older_than_days=90) == 1
+    response = client.get("/api/stats", headers={"If-None-Match": etags[-1], **auth_headers})
+    assert response.status_code == 200
+    assert len(set(etags + [response.headers["ETag"]])) == 5
+    assert TransactionModel.get_version(2) == 0
+
+
+def test_cached_chart_is_revalidated_without_upstream_call(client):
+    chart = {"prices": [[i * 1000, float(i)] for i in range(100)]}
+    with patch.object(CryptoDataModel, "get_price_trends", return_value=chart) as get_trends:
+        client.get("/api/historical-data/bitcoin/30?points=10")
+        cached = client.get("/api/historical-data/bitcoin/30?points=10")
+        not_modified = client.get("/api/historical-data/bitcoin/30?points=10",
+                                  headers={"If-None-Match": cached.headers["ETag"]})
+
+    assert not_modified.status_code == 304
+    assert 0 < int(cached.headers["Cache-Control"].split("max-age=")[1]) <= 60
+    get_trends.assert_called_once()
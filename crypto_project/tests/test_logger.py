@@ -0,0 +1,63 @@
+import io
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from crypto_project.utils import logger as logger_utils
+from crypto_project.utils.logger import RateLimitFilter, configure_logger, rate_limit_logger
+
+
+@pytest.fixture
+def captured():
+    """Fixture to capture what the log listener writes."""
+    stream = io.StringIO()
+    previous = logger_utils._stream_handler.setStream(stream)
+    yield stream
+    logger_utils.stop_log_listener()
+    logger_utils._stream_handler.setStream(previous)
+    logger_utils.start_log_listener()
+
+
+def test_configure_logger_is_idempotent():
+    test_logger = logging.getLogger("tests.idempotent")
+    configure_logger(test_logger)
+    configure_logger(test_logger)
+    assert test_logger.handlers.count(logger_utils._queue_handler) == 1
+    assert test_logger.propagate is False
+
+
+def test_records_are_written_by_the_listener(captured):
+    test_logger = logging.getLogger("tests.queued")
+    configure_logger(test_logger)
+    test_logger.info("Fetched price for %s: %s", "bitcoin", 50000.0)
+    logger_utils.stop_log_listener()  # Flushes the queue
+    assert "tests.queued - INFO - Fetched price for bitcoin: 50000.0" in captured.getvalue()
+
+
+def test_rate_limit_filter_drops_and_reports_suppressed():
+    """Test that a template is limited to its burst and the next record reports the drops."""
+    limiter = RateLimitFilter(rate=1.0, burst=2)
+
+    def record(msg, level=logging.INFO):
+        return logging.LogRecord("tests", level, __file__, 1, msg, ("bitcoin",), None)
+
+    with patch("crypto_project.utils.logger.time.monotonic", return_value=100.0):
+        assert limiter.filter(record("Fetched %s"))
+        assert limiter.filter(record("Fetched %s"))
+        assert not limiter.filter(record("Fetched %s"))
+        assert not limiter.filter(record("Fetched %s"))
+        assert limiter.filter(record("Other %s"))
+        assert limiter.filter(record("Fetched %s", logging.ERROR))
+
+    with patch("crypto_project.utils.logger.time.monotonic", return_value=101.0):
+        allowed = record("Fetched %s")
+        assert limiter.filter(allowed)
+        assert allowed.getMessage() == "Fetched bitcoin (2 similar messages suppressed)"
+
+
+def test_rate_limit_logger_replaces_previous_filter():
+    test_logger = logging.getLogger("tests.limited")
+    rate_limit_logger(test_logger, rate=1.0)
+    limiter = rate_limit_logger(test_logger, rate=2.0)
+    assert [f for f in test_logger.filters if isinstance(f, RateLimitFilter)] == [limiter]
@@ -0,0 +1,36 @@
+from unittest.mock import patch
+
+from crypto_project.utils.lru import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl():
+    cache = LRUCache(max_size=4, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=None)
+    assert 0 < cache.expires_in("a") <= 10
+    with patch("crypto_project.utils.lru.time.monotonic", return_value=10 ** 9):
+        assert cache.get("a") is None
+        assert "a" not in cache
+        assert cache.get("b") == 2
+
+
+def test_pop_and_zero_size():
+    cache = LRUCache(max_size=0)
+    cache.set("a", 1)
+    assert cache.get("a", "missing") == "missing"
+
+    cache = LRUCache(max_size=1)
+    cache.set("a", 1)
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
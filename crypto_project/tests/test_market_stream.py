@@ -0,0 +1,136 @@
+import json
+
+import pytest
+from unittest.mock import patch
+
+from crypto_project.models.price_alert_model import PriceAlert
+from crypto_project.models.user_model import Users
+from crypto_project.utils.market_stream import PubSub
+
+
+@pytest.fixture
+def market_stream(app):
+    return app.extensions["market_stream"]
+
+
+def read_events(response, count):
+    """Read ``count`` non-comment SSE messages from a streaming response."""
+    chunks = iter(response.response)
+    events = []
+    while len(events) < count:
+        chunk = next(chunks)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith("event:"):
+            lines = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+##########################################################
+# Pub/sub and backpressure
+##########################################################
+
+def test_price_topics_drop_to_latest():
+    """Test that a slow consumer only sees the latest price per topic."""
+    pubsub = PubSub()
+    subscription = pubsub.subscribe(["price:bitcoin", "price:ethereum"])
+    for price in (1.0, 2.0, 3.0):
+        pubsub.publish("price:bitcoin", "price", {"price_usd": price})
+    pubsub.publish("price:ethereum", "price", {"price_usd": 10.0})
+
+    messages = subscription.get(timeout=0)
+    assert [data["price_usd"] for _, data in messages] == [3.0, 10.0]
+    assert subscription.dropped == 2
+
+
+def test_alert_topics_are_queued_and_bounded():
+    """Test that alert messages are queued, dropping the oldest past the limit."""
+    pubsub = PubSub(max_queue=2)
+    subscription = pubsub.subscribe(["alerts:1"])
+    for alert_id in (1, 2, 3):
+        pubsub.publish("alerts:1", "alert", {"id": alert_id}, conflate=False)
+    assert [data["id"] for _, data in subscription.get(timeout=0)] == [2, 3]
+    assert subscription.dropped == 1
+
+
+def test_unsubscribe_removes_topics():
+    pubsub = PubSub()
+    subscription = pubsub.subscribe(["price:bitcoin"])
+    pubsub.unsubscribe(subscription)
+    assert pubsub.topics() == []
+    assert pubsub.publish("price:bitcoin", "price", {}) == 0
+
+
+##########################################################
+# Market stream
+##########################################################
+
+def test_poll_once_fetches_all_subscribed_coins(market_stream):
+    """Test that one upstream request serves every subscriber."""
+    first = market_stream.subscribe(["bitcoin"])
+    second = market_stream.subscribe(["bitcoin", "ethereum"])
+    with patch.object(market_stream.crypto_model, "get_crypto_prices",
+                      return_value={"bitcoin": 100.0, "ethereum": 10.0}) as mock_prices:
+        assert market_stream.poll_once() == 2
+    mock_prices.assert_called_once_with(["bitcoin", "ethereum"])
+    assert len(first.get(timeout=0)) == 1
+    assert len(second.get(timeout=0)) == 2
+
+
+def test_fired_alert_pushed_to_owner(session, market_stream):
+    """Test that a fired alert reaches only its owner's alert channel."""
+    alert = PriceAlert.create_alert("bitcoin", 110.0, 100.0, user_id=7)
+    owner = market_stream.subscribe([], user_id=7)
+    other = market_stream.subscribe([], user_id=8)
+
+    assert market_stream.publish_price("bitcoin", 115.0) == [alert.id]
+    messages = owner.get(timeout=0)
+    assert messages == [("alert", alert.to_dict())]
+    assert other.get(timeout=0) == []
+
+
+def test_stream_route(client, market_stream):
+    """Test the SSE route delivers published prices."""
+    response = client.get("/api/stream/prices?ids=bitcoin")
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    market_stream.publish_price("bitcoin", 123.0)
+    assert read_events(response, 1)[0][1]["price_usd"] == 123.0
+    response.close()
+    assert market_stream.pubsub.topics() == []
+
+
+def test_stream_route_releases_unread_subscriptions(app, client, market_stream):
+    """Test that streams closed before their first read, or replaced by an error, unsubscribe."""
+    client.head("/api/stream/prices?ids=bitcoin").close()
+    assert market_stream.pubsub.topics() == []
+
+    client.get("/api/stream/prices?ids=bitcoin").close()
+    assert market_stream.pubsub.topics() == []
+
+    def _fail(response):
+        raise RuntimeError("hook failed")
+
+    app.after_request_funcs.setdefault(None, []).append(_fail)
+    app.config["PROPAGATE_EXCEPTIONS"] = False
+    assert client.get("/api/stream/prices?ids=bitcoin").status_code == 500
+    assert market_stream.pubsub.topics() == []
+
+
+def test_stream_route_alerts_for_token(client, session, market_stream):
+    """Test that a session token adds the user's alert channel to the stream."""
+    Users.create_user("testuser", "securepassword123")
+    token = client.post("/api/login", json={"username": "testuser", "password": "securepassword123"}).get_json()["token"]
+    user_id = Users.get_id_by_username("testuser")
+    alert = PriceAlert.create_alert("bitcoin", 90.0, 100.0, user_id=user_id)
+
+    response = client.get(f"/api/stream/prices?token={token}")
+    market_stream.publish_price("bitcoin", 85.0)
+    event, data = read_events(response, 1)[0]
+    assert event == "alert" and data["id"] == alert.id
+    response.close()
+
+
+def test_stream_route_validation(client):
+    assert client.get("/api/stream/prices").status_code == 400
+    assert client.get("/api/stream/prices?ids=bitcoin&token=bogus").status_code == 401
@@ -0,0 +1,53 @@
+from unittest.mock import MagicMock, patch
+
+from crypto_project.models.cryptodata_model import CryptoDataModel
+from crypto_project.utils.metrics import Counter, Histogram
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, route="/a")
+    assert histogram.samples() == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 2.650000',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("events_total", "Events.", ("name",))
+    counter.inc(name='say "hi"')
+    counter.inc(2, name='say "hi"')
+    assert counter.samples() == ['events_total{name="say \\"hi\\""} 3']
+
+
+def test_metrics_endpoint_reports_routes_and_queries(client, app):
+    """Test that requests and SQL statements made while serving them are recorded."""
+    client.post("/api/create-account", json={"username": "metrics-user", "password": "pw"})
+    client.get("/api/health")
+
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    body = response.get_data(as_text=True)
+    assert 'http_requests_total{method="GET",route="/api/health",status="200"} 1' in body
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/create-account"} 1' in body
+
+    metrics = app.extensions["metrics"]
+    assert metrics.db_queries.value(statement="INSERT") >= 1
+    assert metrics.db_duration.count(statement="INSERT") == metrics.db_queries.value(statement="INSERT")
+
+
+def test_upstream_requests_are_recorded(app):
+    """Test that CoinGecko calls are timed per endpoint template and status."""
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"prices": [[0, 1.0]]}
+    with patch("crypto_project.models.cryptodata_model.requests.get", return_value=response):
+        CryptoDataModel().get_price_trends("bitcoin")
+
+    metrics = app.extensions["metrics"]
+    assert metrics.upstream_requests.value(endpoint="/coins/{id}/market_chart", status=200) == 1
+    assert metrics.upstream_duration.count(endpoint="/coins/{id}/market_chart") == 1
@@ -79,3 +79,26 @@ def test_get_total_value_invalid_data(portfolio, mock_get_crypto_price):
     mock_get_crypto_price.side_effect = lambda crypto_id: None
     total_value = portfolio.get_total_value()
     assert total_value == 0.0
+
+######################################################
+#
+#    Tests for Loading a User's Portfolio
+#
+######################################################
+
+def test_get_user_portfolio_rebuilds_from_transactions(app, session):
+    """Test that the portfolio is rebuilt from executed transactions on top of the opening cash."""
+    from crypto_project.models.transaction_model import TransactionModel
+
+    app.config["PORTFOLIO_OPENING_CASH"] = 1000.0
+    empty = Portfolio.get_user_portfolio(1)
+    assert (empty.holdings, empty.get_cash_balance()) == ({}, 1000.0)
+
+    TransactionModel.create_transaction(1, "bitcoin", "buy", 2.0, 100.0)
+    TransactionModel.create_transaction(1, "bitcoin", "sell", 0.5, 200.0)
+    portfolio = Portfolio.get_user_portfolio(1)
+    assert portfolio.get_crypto_count("bitcoin") == 1.5
+    assert portfolio.get_cash_balance() == 900.0
+
+    with pytest.raises(ValueError, match="Insufficient cash balance"):
+        TransactionModel.create_transaction(1, "bitcoin", "buy", 10.0, 100.0)
@@ -0,0 +1,146 @@
+import pytest
+from datetime import datetime, timedelta
+
+from crypto_project.models.portfolio_snapshot_model import PortfolioSnapshot, PortfolioState
+from crypto_project.models.transaction_archive_model import TransactionArchive
+from crypto_project.models.transaction_model import TransactionModel
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def add_transaction(session):
+    """Fixture to append a transaction event for user 1, one hour after the previous one."""
+    events = []
+
+    def _add(transaction_type="buy", quantity=1.0, price=100.0, crypto_id="bitcoin", target_price=None):
+        transaction = TransactionModel(user_id=1, crypto_id=crypto_id, transaction_type=transaction_type,
+                                       quantity=quantity, price=price, target_price=target_price)
+        transaction.timestamp = START + timedelta(hours=len(events))
+        session.add(transaction)
+        session.commit()
+        events.append(transaction)
+        return transaction
+    return _add
+
+
+##########################################################
+# Folding events
+##########################################################
+
+def test_apply_tracks_holdings_cash_and_cost_basis():
+    """Test folding buys and sells with average-cost basis."""
+    state = PortfolioState(user_id=1)
+    state.apply(TransactionModel(user_id=1, crypto_id="bitcoin", transaction_type="buy", quantity=2.0, price=100.0))
+    state.apply(TransactionModel(user_id=1, crypto_id="bitcoin", transaction_type="buy", quantity=2.0, price=200.0))
+    state.apply(TransactionModel(user_id=1, crypto_id="bitcoin", transaction_type="sell", quantity=1.0, price=300.0))
+
+    assert state.holdings == {"bitcoin": 3.0}
+    assert state.cost_basis == {"bitcoin": 450.0}
+    assert state.cash_balance == -300.0
+    assert state.event_count == 3
+    assert state.to_portfolio(opening_cash=1000.0).get_cash_balance() == 700.0
+
+
+##########################################################
+# Snapshots
+##########################################################
+
+def test_get_state_writes_snapshot_every_interval(session, add_transaction):
+    """Test that a snapshot is written once the replayed tail reaches the interval."""
+    for _ in range(5):
+        add_transaction()
+
+    state = PortfolioSnapshot.get_state(1, snapshot_interval=5)
+    assert state.holdings == {"bitcoin": 5.0}
+    snapshot = PortfolioSnapshot.get_latest(1)
+    assert snapshot is not None and snapshot.event_count == 5
+
+    add_transaction(transaction_type="sell", quantity=2.0, price=150.0)
+    state = PortfolioSnapshot.get_state(1, snapshot_interval=5)
+    assert state.holdings == {"bitcoin": 3.0}
+    assert state.event_count == 6
+    assert session.query(PortfolioSnapshot).count() == 1, "A one-event tail should not trigger a new snapshot."
+
+
+def test_get_state_replays_only_tail(session, add_transaction, mocker):
+    """Test that only events after the snapshot are applied."""
+    for _ in range(3):
+        add_transaction()
+    PortfolioSnapshot.save_state(PortfolioSnapshot.get_state(1))
+    add_transaction()
+
+    spy = mocker.spy(PortfolioState, "apply")
+    state = PortfolioSnapshot.get_state(1)
+    assert spy.call_count == 1
+    assert state.holdings == {"bitcoin": 4.0}
+
+
+def test_get_state_as_of(session, add_transaction):
+    """Test reconstructing the state at a past timestamp, ignoring later snapshots."""
+    for _ in range(4):
+        add_transaction()
+    PortfolioSnapshot.save_state(PortfolioSnapshot.get_state(1))
+
+    state = PortfolioSnapshot.get_state(1, as_of=START + timedelta(hours=1, minutes=30))
+    assert state.holdings == {"bitcoin": 2.0}
+    assert state.cash_balance == -200.0
+
+
+def test_get_state_includes_archived_events(session, add_transaction):
+    """Test that archived transactions are still replayed."""
+    first = add_transaction(target_price=100.0)
+    first.active = False  # An executed custom order
+    session.commit()
+    add_transaction()
+    TransactionArchive.archive_inactive(older_than_days=1)
+
+    state = PortfolioSnapshot.get_state(1)
+    assert state.holdings == {"bitcoin": 2.0}
+
+
+def test_get_state_skips_deleted_rows_and_pending_orders(session, add_transaction):
+    """Test that soft-deleted trades and unexecuted custom orders are not folded."""
+    add_transaction(quantity=1.0)
+    deleted = add_transaction(quantity=2.0)
+    add_transaction(quantity=4.0, target_price=50.0)
+    TransactionModel.delete_transaction(deleted.id)
+
+    state = PortfolioSnapshot.get_state(1)
+    assert state.holdings == {"bitcoin": 1.0}
+    assert state.event_count == 1
+
+
+def test_changing_folded_rows_invalidates_snapshots(session, add_transaction):
+    """Test that edits and deletes of rows behind a snapshot are reflected."""
+    first = add_transaction(quantity=1.0)
+    second = add_transaction(quantity=2.0)
+    PortfolioSnapshot.get_state(1, snapshot_interval=2)
+    assert PortfolioSnapshot.get_latest(1) is not None
+
+    TransactionModel.edit_transaction(first.id, quantity=3.0, total_value=300.0)
+    assert PortfolioSnapshot.get_latest(1) is None
+    assert PortfolioSnapshot.get_state(1, snapshot_interval=2).holdings == {"bitcoin": 5.0}
+
+    TransactionModel.delete_transaction(second.id)
+    assert PortfolioSnapshot.get_latest(1) is None
+    assert PortfolioSnapshot.get_state(1).holdings == {"bitcoin": 3.0}
+
+
+def test_portfolio_route(client, add_transaction, auth_headers):
+    """Test the portfolio route with and without a point in time."""
+    add_transaction()
+    add_transaction()
+    response = client.get("/api/portfolio/1", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()["portfolio"]["holdings"] == {"bitcoin": 2.0}
+
+    response = client.get("/api/portfolio/1?as_of=not-a-date", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_portfolio_route_requires_the_owner(client, add_transaction, auth_headers):
+    """Test that a portfolio is only served to its own user's session."""
+    add_transaction()
+    assert client.get("/api/portfolio/1").status_code == 401
+    assert client.get("/api/portfolio/2", headers=auth_headers).status_code == 403
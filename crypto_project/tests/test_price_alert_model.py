@@ -0,0 +1,136 @@
+import pytest
+from unittest.mock import patch
+
+from crypto_project.models.cryptodata_model import CryptoDataModel
+from crypto_project.models.price_alert_model import PriceAlert, PriceAlertIndex
+
+
+@pytest.fixture
+def index():
+    """Fixture to provide an index with alerts above and below 100."""
+    index = PriceAlertIndex()
+    for alert_id, threshold in enumerate([105.0, 110.0, 120.0, 130.0], start=1):
+        index.add(alert_id, "bitcoin", "above", threshold)
+    for alert_id, threshold in enumerate([95.0, 90.0, 80.0], start=11):
+        index.add(alert_id, "bitcoin", "below", threshold)
+    return index
+
+
+@pytest.fixture
+def mock_get_crypto_price():
+    with patch("crypto_project.models.cryptodata_model.CryptoDataModel.get_crypto_price") as mock_price:
+        yield mock_price
+
+
+##########################################################
+# Threshold index
+##########################################################
+
+def test_find_crossed_rising(index):
+    """Test that a rise fires exactly the 'above' alerts in (previous, current]."""
+    assert index.find_crossed("bitcoin", 100.0, 120.0) == [1, 2, 3]
+    assert index.find_crossed("bitcoin", 120.0, 125.0) == []
+    assert len(index) == 4
+
+
+def test_find_crossed_falling(index):
+    """Test that a fall fires exactly the 'below' alerts in [current, previous)."""
+    assert sorted(index.find_crossed("bitcoin", 100.0, 90.0)) == [11, 12]
+    assert index.find_crossed("bitcoin", 90.0, 85.0) == []
+
+
+def test_find_crossed_first_observation(index):
+    """Test that without a previous price every satisfied alert fires."""
+    assert index.find_crossed("bitcoin", None, 112.0) == [1, 2]
+
+
+def test_find_crossed_unknown_coin(index):
+    assert index.find_crossed("dogecoin", 1.0, 2.0) == []
+
+
+##########################################################
+# Persistence and evaluation
+##########################################################
+
+def test_set_price_alert_persists_and_fires(app, session, mock_get_crypto_price):
+    """Test that alerts are stored, indexed and marked fired in the database."""
+    mock_get_crypto_price.return_value = 100.0
+    model = CryptoDataModel()
+    above = model.set_price_alert("bitcoin", 110.0, user_id=1)
+    below = model.set_price_alert("bitcoin", 90.0, user_id=1)
+    assert above.direction == "above" and below.direction == "below"
+
+    index = app.extensions["price_alerts"]
+    assert index.on_price("bitcoin", 111.0) == [above.id]
+    session.refresh(above)
+    assert above.fired is True
+    assert above.fired_price == 111.0
+    assert session.get(PriceAlert, below.id).fired is False
+
+
+def test_failed_mark_fired_keeps_alerts_pending(app, session, mock_get_crypto_price):
+    """Test that alerts return to the index when the fired UPDATE fails, and the price route still succeeds."""
+    mock_get_crypto_price.return_value = 100.0
+    alert = CryptoDataModel().set_price_alert("bitcoin", 110.0, user_id=1)
+    index = app.extensions["price_alerts"]
+    index.on_price("bitcoin", 100.0)
+
+    mock_get_crypto_price.return_value = 111.0
+    with patch.object(PriceAlert, "mark_fired", side_effect=RuntimeError("database is locked")):
+        response = app.test_client().get("/api/crypto-price/bitcoin")
+    assert response.status_code == 200
+    assert response.get_json()["price_usd"] == 111.0
+    assert len(index) == 1
+
+    assert index.on_price("bitcoin", 111.0) == [alert.id]
+    assert session.get(PriceAlert, alert.id).fired is True
+
+
+def test_load_restores_pending_alerts(session):
+    """Test that only unfired alerts are loaded, in threshold order."""
+    first = PriceAlert.create_alert("ethereum", 3000.0, 2000.0)
+    second = PriceAlert.create_alert("ethereum", 2500.0, 2000.0)
+    fired = PriceAlert.create_alert("ethereum", 2100.0, 2000.0)
+    PriceAlert.mark_fired([fired.id], 2100.0)
+
+    index = PriceAlertIndex()
+    assert index.load() == 2
+    assert index.find_crossed("ethereum", 2000.0, 3500.0) == [second.id, first.id]
+
+
+def test_mark_fired_claims_each_alert_once(session):
+    """Test that an alert already fired (e.g. by another process) is not claimed again."""
+    alert = PriceAlert.create_alert("ethereum", 3000.0, 2000.0)
+    assert PriceAlert.mark_fired([alert.id], 3100.0) == [alert.id]
+    assert PriceAlert.mark_fired([alert.id], 3200.0) == []
+    assert session.get(PriceAlert, alert.id).fired_price == 3100.0
+
+
+def test_index_reloads_alerts_from_other_processes(app, session):
+    """Test that a syncing index picks up alerts it did not create."""
+    index = PriceAlertIndex(sync_interval=60)
+    index.load()
+    alert = PriceAlert(crypto_id="ethereum", target_price=3000.0, direction="above")
+    session.add(alert)
+    session.commit()
+
+    index.on_price("ethereum", 2000.0)
+    assert index.on_price("ethereum", 3100.0) == []  # Not reloaded yet
+
+    index._next_sync = 0.0
+    index.on_price("ethereum", 2000.0)
+    assert index.on_price("ethereum", 3100.0) == [alert.id]
+
+
+def test_create_alert_invalid_direction(session):
+    with pytest.raises(ValueError, match="Direction must be 'above' or 'below'"):
+        PriceAlert.create_alert("bitcoin", 100.0, 90.0, direction="sideways")
+
+
+def test_set_price_alert_route(client, mock_get_crypto_price):
+    """Test the set-price-alert route returns the stored alert."""
+    mock_get_crypto_price.return_value = 100.0
+    response = client.post("/api/set-price-alert", json={"crypto_id": "bitcoin", "target_price": 150.0})
+    assert response.status_code == 201
+    assert response.get_json()["direction"] == "above"
+    assert response.get_json()["alert_id"] is not None
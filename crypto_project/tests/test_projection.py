@@ -0,0 +1,74 @@
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from crypto_project.models.cryptodata_model import CryptoDataModel
+from crypto_project.utils.json_provider import FastJSONProvider
+from crypto_project.utils.projection import format_records, parse_fields, to_columns
+
+MARKETS = [
+    {"id": "bitcoin", "symbol": "btc", "current_price": 60000.0, "roi": None, "image": "https://img/btc.png"},
+    {"id": "ethereum", "symbol": "eth", "current_price": 3000.0, "roi": {"times": 80.1}, "image": "https://img/eth.png"},
+]
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields(" id, current_price,,id ") == ["id", "current_price"]
+    assert parse_fields(",") is None
+
+
+def test_to_columns_keeps_record_order_and_fills_missing_fields():
+    assert to_columns([{"a": 1}, {"a": 2, "b": 3}]) == {"a": [1, 2], "b": [None, 3]}
+    assert format_records(MARKETS, ["id", "current_price"], "columnar") == {
+        "id": ["bitcoin", "ethereum"], "current_price": [60000.0, 3000.0]}
+
+
+def test_format_records_rejects_unknown_format():
+    with pytest.raises(ValueError, match="Unknown format"):
+        format_records(MARKETS, None, "csv")
+
+
+def test_fast_json_provider_matches_default_output(app):
+    payload = {"b": [1, 2.5, None], "a": "café", "when": datetime(2024, 1, 2, 3, 4, 5),
+               "amount": Decimal("1.10"), 7: True}
+    fast, default = FastJSONProvider(app), DefaultJSONProvider(app)
+    assert fast.loads(fast.dumps(payload)) == default.loads(default.dumps({str(k): v for k, v in payload.items()}))
+    assert fast.dumps({"b": 1, "a": 2}) == '{"a":2,"b":1}'
+    assert fast.dumps(2 ** 70) == str(2 ** 70)
+    # Non-ASCII text is escaped like the default provider unless ensure_ascii is off
+    for text in ("café", "bitcoin ₿", "rocket 🚀"):
+        assert fast.dumps({"a": text}) == default.dumps({"a": text}, separators=(",", ":"))
+    assert fast.dumps({"a": "café"}) == '{"a":"caf\\u00e9"}'
+    fast.ensure_ascii = False
+    assert fast.dumps({"a": "café"}) == '{"a":"café"}'
+
+
+def test_top_cryptos_projection_and_columnar_format(client):
+    with patch.object(CryptoDataModel, "get_top_performing_cryptos", return_value=MARKETS):
+        projected = client.get("/api/top-cryptos?fields=id,current_price").get_json()
+        columnar = client.get("/api/top-cryptos?fields=id,current_price&format=columnar").get_json()
+        full = client.get("/api/top-cryptos").get_json()
+
+    assert projected["top_cryptos"] == [{"id": "bitcoin", "current_price": 60000.0},
+                                        {"id": "ethereum", "current_price": 3000.0}]
+    assert columnar["top_cryptos"] == {"id": ["bitcoin", "ethereum"], "current_price": [60000.0, 3000.0]}
+    assert full["top_cryptos"] == MARKETS
+
+
+def test_compare_cryptos_columnar_follows_path_order(client):
+    comparison = {"ethereum": MARKETS[1], "bitcoin": MARKETS[0]}
+    with patch.object(CryptoDataModel, "compare_cryptos", return_value=comparison):
+        response = client.get("/api/compare-cryptos/ethereum/bitcoin?fields=current_price&format=columnar")
+        projected = client.get("/api/compare-cryptos/ethereum/bitcoin?fields=symbol").get_json()
+
+    assert response.get_json() == {"comparison": {"current_price": [3000.0, 60000.0]},
+                                   "order": ["ethereum", "bitcoin"]}
+    assert projected["comparison"] == {"ethereum": {"symbol": "eth"}, "bitcoin": {"symbol": "btc"}}
+
+
+def test_market_endpoints_reject_unknown_format(client):
+    assert client.get("/api/top-cryptos?format=csv").status_code == 400
@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import Future
+
+import pytest
+from unittest.mock import patch
+
+from crypto_project.models.user_model import Users
+from crypto_project.utils.qr_cache import QRCodeCache
+from crypto_project.utils.twofa_utils import generate_qr_code_png, generate_totp_secret
+
+
+@pytest.fixture
+def logged_in(client, session):
+    """Fixture to create a user and return its Authorization header."""
+    Users.create_user("testuser", "securepassword123")
+    token = client.post("/api/login", json={"username": "testuser", "password": "securepassword123"}).get_json()["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+##########################################################
+# QRCodeCache
+##########################################################
+
+def test_get_png_renders_once():
+    """Test that repeated and concurrent lookups share a single render."""
+    cache = QRCodeCache(max_size=4)
+    secret = generate_totp_secret()
+    with patch("crypto_project.utils.qr_cache.generate_qr_code_png", wraps=generate_qr_code_png) as mock_render:
+        threads = [threading.Thread(target=cache.get_png, args=("testuser", secret)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        png = cache.get_png("testuser", secret)
+    assert png.startswith(b"\x89PNG")
+    assert mock_render.call_count == 1
+
+
+def test_get_png_keyed_by_secret():
+    """Test that a rotated secret renders a new image."""
+    cache = QRCodeCache()
+    assert cache.get_png("testuser", generate_totp_secret()) != cache.get_png("testuser", generate_totp_secret())
+
+
+def test_cache_is_bounded():
+    """Test that the least recently used PNG is evicted."""
+    cache = QRCodeCache(max_size=1)
+    first = generate_totp_secret()
+    cache.get_png("a", first)
+    cache.get_png("b", generate_totp_secret())
+    assert ("a", first, "CryptoApp") not in cache._cache
+
+
+
+def test_render_is_cached_before_get_png_returns():
+    """Test that the caller stores the render itself when the done-callback has not run yet."""
+    cache = QRCodeCache()
+    secret = generate_totp_secret()
+    with patch.object(Future, "add_done_callback"):
+        cache.get_png("a", secret)
+    assert ("a", secret, "CryptoApp") in cache._cache
+    assert not cache._pending
+
+
+##########################################################
+# QR route
+##########################################################
+
+def test_qr_route_etag(client, logged_in):
+    """Test that the route serves a PNG and answers conditional requests with 304."""
+    response = client.get("/api/2fa/qr/testuser", headers=logged_in)
+    assert response.status_code == 200
+    assert response.mimetype == "image/png"
+    etag = response.headers["ETag"]
+
+    response = client.get("/api/2fa/qr/testuser", headers=dict(logged_in, **{"If-None-Match": etag}))
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_qr_route_other_user(client, logged_in):
+    """Test that users cannot fetch another user's QR code."""
+    assert client.get("/api/2fa/qr/someoneelse", headers=logged_in).status_code == 403
+    assert client.get("/api/2fa/qr/testuser").status_code == 401
@@ -0,0 +1,74 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from config import TestConfig
+from crypto_project.db import db, get_read_engine, read_bind_uri, use_read_engine
+from crypto_project.models.transaction_model import TransactionModel
+from crypto_project.models.user_model import Users
+
+
+class SplitConfig(TestConfig):
+    DB_READ_SPLIT = True
+
+
+@pytest.fixture
+def split_app(tmp_path):
+    """An app on a file database with a separate read engine."""
+    class FileSplitConfig(SplitConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path}/split.db"
+
+    app = create_app(FileSplitConfig)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        get_read_engine().dispose()
+
+
+def test_read_bind_uri():
+    assert read_bind_uri("sqlite:////data/app.db") == "sqlite:////data/app.db"
+    assert read_bind_uri("sqlite:////data/app.db", "sqlite:////replica/app.db") == "sqlite:////replica/app.db"
+    assert read_bind_uri("sqlite:///:memory:") is None
+
+
+def test_in_memory_database_has_no_read_engine():
+    app = create_app(SplitConfig)
+    with app.app_context():
+        assert get_read_engine() is None
+
+
+def test_reads_are_routed_and_writes_stay_on_primary(split_app):
+    read_engine = get_read_engine()
+    with use_read_engine():
+        assert db.session.get_bind(clause=select(TransactionModel)) is read_engine
+        assert db.session.get_bind(clause=insert(TransactionModel)) is db.engine
+    assert db.session.get_bind(clause=select(TransactionModel)) is db.engine
+
+
+def test_read_engine_refuses_writes(split_app):
+    with get_read_engine().connect() as connection:
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.exec_driver_sql("DELETE FROM transactions")
+
+
+def test_read_only_endpoint_queries_read_engine(split_app):
+    """Test that a decorated view reads committed rows through the read engine."""
+    transaction = TransactionModel(user_id=1, crypto_id="bitcoin", transaction_type="buy", quantity=2.0, price=10.0)
+    transaction.timestamp = datetime(2024, 1, 2, 12, 0)
+    db.session.add(transaction)
+    db.session.commit()
+
+    Users.create_user("testuser", "securepassword123")
+    token = split_app.test_client().post(
+        "/api/login", json={"username": "testuser", "password": "securepassword123"}).get_json()["token"]
+
+    statements = []
+    event.listen(get_read_engine(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    response = split_app.test_client().get("/api/stats?user_id=1", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.get_json()["stats"]["trade_count"] == 1
+    assert any("trading_rollups" in statement for statement in statements)
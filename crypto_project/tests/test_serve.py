@@ -0,0 +1,35 @@
+from config import TestConfig
+from serve import shared_state_problems
+
+
+class MultiProcessConfig(TestConfig):
+    USER_CACHE_LOCAL_TTL = 5.0
+    PRICE_ALERT_SYNC_INTERVAL = 5.0
+    SESSION_REVOCATION_SYNC_INTERVAL = 5.0
+
+
+def test_single_worker_needs_no_shared_state():
+    """Test that one worker starts whatever the cache settings are."""
+    assert shared_state_problems(TestConfig, 1) == []
+
+
+def test_workers_converge_through_the_database():
+    """Test that several workers may start when local state is refreshed from shared storage."""
+    assert shared_state_problems(MultiProcessConfig, 4) == []
+
+
+def test_workers_refused_without_shared_state():
+    """Test that several workers are refused when their auth or alert state would diverge."""
+    class DivergingConfig(MultiProcessConfig):
+        USER_CACHE_LOCAL_TTL = float("inf")
+        PRICE_ALERT_SYNC_INTERVAL = 0
+
+    problems = shared_state_problems(DivergingConfig, 4)
+    assert len(problems) == 2
+    assert "USER_CACHE_REDIS_URL" in problems[0]
+    assert "PRICE_ALERT_SYNC_INTERVAL" in problems[1]
+
+    class RedisConfig(DivergingConfig):
+        USER_CACHE_REDIS_URL = "redis://localhost:6379/0"
+
+    assert len(shared_state_problems(RedisConfig, 4)) == 1
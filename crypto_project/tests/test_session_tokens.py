@@ -0,0 +1,134 @@
+import pyotp
+import pytest
+from unittest.mock import patch
+
+from crypto_project.models.user_model import Users
+from crypto_project.utils.session_tokens import SessionTokenManager
+
+
+@pytest.fixture
+def manager():
+    return SessionTokenManager("secret", max_age=60, cache_size=2)
+
+
+@pytest.fixture
+def registered_user(session):
+    Users.create_user("testuser", "securepassword123")
+    return {"username": "testuser", "password": "securepassword123"}
+
+
+##########################################################
+# Token manager
+##########################################################
+
+def test_issue_and_verify(manager):
+    """Test that an issued token verifies to its claims."""
+    token = manager.issue(1, "testuser", totp_verified=True)
+    claims = manager.verify(token)
+    assert claims["user_id"] == 1
+    assert claims["username"] == "testuser"
+    assert claims["2fa"] is True
+
+
+def test_verify_uses_cache(manager):
+    """Test that a cached token is verified without checking the signature again."""
+    token = manager.issue(1, "testuser")
+    with patch.object(manager._serializer, "loads") as mock_loads:
+        assert manager.verify(token) is not None
+        mock_loads.assert_not_called()
+
+
+def test_verify_after_eviction(manager):
+    """Test that tokens evicted from the LRU are still verified by signature."""
+    first = manager.issue(1, "first")
+    manager.issue(2, "second")
+    manager.issue(3, "third")
+    assert first not in manager._cache
+    assert manager.verify(first)["username"] == "first"
+
+
+def test_verify_rejects_tampered_and_foreign_tokens(manager):
+    """Test that invalid signatures are rejected."""
+    token = manager.issue(1, "testuser")
+    assert manager.verify(token[:-2] + "xx") is None
+    assert manager.verify(SessionTokenManager("other").issue(1, "testuser")) is None
+
+
+def test_verify_expired(manager):
+    """Test that expired tokens are rejected, even when cached."""
+    token = manager.issue(1, "testuser")
+    with patch("crypto_project.utils.session_tokens.time.time", return_value=10 ** 12):
+        assert manager.verify(token) is None
+
+
+def test_revoke(manager):
+    """Test that revoked tokens stay rejected after leaving the cache."""
+    token = manager.issue(1, "testuser")
+    assert manager.revoke(token) is True
+    assert manager.verify(token) is None
+    assert manager.revoke(token) is False
+
+
+def test_revocation_shared_between_managers(session):
+    """Test that a logout in one process is honoured by another after its next sync."""
+    from crypto_project.models.revoked_token_model import RevokedToken
+
+    first = SessionTokenManager("secret", revocation_store=RevokedToken, sync_interval=0)
+    second = SessionTokenManager("secret", revocation_store=RevokedToken, sync_interval=60)
+    token = first.issue(1, "testuser")
+    assert second.verify(token) is not None  # Cached in the second process
+
+    assert first.revoke(token) is True
+    assert session.get(RevokedToken, first._serializer.loads(token)["jti"]) is not None
+    assert second.verify(token) is not None  # Not synced yet
+
+    second._next_sync = 0.0
+    assert second.verify(token) is None
+
+
+##########################################################
+# Routes
+##########################################################
+
+def test_login_returns_token(client, registered_user):
+    """Test that login issues a token accepted by authenticated routes."""
+    response = client.post("/api/login", json=registered_user)
+    assert response.status_code == 200
+    token = response.get_json()["token"]
+
+    response = client.get("/api/session", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.get_json()["username"] == "testuser"
+    assert response.get_json()["totp_verified"] is False
+
+
+def test_login_with_totp(client, registered_user):
+    """Test binding a session to a TOTP check."""
+    secret = Users.query.filter_by(username="testuser").first().totp_secret
+    response = client.post("/api/login", json=dict(registered_user, totp_token=pyotp.TOTP(secret).now()))
+    token = response.get_json()["token"]
+    response = client.get("/api/session", headers={"Authorization": f"Bearer {token}"})
+    assert response.get_json()["totp_verified"] is True
+
+    response = client.post("/api/login", json=dict(registered_user, totp_token="000000"))
+    assert response.status_code == 401
+
+
+def test_login_requires_totp_when_configured(app, client, registered_user):
+    """Test that SESSION_REQUIRE_TOTP rejects password-only logins."""
+    app.config["SESSION_REQUIRE_TOTP"] = True
+    response = client.post("/api/login", json=registered_user)
+    assert response.status_code == 401
+
+
+def test_logout_revokes_token(client, registered_user):
+    """Test that a logged-out token can no longer be used."""
+    token = client.post("/api/login", json=registered_user).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.post("/api/logout", headers=headers).status_code == 200
+    assert client.get("/api/session", headers=headers).status_code == 401
+
+
+def test_session_requires_token(client):
+    """Test that authenticated routes reject requests without a token."""
+    assert client.get("/api/session").status_code == 401
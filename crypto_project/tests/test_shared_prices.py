@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import patch
+
+from crypto_project.models.cryptodata_model import CryptoDataModel
+from crypto_project.utils.shared_prices import SharedPriceSnapshot, _HEADER
+
+
+@pytest.fixture
+def snapshot():
+    """Fixture to provide a small snapshot that is removed after the test."""
+    snapshot = SharedPriceSnapshot.create(capacity=4)
+    yield snapshot
+    snapshot.close()
+
+
+def test_update_and_attach(snapshot):
+    """Test that a second handle sees prices written by the owner, including later additions."""
+    reader = SharedPriceSnapshot.attach(snapshot.name, capacity=4)
+    try:
+        snapshot.update({"bitcoin": 50000.0, "ethereum": 3000.0})
+        assert reader.get("bitcoin") == 50000.0
+        assert reader.get("ethereum") == 3000.0
+        assert reader.get("dogecoin") is None
+
+        snapshot.update({"bitcoin": 51000.0, "dogecoin": 0.1})
+        assert reader.get("bitcoin") == 51000.0
+        assert reader.get("dogecoin") == 0.1
+    finally:
+        reader.close()
+
+
+def test_get_ignores_stale_prices(snapshot):
+    snapshot.update({"bitcoin": 50000.0}, timestamp=0.0)
+    assert snapshot.get("bitcoin") == 50000.0
+    assert snapshot.get("bitcoin", max_age=60) is None
+
+
+def test_get_gives_up_during_write(snapshot):
+    """Test that a reader never returns a value while the sequence counter is odd."""
+    snapshot.update({"bitcoin": 50000.0})
+    seq, count = _HEADER.unpack_from(snapshot.shm.buf, 0)
+    _HEADER.pack_into(snapshot.shm.buf, 0, seq + 1, count)
+    assert snapshot.get("bitcoin") is None
+
+
+def test_update_beyond_capacity(snapshot):
+    snapshot.update({f"coin-{i}": float(i) for i in range(6)})
+    assert snapshot.get("coin-3") == 3.0
+    assert snapshot.get("coin-4") is None
+
+
+def test_crypto_model_reads_snapshot(snapshot):
+    """Test that the model only calls the API for coins missing from the snapshot."""
+    snapshot.update({"bitcoin": 50000.0})
+    model = CryptoDataModel()
+    model.price_snapshot = snapshot
+    with patch("crypto_project.models.cryptodata_model.requests.get") as mock_get:
+        assert model.get_crypto_price("bitcoin") == 50000.0
+        mock_get.assert_not_called()
+
+        mock_get.return_value.json.return_value = {"ethereum": {"usd": 3000.0}}
+        assert model.get_crypto_price("ethereum") == 3000.0
+        mock_get.assert_called_once()
+
+
+def test_batch_prices_only_request_missing_coins(snapshot):
+    """Test that batched lookups are served from the snapshot and fetch only the rest."""
+    snapshot.update({"bitcoin": 50000.0, "ethereum": 3000.0})
+    model = CryptoDataModel()
+    model.price_snapshot = snapshot
+    with patch("crypto_project.models.cryptodata_model.requests.get") as mock_get:
+        assert model.get_crypto_prices(["bitcoin", "ethereum"]) == {"bitcoin": 50000.0, "ethereum": 3000.0}
+        mock_get.assert_not_called()
+
+        mock_get.return_value.json.return_value = {"solana": {"usd": 150.0}}
+        prices = model.get_crypto_prices(["bitcoin", "solana"])
+        assert prices == {"bitcoin": 50000.0, "solana": 150.0}
+        assert mock_get.call_args.kwargs["params"]["ids"] == "solana"
@@ -0,0 +1,57 @@
+import pytest
+
+from app import create_app
+from config import TestConfig
+from crypto_project.db import db
+from crypto_project.models.user_model import Users
+from crypto_project.utils.sql_profiler import profile_sql, statement_shape
+
+
+class ProfilingConfig(TestConfig):
+    SQL_PROFILING = True
+    SQL_PROFILE_REPEAT_THRESHOLD = 3
+
+
+@pytest.fixture
+def profiled_app():
+    """Fixture to provide an app with SQL profiling enabled."""
+    app = create_app(ProfilingConfig)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_statement_shape_ignores_values():
+    first = statement_shape("SELECT * FROM users\n WHERE id IN (?, ?, ?) LIMIT 10")
+    second = statement_shape("SELECT * FROM users WHERE id IN (?, ?) LIMIT 5")
+    assert first == second == "SELECT * FROM users WHERE id IN (?...) LIMIT N"
+
+
+def test_profile_flags_repeated_statements(profiled_app):
+    """Test that a per-row lookup loop is reported as an N+1 pattern with its origin."""
+    with profile_sql("lookup-loop") as profile:
+        for i in range(4):
+            Users.query.filter_by(username=f"user{i}").first()
+
+    assert len(profile.queries) == 4
+    repeated = profile.repeated(3)
+    assert len(repeated) == 1
+    (queries,) = repeated.values()
+    assert "test_sql_profiler.py" in queries[0].origin
+    assert profile.slow(0.0) == profile.queries
+
+
+def test_profile_header_on_requests(profiled_app):
+    client = profiled_app.test_client()
+    response = client.post("/api/create-account", json={"username": "profiled", "password": "pw"})
+    assert response.status_code == 201
+    header = response.headers["X-SQL-Profile"]
+    assert header.startswith("queries=")
+    assert int(header.split(";")[0].split("=")[1]) >= 1
+
+
+def test_profiling_disabled_by_default(client):
+    assert "X-SQL-Profile" not in client.get("/api/health").headers
+    with client.application.app_context(), profile_sql("noop") as profile:
+        assert profile is None
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from crypto_project.utils import sql_utils
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Fixture to point sql_utils at a temporary database with one table."""
+    path = str(tmp_path / "raw.db")
+    monkeypatch.setattr(sql_utils, "DB_PATH", path)
+    with sql_utils.get_db_connection() as conn:
+        conn.execute("CREATE TABLE prices (crypto_id TEXT, price REAL)")
+        conn.commit()
+    yield path
+    sql_utils.close_all_connections()
+
+
+def test_connection_is_reused_per_thread(db_path):
+    with sql_utils.get_db_connection() as first:
+        pass
+    with sql_utils.get_db_connection() as second:
+        pass
+    assert first is second
+
+    other = []
+
+    def worker():
+        with sql_utils.get_db_connection() as conn:
+            other.append(conn)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert other[0] is not first
+
+
+def test_pragmas_applied_once_per_connection(db_path):
+    with sql_utils.get_db_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == sql_utils.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -sql_utils.SQLITE_CACHE_SIZE_KB
+
+
+def test_uncommitted_changes_are_rolled_back(db_path):
+    with sql_utils.get_db_connection() as conn:
+        conn.execute("INSERT INTO prices VALUES ('bitcoin', 1.0)")
+    with sql_utils.get_db_connection() as conn:
+        conn.execute("INSERT INTO prices VALUES ('ethereum', 2.0)")
+        conn.commit()
+    with sql_utils.get_db_connection() as conn:
+        assert conn.execute("SELECT crypto_id FROM prices").fetchall() == [("ethereum",)]
+
+
+def test_broken_connection_is_replaced_after_error(db_path):
+    """Test that a connection is health-checked after an error and replaced if it is unusable."""
+    with pytest.raises(Exception):
+        with sql_utils.get_db_connection() as conn:
+            conn.close()
+            conn.execute("SELECT 1")
+    with sql_utils.get_db_connection() as replacement:
+        assert replacement is not conn
+        assert replacement.execute("SELECT 1").fetchone() == (1,)
+
+
+def test_check_helpers(db_path):
+    sql_utils.check_database_connection()
+    sql_utils.check_table_exists("prices")
+    with pytest.raises(Exception, match="Table check error"):
+        sql_utils.check_table_exists("missing")
@@ -0,0 +1,60 @@
+import sys
+
+import sqlite3
+
+from sqlalchemy import text
+
+from app import create_schema
+from config import ProductionConfig
+from crypto_project.db import db, ensure_schema
+from crypto_project.models.cryptodata_model import get_crypto_model
+from crypto_project.models.portfolio_model import Portfolio
+from crypto_project.utils.lazy_import import lazy_import
+
+
+def test_lazy_import_defers_module_code(tmp_path, monkeypatch):
+    """Test that a lazily imported module only runs on first attribute access."""
+    (tmp_path / "lazy_probe.py").write_text("import builtins\nbuiltins.lazy_probe_loaded = True\nVALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_probe", raising=False)
+    import builtins
+
+    module = lazy_import("lazy_probe")
+    try:
+        assert not getattr(builtins, "lazy_probe_loaded", False)
+        assert module.VALUE == 42
+        assert builtins.lazy_probe_loaded is True
+        assert lazy_import("lazy_probe") is module
+    finally:
+        sys.modules.pop("lazy_probe", None)
+        builtins.__dict__.pop("lazy_probe_loaded", None)
+
+
+def test_ensure_schema_only_creates_missing_tables(app):
+    assert ensure_schema() is False
+    db.session.execute(text("DROP TABLE price_alerts"))
+    db.session.commit()
+    assert ensure_schema() is True
+    assert ensure_schema() is False
+
+
+
+def test_create_schema_builds_tables_without_an_app(tmp_path):
+    """Test the schema-only step serve.py runs in the parent process."""
+    class FileConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path}/app.db"
+
+    assert create_schema(FileConfig) is True
+    assert create_schema(FileConfig) is False
+    with sqlite3.connect(tmp_path / "app.db") as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_portfolios_share_the_app_crypto_model(app):
+    model = get_crypto_model()
+    assert model is app.extensions["crypto_model"]
+    assert Portfolio(1, {}, 0.0).crypto_data is model
+    assert Portfolio(2, {}, 0.0).crypto_data is model
+
+
+def test_crypto_model_default_outside_app_context():
+    assert get_crypto_model() is get_crypto_model()
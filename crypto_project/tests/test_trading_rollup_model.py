@@ -0,0 +1,137 @@
+import pytest
+from datetime import date, datetime
+
+from crypto_project.models.trading_rollup_model import TradingRollup
+from crypto_project.models.transaction_model import TransactionModel
+
+
+@pytest.fixture
+def add_transaction(session):
+    """Fixture to insert a transaction directly through the session."""
+    def _add(crypto_id="ethereum", transaction_type="buy", quantity=1.0, price=100.0, user_id=1, timestamp=None):
+        transaction = TransactionModel(user_id=user_id, crypto_id=crypto_id, transaction_type=transaction_type,
+                                       quantity=quantity, price=price)
+        transaction.timestamp = timestamp or datetime(2024, 1, 2, 12, 0)
+        session.add(transaction)
+        session.commit()
+        return transaction
+    return _add
+
+
+##########################################################
+# Incremental maintenance
+##########################################################
+
+def test_insert_updates_rollup(session, add_transaction):
+    """Test that inserting transactions upserts a single rollup row per user/asset/day."""
+    add_transaction(quantity=2.0, price=100.0)
+    add_transaction(quantity=1.0, price=130.0)
+    add_transaction(transaction_type="sell", quantity=1.0, price=150.0)
+
+    rollup = session.get(TradingRollup, (1, "ethereum", date(2024, 1, 2)))
+    assert rollup.trade_count == 3
+    assert rollup.buy_quantity == 3.0
+    assert rollup.sell_quantity == 1.0
+    assert rollup.buy_notional == 330.0
+    assert rollup.sell_notional == 150.0
+
+
+def test_edits_and_deletes_move_rollups(session, add_transaction):
+    """Test that edits and soft-deletes are applied as deltas, matching a rebuild."""
+    edited = add_transaction(quantity=2.0, price=100.0)
+    deleted = add_transaction(transaction_type="sell", quantity=1.0, price=150.0)
+    TransactionModel.edit_transaction(edited.id, quantity=3.0, total_value=300.0,
+                                      timestamp=datetime(2024, 1, 3, 12, 0))
+    TransactionModel.delete_transaction(deleted.id)
+
+    assert session.get(TradingRollup, (1, "ethereum", date(2024, 1, 2))) is None
+    rollup = session.get(TradingRollup, (1, "ethereum", date(2024, 1, 3)))
+    assert (rollup.trade_count, rollup.buy_quantity, rollup.buy_notional) == (1, 3.0, 300.0)
+    before = TradingRollup.get_stats()
+    TradingRollup.rebuild()
+    assert TradingRollup.get_stats() == before
+
+
+def test_custom_orders_count_once_executed(session):
+    """Test that a pending custom order is only rolled up when it executes."""
+    order = TransactionModel(user_id=1, crypto_id="ethereum", transaction_type="buy", quantity=1.0, price=100.0,
+                             target_price=90.0)
+    order.timestamp = datetime(2024, 1, 2, 12, 0)
+    session.add(order)
+    session.commit()
+    assert TradingRollup.get_stats()["trade_count"] == 0
+
+    order.active = False
+    session.commit()
+    assert TradingRollup.get_stats()["trade_count"] == 1
+
+
+def test_get_stats_filters(session, add_transaction):
+    """Test aggregating rollups by user, asset and date range."""
+    add_transaction(quantity=2.0, price=100.0)
+    add_transaction(quantity=2.0, price=200.0, timestamp=datetime(2024, 1, 5))
+    add_transaction(crypto_id="bitcoin", quantity=1.0, price=1000.0)
+    add_transaction(user_id=2, quantity=5.0, price=100.0)
+
+    stats = TradingRollup.get_stats(user_id=1, crypto_id="ethereum")
+    assert stats["trade_count"] == 2
+    assert stats["buy_quantity"] == 4.0
+    assert stats["buy_vwap"] == 150.0
+    assert stats["sell_vwap"] is None
+
+    stats = TradingRollup.get_stats(user_id=1, crypto_id="ethereum", end=date(2024, 1, 3))
+    assert stats["trade_count"] == 1
+    assert stats["vwap"] == 100.0
+
+
+def test_get_stats_empty(session):
+    """Test stats when no trades match."""
+    stats = TradingRollup.get_stats(user_id=42)
+    assert stats["trade_count"] == 0
+    assert stats["vwap"] is None
+
+
+##########################################################
+# Rebuild
+##########################################################
+
+def test_rebuild_matches_incremental(session, add_transaction):
+    """Test that a rebuild reproduces the incrementally maintained rollups."""
+    add_transaction(quantity=2.0, price=100.0)
+    add_transaction(transaction_type="sell", quantity=1.0, price=150.0)
+    add_transaction(crypto_id="bitcoin", quantity=1.0, price=1000.0, timestamp=datetime(2024, 1, 3))
+    before = TradingRollup.get_stats()
+
+    session.query(TradingRollup).delete()
+    session.commit()
+    assert TradingRollup.rebuild() == 2
+    assert TradingRollup.get_stats() == before
+
+
+##########################################################
+# Stats route
+##########################################################
+
+def test_stats_route(client, add_transaction, auth_headers):
+    """Test the /api/stats route."""
+    add_transaction(quantity=2.0, price=100.0)
+    response = client.get("/api/stats?user_id=1&crypto_id=ethereum&start=2024-01-01", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()["stats"]["buy_quantity"] == 2.0
+
+
+def test_stats_route_is_limited_to_the_session_user(client, add_transaction, auth_headers):
+    """Test that stats default to the session's user and never cover another one."""
+    add_transaction(quantity=2.0, price=100.0)
+    add_transaction(user_id=2, quantity=5.0, price=100.0)
+    response = client.get("/api/stats", headers=auth_headers)
+    assert response.get_json()["user_id"] == 1
+    assert response.get_json()["stats"]["buy_quantity"] == 2.0
+    assert client.get("/api/stats").status_code == 401
+    assert client.get("/api/stats?user_id=2", headers=auth_headers).status_code == 403
+
+
+def test_stats_route_bad_date(client, auth_headers):
+    """Test the /api/stats route with a malformed date."""
+    response = client.get("/api/stats?start=yesterday", headers=auth_headers)
+    assert response.status_code == 400
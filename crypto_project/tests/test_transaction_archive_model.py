@@ -0,0 +1,85 @@
+import pytest
+from datetime import datetime, timedelta
+
+from crypto_project.models.transaction_archive_model import TransactionArchive
+from crypto_project.models.transaction_model import TransactionModel
+
+
+@pytest.fixture
+def add_transaction(session):
+    """Fixture to insert a transaction with a given timestamp and active flag."""
+    def _add(timestamp, active=False, user_id=1):
+        transaction = TransactionModel(user_id=user_id, crypto_id="bitcoin", transaction_type="buy",
+                                       quantity=1.0, price=100.0)
+        transaction.timestamp = timestamp
+        transaction.active = active
+        session.add(transaction)
+        session.commit()
+        return transaction.id
+    return _add
+
+
+##########################################################
+# Archival
+##########################################################
+
+def test_archive_moves_old_inactive_rows(session, add_transaction):
+    """Test that only old, inactive rows leave the hot table, bucketed by month."""
+    old_jan = add_transaction(datetime(2023, 1, 5))
+    old_feb = add_transaction(datetime(2023, 2, 10))
+    old_active = add_transaction(datetime(2023, 1, 6), active=True)
+    recent = add_transaction(datetime.utcnow() - timedelta(days=1))
+
+    assert TransactionArchive.archive_inactive(older_than_days=30) == 2
+
+    hot_ids = {transaction.id for transaction in session.query(TransactionModel).all()}
+    assert hot_ids == {old_active, recent}
+    archives = {entry.table_name: entry.row_count for entry in session.query(TransactionArchive).all()}
+    assert archives == {"transactions_archive_2023_01": 1, "transactions_archive_2023_02": 1}
+    assert old_jan not in hot_ids and old_feb not in hot_ids
+
+
+def test_archive_is_incremental(session, add_transaction):
+    """Test that archiving the same month twice appends to its archive."""
+    add_transaction(datetime(2023, 1, 5))
+    TransactionArchive.archive_inactive(older_than_days=30)
+    add_transaction(datetime(2023, 1, 20))
+    TransactionArchive.archive_inactive(older_than_days=30)
+
+    entry = session.get(TransactionArchive, "transactions_archive_2023_01")
+    assert entry.row_count == 2
+
+
+def test_archive_negative_threshold(session):
+    """Test that a negative threshold is rejected."""
+    with pytest.raises(ValueError, match="older_than_days must not be negative"):
+        TransactionArchive.archive_inactive(older_than_days=-1)
+
+
+##########################################################
+# Reading across hot and archived rows
+##########################################################
+
+def test_get_user_transactions_unions_archives(session, add_transaction):
+    """Test that user transactions include archived rows transparently."""
+    archived = add_transaction(datetime(2023, 1, 5))
+    add_transaction(datetime(2023, 1, 6), user_id=2)
+    hot = add_transaction(datetime.utcnow(), active=True)
+    TransactionArchive.archive_inactive(older_than_days=30)
+
+    transactions = TransactionModel.get_user_transactions(1)
+    assert [transaction.id for transaction in transactions] == [archived, hot]
+    assert transactions[0].total_value == 100.0
+    assert transactions[0].active is False
+
+
+def test_get_user_transactions_skips_archives_out_of_range(session, add_transaction, mocker):
+    """Test that a range after every archive never reads an archive table."""
+    add_transaction(datetime(2023, 1, 5))
+    hot = add_transaction(datetime.utcnow(), active=True)
+    TransactionArchive.archive_inactive(older_than_days=30)
+
+    spy = mocker.spy(TransactionArchive, "_archive_table")
+    transactions = TransactionModel.get_user_transactions(1, start=datetime.utcnow() - timedelta(days=7))
+    assert [transaction.id for transaction in transactions] == [hot]
+    spy.assert_not_called()
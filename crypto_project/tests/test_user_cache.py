@@ -0,0 +1,149 @@
+import pytest
+from unittest.mock import patch
+
+from crypto_project.models.user_model import Users
+from crypto_project.utils.user_cache import UserCache
+
+
+class FakeRedis:
+    """In-process stand-in for the subset of the redis client used by UserCache."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def sample_user():
+    return {"username": "testuser", "password": "securepassword123"}
+
+
+@pytest.fixture
+def user_cache(app):
+    return app.extensions["user_cache"]
+
+
+##########################################################
+# UserCache
+##########################################################
+
+def test_local_lru_eviction():
+    """Test that the local tier is bounded."""
+    cache = UserCache(max_size=2)
+    cache.set("a", {"id": 1})
+    cache.set("b", {"id": 2})
+    cache.get("a")
+    cache.set("c", {"id": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"id": 1}
+
+
+def test_local_ttl_expiry():
+    """Test that local records expire after local_ttl."""
+    cache = UserCache(local_ttl=10)
+    cache.set("a", {"id": 1})
+    with patch("crypto_project.utils.lru.time.monotonic", return_value=10 ** 9):
+        assert cache.get("a") is None
+
+
+def test_redis_tier_shared_between_caches():
+    """Test that a record written by one process is read by another through Redis."""
+    redis_client = FakeRedis()
+    writer = UserCache(redis_client=redis_client)
+    reader = UserCache(redis_client=redis_client)
+    writer.set("a", {"id": 1})
+    assert reader.get("a") == {"id": 1}
+    writer.invalidate("a")
+    reader.clear()
+    assert reader.get("a") is None
+
+
+def test_fill_refused_after_concurrent_invalidation():
+    """Test that a read-through fill started before a delete does not resurrect the user."""
+    redis_client = FakeRedis()
+    cache = UserCache(redis_client=redis_client)
+    other = UserCache(redis_client=redis_client)
+    generation = cache.generation()
+    cache.invalidate("a")  # The delete commits while the reader holds the old row
+    assert cache.fill("a", {"id": 1}, generation) is False
+    assert cache.get("a") is None
+
+    assert other.fill("a", {"id": 1}, other.generation()) is True  # Another process, same race
+    other.clear()
+    assert other.get("a") is None
+    assert cache.fill("a", {"id": 2}, cache.generation()) is True
+
+
+def test_fill_refused_once_change_log_is_trimmed():
+    """Test that fills older than the bounded change log are refused rather than trusted."""
+    cache = UserCache(max_size=1)
+    generation = cache.generation()
+    cache.invalidate("a")
+    cache.invalidate("b")
+    assert cache.fill("a", {"id": 1}, generation) is False
+
+
+##########################################################
+# Users model integration
+##########################################################
+
+def test_lookups_served_from_cache(session, sample_user):
+    """Test that authentication lookups do not query the database once cached."""
+    Users.create_user(**sample_user)
+    with patch.object(Users, "query") as mock_query:
+        assert Users.check_password(sample_user["username"], sample_user["password"]) is True
+        assert Users.get_id_by_username(sample_user["username"]) is not None
+        mock_query.filter_by.assert_not_called()
+
+
+def test_update_password_writes_through(session, sample_user, user_cache):
+    """Test that updating a password refreshes the cached record."""
+    Users.create_user(**sample_user)
+    Users.check_password(sample_user["username"], sample_user["password"])
+    Users.update_password(sample_user["username"], "newpassword456")
+    assert Users.check_password(sample_user["username"], "newpassword456") is True
+    assert Users.check_password(sample_user["username"], sample_user["password"]) is False
+
+
+def test_delete_user_invalidates(session, sample_user, user_cache):
+    """Test that deleting a user removes the cached record."""
+    Users.create_user(**sample_user)
+    Users.delete_user(sample_user["username"])
+    assert user_cache.get(sample_user["username"]) is None
+    with pytest.raises(ValueError, match="User testuser not found"):
+        Users.check_password(sample_user["username"], sample_user["password"])
+
+
+def test_delete_during_lookup_is_not_cached(session, sample_user, user_cache):
+    """Test that a lookup racing with delete_user does not leave the user cached."""
+    Users.create_user(**sample_user)
+    user_cache.clear()
+    real_generation = user_cache.generation
+
+    def generation_then_delete():
+        generation = real_generation()
+        user_cache.invalidate(sample_user["username"])  # delete_user's invalidation lands mid-read
+        return generation
+
+    with patch.object(user_cache, "generation", side_effect=generation_then_delete):
+        Users.check_password(sample_user["username"], sample_user["password"])
+    assert user_cache.get(sample_user["username"]) is None
+
+
+def test_create_account_duplicate(client, sample_user):
+    """Test that the create-account route still rejects duplicates without a pre-check query."""
+    assert client.post("/api/create-account", json=sample_user).status_code == 201
+    response = client.post("/api/create-account", json=sample_user)
+    assert response.status_code == 400
+    assert "already exists" in response.get_json()["error"]
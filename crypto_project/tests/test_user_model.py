@@ -133,3 +133,54 @@ def test_get_id_by_username_user_not_found(session):
     """
     with pytest.raises(ValueError, match="User nonexistentuser not found"):
         Users.get_id_by_username("nonexistentuser")
+
+##########################################################
+# Bulk Provisioning
+##########################################################
+
+def test_bulk_create_users(session):
+    """Test bulk-creating users across several chunks."""
+    credentials = [(f"user{i}", f"password{i}") for i in range(25)]
+    result = Users.bulk_create_users(credentials, chunk_size=10, workers=2)
+    assert result == {"created": 25, "conflicts": []}
+    assert session.query(Users).count() == 25
+    assert Users.check_password("user7", "password7") is True
+
+
+def test_bulk_create_users_reports_conflicts(session, sample_user):
+    """Test that existing, repeated and incomplete rows are reported, not fatal."""
+    Users.create_user(**sample_user)
+    credentials = [("testuser", "x"), ("new1", "pw"), ("new1", "pw"), ("", "pw"), ("new2", None)]
+    result = Users.bulk_create_users(credentials, chunk_size=2)
+    assert result["created"] == 1
+    assert [conflict["username"] for conflict in result["conflicts"]] == ["testuser", "new1", "", "new2"]
+
+
+def test_bulk_create_accounts_route(client):
+    """Test the bulk route with JSON and NDJSON bodies."""
+    response = client.post("/api/bulk-create-accounts",
+                           json={"users": [{"username": "a", "password": "pw"}, {"username": "b", "password": "pw"}]})
+    assert response.status_code == 200
+    assert response.get_json()["created"] == 2
+
+    body = '{"username": "b", "password": "pw"}\n{"username": "c", "password": "pw"}\n'
+    response = client.post("/api/bulk-create-accounts", data=body, content_type="application/x-ndjson")
+    assert response.get_json()["created"] == 1
+    assert response.get_json()["conflicts"][0]["username"] == "b"
+
+
+def test_bulk_create_accounts_reports_malformed_rows(client, session):
+    """Test that a bad NDJSON line after a committed chunk is reported, not a failed request."""
+    client.application.config["BULK_PROVISION_CHUNK_SIZE"] = 1
+    body = '{"username": "a", "password": "pw"}\n{"username": \n["b", "pw"]\n{"username": "c", "password": "pw"}\n'
+    response = client.post("/api/bulk-create-accounts", data=body, content_type="application/x-ndjson")
+    assert response.status_code == 200
+    assert response.get_json()["created"] == 2
+    assert [(conflict["row"], conflict["reason"]) for conflict in response.get_json()["conflicts"]] == [
+        (2, "Invalid JSON."), (3, "Expected an object with 'username' and 'password'.")]
+    assert session.query(Users).count() == 2
+
+    response = client.post("/api/bulk-create-accounts", json={"users": ["d", {"username": "d", "password": "pw"}]})
+    assert response.status_code == 200
+    assert response.get_json()["created"] == 1
+    assert response.get_json()["conflicts"][0]["row"] == 1